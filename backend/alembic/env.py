@@ -0,0 +1,48 @@
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import create_engine, pool
+from app.config import settings
+from app.database import Base, use_utc_sessions
+from app import models  # noqa: F401 - enregistre les modèles dans les métadonnées
+
+config = context.config
+
+# Journalisation configurée seulement si alembic.ini en décrit une
+if config.config_file_name is not None and config.file_config.has_section("loggers"):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# L'URL provient de la configuration de l'application et non de alembic.ini ;
+# `alembic -x url=...` vise une autre base (copie de test, restauration)
+database_url = context.get_x_argument(as_dictionary=True).get("url", settings.database_url)
+
+
+def run_migrations_offline():
+    """Générer le SQL des migrations sans connexion à la base"""
+    context.configure(
+        url=database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Appliquer les migrations sur la base configurée"""
+    connectable = use_utc_sessions(create_engine(database_url, poolclass=pool.NullPool))
+    
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+    
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
\ No newline at end of file
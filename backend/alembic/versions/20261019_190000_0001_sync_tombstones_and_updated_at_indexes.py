@@ -0,0 +1,55 @@
+"""sync tombstones and updated_at indexes
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 19:00:00
+
+Les tables sont créées par create_tables() au démarrage de l'API : cette migration
+n'ajoute que ce qui manque aux bases existantes.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+UPDATED_AT_INDEXES = {
+    "tasks": "ix_tasks_user_updated",
+    "shopping_items": "ix_shopping_items_user_updated",
+    "budget_categories": "ix_budget_categories_user_updated",
+    "budget_transactions": "ix_budget_transactions_user_updated",
+}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    
+    for table, index in UPDATED_AT_INDEXES.items():
+        existing = {ix["name"] for ix in inspector.get_indexes(table)}
+        if index not in existing:
+            op.create_index(index, table, ["user_id", "updated_at"])
+    
+    if not inspector.has_table("sync_tombstones"):
+        op.create_table(
+            "sync_tombstones",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("entity", sa.String(50), nullable=False),
+            sa.Column("entity_id", sa.Integer(), nullable=False),
+            sa.Column(
+                "deleted_at", sa.DateTime(timezone=True),
+                server_default=sa.func.now(), nullable=False
+            ),
+        )
+        op.create_index("ix_sync_tombstones_id", "sync_tombstones", ["id"])
+        op.create_index(
+            "ix_sync_tombstones_user_deleted", "sync_tombstones", ["user_id", "deleted_at"]
+        )
+
+
+def downgrade():
+    op.drop_table("sync_tombstones")
+    for table, index in UPDATED_AT_INDEXES.items():
+        op.drop_index(index, table_name=table)
\ No newline at end of file
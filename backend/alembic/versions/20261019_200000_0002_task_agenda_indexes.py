@@ -0,0 +1,31 @@
+"""task agenda indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 20:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_tasks_user_completed_due": ["user_id", "completed", "due_date"],
+    "ix_tasks_user_status_priority": ["user_id", "status", "priority"],
+}
+
+
+def upgrade():
+    existing = {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes("tasks")}
+    for index, columns in INDEXES.items():
+        if index not in existing:
+            op.create_index(index, "tasks", columns)
+
+
+def downgrade():
+    for index in INDEXES:
+        op.drop_index(index, table_name="tasks")
\ No newline at end of file
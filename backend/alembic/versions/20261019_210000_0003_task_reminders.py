@@ -0,0 +1,50 @@
+"""task reminders
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 21:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    
+    existing = {ix["name"] for ix in inspector.get_indexes("tasks")}
+    if "ix_tasks_completed_due" not in existing:
+        op.create_index("ix_tasks_completed_due", "tasks", ["completed", "due_date"])
+    
+    if not inspector.has_table("task_reminders"):
+        op.create_table(
+            "task_reminders",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("due_date", sa.DateTime(timezone=True), nullable=False),
+            sa.Column(
+                "status", sa.Enum("CLAIMED", "SENT", "FAILED", name="reminderstatus"),
+                nullable=False
+            ),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("claimed_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column(
+                "task_id", sa.Integer(), sa.ForeignKey("tasks.id", ondelete="CASCADE"),
+                nullable=False
+            ),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.UniqueConstraint("task_id", "due_date", name="uq_task_reminders_task_due"),
+        )
+        op.create_index("ix_task_reminders_id", "task_reminders", ["id"])
+        op.create_index("ix_task_reminders_user_id", "task_reminders", ["user_id"])
+
+
+def downgrade():
+    op.drop_table("task_reminders")
+    op.drop_index("ix_tasks_completed_due", table_name="tasks")
\ No newline at end of file
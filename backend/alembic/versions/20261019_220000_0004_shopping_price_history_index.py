@@ -0,0 +1,26 @@
+"""shopping price history index
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 22:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+INDEX = "ix_shopping_items_user_name_purchased"
+
+
+def upgrade():
+    existing = {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes("shopping_items")}
+    if INDEX not in existing:
+        op.create_index(INDEX, "shopping_items", ["user_id", "name", "purchased_at"])
+
+
+def downgrade():
+    op.drop_index(INDEX, table_name="shopping_items")
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""account deletion
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 23:00:00
+
+Marque les comptes en attente de purge et passe les clés étrangères vers users
+en ON DELETE CASCADE. SQLite ne permet pas de modifier une contrainte existante :
+les clés y sont laissées telles quelles, la purge par lots ne dépend pas de la cascade.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+OWNED_TABLES = ("tasks", "shopping_items", "budget_categories", "budget_transactions")
+
+
+def _user_foreign_keys(inspector, table):
+    return [
+        fk for fk in inspector.get_foreign_keys(table)
+        if fk["referred_table"] == "users" and fk["constrained_columns"] == ["user_id"]
+    ]
+
+
+def _set_ondelete(inspector, ondelete):
+    for table in OWNED_TABLES:
+        for fk in _user_foreign_keys(inspector, table):
+            if (fk.get("options") or {}).get("ondelete") == ondelete:
+                continue
+            name = fk["name"] or f"fk_{table}_user_id"
+            if fk["name"]:
+                op.drop_constraint(fk["name"], table, type_="foreignkey")
+            op.create_foreign_key(name, table, "users", ["user_id"], ["id"], ondelete=ondelete)
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    
+    columns = {column["name"] for column in inspector.get_columns("users")}
+    if "deletion_requested_at" not in columns:
+        op.add_column("users", sa.Column("deletion_requested_at", sa.DateTime(timezone=True), nullable=True))
+    existing = {ix["name"] for ix in inspector.get_indexes("users")}
+    if "ix_users_deletion_requested_at" not in existing:
+        op.create_index("ix_users_deletion_requested_at", "users", ["deletion_requested_at"])
+    
+    if bind.dialect.name != "sqlite":
+        _set_ondelete(inspector, "CASCADE")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        _set_ondelete(sa.inspect(bind), None)
+    op.drop_index("ix_users_deletion_requested_at", table_name="users")
+    op.drop_column("users", "deletion_requested_at")
\ No newline at end of file
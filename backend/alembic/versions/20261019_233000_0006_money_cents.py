@@ -0,0 +1,78 @@
+"""money cents
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 23:30:00
+
+Convertit les montants FLOAT en centimes entiers (BIGINT). La nouvelle colonne est
+remplie par lots de BATCH_SIZE identifiants, chaque lot validé séparément : les
+verrous sont courts et une migration interrompue reprend sur les lignes restantes.
+L'ancienne colonne est ensuite supprimée et la nouvelle prend son nom.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 10000
+
+MONEY_COLUMNS = {
+    "budget_transactions": {"amount": False},
+    "budget_categories": {"monthly_budget": False},
+    "shopping_items": {"estimated_price": True, "actual_price": True},
+}
+
+
+def _backfill(table, source, target, expression):
+    """Remplir target à partir de source par plages d'identifiants"""
+    bind = op.get_bind()
+    rows = sa.table(table, sa.column("id"), sa.column(source), sa.column(target))
+    low, high = bind.execute(sa.select(sa.func.min(rows.c.id), sa.func.max(rows.c.id))).one()
+    if low is None:
+        return
+    with op.get_context().autocommit_block():
+        for start in range(low, high + 1, BATCH_SIZE):
+            bind.execute(
+                rows.update()
+                .where(rows.c.id >= start, rows.c.id < start + BATCH_SIZE, rows.c[target].is_(None))
+                .values({target: expression(rows.c[source])})
+            )
+
+
+def _convert(table, column, nullable, new_type, expression):
+    temporary = f"{column}_new"
+    inspector = sa.inspect(op.get_bind())
+    columns = {info["name"]: info for info in inspector.get_columns(table)}
+    if isinstance(columns[column]["type"], type(new_type)) and temporary not in columns:
+        return
+    
+    if temporary not in columns:
+        op.add_column(table, sa.Column(temporary, new_type, nullable=True))
+    _backfill(table, column, temporary, expression)
+    
+    with op.batch_alter_table(table) as batch:
+        batch.drop_column(column)
+        batch.alter_column(
+            temporary, new_column_name=column, existing_type=new_type, nullable=nullable
+        )
+
+
+def upgrade():
+    for table, columns in MONEY_COLUMNS.items():
+        for column, nullable in columns.items():
+            _convert(
+                table, column, nullable, sa.BigInteger(),
+                lambda source: sa.func.round(source * 100)
+            )
+
+
+def downgrade():
+    for table, columns in MONEY_COLUMNS.items():
+        for column, nullable in columns.items():
+            _convert(
+                table, column, nullable, sa.Float(),
+                lambda source: source / 100.0
+            )
\ No newline at end of file
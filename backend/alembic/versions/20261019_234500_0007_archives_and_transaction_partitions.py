@@ -0,0 +1,165 @@
+"""archives and transaction partitions
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 23:45:00
+
+Crée tasks_archive et shopping_items_archive, où le job d'archivage déplace les
+tâches terminées et articles achetés anciens.
+
+Sur MySQL, budget_transactions est partitionnée par mois (RANGE sur
+TO_DAYS(transaction_date)) : les requêtes bornées par date ne lisent que les
+partitions du mois. MySQL impose que la colonne de partition fasse partie de la
+clé primaire (id, transaction_date) et n'accepte pas de clés étrangères sur une
+table partitionnée : elles sont supprimées, la suppression en cascade est faite
+par l'application (dépôts, purge des comptes). Les partitions des mois suivants
+sont créées ensuite par le job d'archivage. Les autres bases ne sont pas partitionnées.
+"""
+from datetime import date, timedelta
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+TRANSACTION_FOREIGN_KEYS = (
+    ("user_id", "users", "CASCADE"),
+    ("category_id", "budget_categories", None),
+)
+
+
+def _next_month(value):
+    return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _archive_columns():
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    ]
+
+
+def _create_archives(inspector):
+    if not inspector.has_table("tasks_archive"):
+        op.create_table(
+            "tasks_archive",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column("title", sa.String(255), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("priority", sa.Enum("LOW", "MEDIUM", "HIGH", name="taskpriority")),
+            sa.Column(
+                "status",
+                sa.Enum("PENDING", "IN_PROGRESS", "COMPLETED", "CANCELLED", name="taskstatus")
+            ),
+            sa.Column("completed", sa.Boolean()),
+            sa.Column("due_date", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+            *_archive_columns(),
+        )
+        op.create_index("ix_tasks_archive_user_completed", "tasks_archive", ["user_id", "completed_at"])
+    
+    if not inspector.has_table("shopping_items_archive"):
+        op.create_table(
+            "shopping_items_archive",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column("name", sa.String(255), nullable=False),
+            sa.Column("quantity", sa.Integer()),
+            sa.Column("unit", sa.String(50)),
+            sa.Column("estimated_price", sa.BigInteger(), nullable=True),
+            sa.Column("actual_price", sa.BigInteger(), nullable=True),
+            sa.Column(
+                "category",
+                sa.Enum(
+                    "FRAIS", "LEGUMES", "BOULANGERIE", "EPICERIE", "VIANDE", "POISSON",
+                    "PRODUITS_MENAGERS", "HYGIENE", "AUTRE", name="shoppingcategory"
+                )
+            ),
+            sa.Column("notes", sa.String(500), nullable=True),
+            sa.Column("completed", sa.Boolean()),
+            sa.Column("purchased_at", sa.DateTime(timezone=True), nullable=True),
+            *_archive_columns(),
+        )
+        op.create_index(
+            "ix_shopping_items_archive_user_purchased", "shopping_items_archive",
+            ["user_id", "purchased_at"]
+        )
+        op.create_index(
+            "ix_shopping_items_archive_user_name_purchased", "shopping_items_archive",
+            ["user_id", "name", "purchased_at"]
+        )
+
+
+def _is_partitioned(bind):
+    return bind.execute(sa.text(
+        "SELECT COUNT(*) FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'budget_transactions' "
+        "AND PARTITION_NAME IS NOT NULL"
+    )).scalar() > 0
+
+
+def _partition_transactions(bind):
+    inspector = sa.inspect(bind)
+    for fk in inspector.get_foreign_keys("budget_transactions"):
+        op.drop_constraint(fk["name"], "budget_transactions", type_="foreignkey")
+    
+    bind.execute(sa.text(
+        "UPDATE budget_transactions SET transaction_date = created_at WHERE transaction_date IS NULL"
+    ))
+    bind.execute(sa.text(
+        "ALTER TABLE budget_transactions "
+        "MODIFY transaction_date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP, "
+        "DROP PRIMARY KEY, ADD PRIMARY KEY (id, transaction_date)"
+    ))
+    
+    oldest = bind.execute(sa.text("SELECT MIN(transaction_date) FROM budget_transactions")).scalar()
+    month = (oldest.date() if oldest else date.today()).replace(day=1)
+    last = date.today().replace(day=1)
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    partitions = []
+    while month <= last:
+        bound = _next_month(month)
+        partitions.append(f"PARTITION p{month:%Y%m} VALUES LESS THAN (TO_DAYS('{bound:%Y-%m-%d}'))")
+        month = bound
+    partitions.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    bind.execute(sa.text(
+        "ALTER TABLE budget_transactions PARTITION BY RANGE (TO_DAYS(transaction_date)) "
+        f"({', '.join(partitions)})"
+    ))
+
+
+def _unpartition_transactions(bind):
+    bind.execute(sa.text("ALTER TABLE budget_transactions REMOVE PARTITIONING"))
+    bind.execute(sa.text(
+        "ALTER TABLE budget_transactions "
+        "MODIFY transaction_date DATETIME NULL DEFAULT CURRENT_TIMESTAMP, "
+        "DROP PRIMARY KEY, ADD PRIMARY KEY (id)"
+    ))
+    for column, referred, ondelete in TRANSACTION_FOREIGN_KEYS:
+        op.create_foreign_key(
+            f"fk_budget_transactions_{column}", "budget_transactions", referred,
+            [column], ["id"], ondelete=ondelete
+        )
+
+
+def upgrade():
+    bind = op.get_bind()
+    _create_archives(sa.inspect(bind))
+    
+    if bind.dialect.name == "mysql" and not _is_partitioned(bind):
+        _partition_transactions(bind)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "mysql" and _is_partitioned(bind):
+        _unpartition_transactions(bind)
+    
+    op.drop_table("shopping_items_archive")
+    op.drop_table("tasks_archive")
\ No newline at end of file
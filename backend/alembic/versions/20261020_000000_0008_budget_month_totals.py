@@ -0,0 +1,46 @@
+"""budget month totals
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-20 00:00:00
+
+Totaux de dépenses par catégorie et par mois, tenus à jour à l'écriture des
+transactions pour les alertes de budget. La table est créée vide : chaque total
+est calculé à la première écriture de son mois.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table("budget_month_totals"):
+        return
+    
+    op.create_table(
+        "budget_month_totals",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("period", sa.Date(), nullable=False),
+        sa.Column("spent", sa.BigInteger(), nullable=False),
+        sa.Column("alerted_percent", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column(
+            "user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False
+        ),
+        sa.Column(
+            "category_id", sa.Integer(), sa.ForeignKey("budget_categories.id", ondelete="CASCADE"),
+            nullable=False
+        ),
+        sa.UniqueConstraint("category_id", "period", name="uq_budget_month_totals_category_period"),
+    )
+    op.create_index("ix_budget_month_totals_user_id", "budget_month_totals", ["user_id"])
+
+
+def downgrade():
+    op.drop_table("budget_month_totals")
\ No newline at end of file
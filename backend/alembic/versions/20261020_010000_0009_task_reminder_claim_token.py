@@ -0,0 +1,28 @@
+"""task reminder claim token
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-20 01:00:00
+
+Jeton de réservation des rappels : le dispatcher n'envoie que les lignes qu'il a
+lui-même réservées.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("task_reminders")}
+    if "claim_token" not in columns:
+        op.add_column("task_reminders", sa.Column("claim_token", sa.String(32), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("task_reminders") as batch:
+        batch.drop_column("claim_token")
\ No newline at end of file
@@ -6,8 +6,9 @@ from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from .config import settings
-from .database import get_db
+from .database import SessionLocal, get_db
 from .models.user import User
+from .tracing import tracer
 
 # Configuration pour le hashage des mots de passe
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -50,12 +51,14 @@ def verify_token(token: str) -> Optional[dict]:
 
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     """Authentifier un utilisateur"""
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        return None
-    if not verify_password(password, user.hashed_password):
-        return None
-    return user
+    with tracer.span("auth.authenticate_user"):
+        user = db.query(User).filter(User.email == email).first()
+        if not user:
+            return None
+        with tracer.span("auth.verify_password"):
+            if not verify_password(password, user.hashed_password):
+                return None
+        return user
 
 
 async def get_current_user(
@@ -69,39 +72,59 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        payload = verify_token(credentials.credentials)
-        if payload is None:
-            raise credentials_exception
-        
-        user_id: int = payload.get("sub")
-        if user_id is None:
+    with tracer.span("auth.get_current_user"):
+        try:
+            with tracer.span("auth.verify_token"):
+                payload = verify_token(credentials.credentials)
+            if payload is None:
+                raise credentials_exception
+    
+            user_id: int = payload.get("sub")
+            if user_id is None:
+                raise credentials_exception
+        except JWTError:
             raise credentials_exception
-    except JWTError:
-        raise credentials_exception
     
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
+        with tracer.span("auth.load_user", {"enduser.id": user_id}):
+            user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            raise credentials_exception
     
-    return user
+        return user
 
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Obtenir l'utilisateur actuel s'il est actif"""
-    if not current_user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Utilisateur inactif"
-        )
-    return current_user
+    with tracer.span("auth.get_current_active_user"):
+        if not current_user.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Utilisateur inactif"
+            )
+        return current_user
+
+
+async def get_current_active_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> int:
+    """
+    Identifiant de l'utilisateur actuel actif, vérifié dans une session courte.
+    
+    Pour les réponses en flux (SSE) : FastAPI ne ferme les dépendances comme get_db
+    qu'à la fin de la réponse, qui garderait une connexion du pool pendant toute la
+    durée du flux. La connexion est ici rendue avant le début de la réponse.
+    """
+    with SessionLocal() as db:
+        user = await get_current_active_user(await get_current_user(credentials, db))
+        return user.id
 
 
 async def get_current_superuser(current_user: User = Depends(get_current_user)) -> User:
     """Obtenir l'utilisateur actuel s'il est superutilisateur"""
-    if not current_user.is_superuser:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Pas assez de permissions"
-        )
-    return current_user 
\ No newline at end of file
+    with tracer.span("auth.get_current_superuser"):
+        if not current_user.is_superuser:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Pas assez de permissions"
+            )
+        return current_user 
\ No newline at end of file
@@ -1,8 +1,19 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import List
+from typing import Dict, List
 import os
 
+SIZE_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+
+def parse_size(value: str) -> int:
+    """Convertir une taille lisible ("50MB", "512KB", "1024") en octets"""
+    value = value.strip().upper()
+    for unit in ("GB", "MB", "KB", "B"):
+        if value.endswith(unit):
+            return int(float(value[:-len(unit)].strip()) * SIZE_UNITS[unit])
+    return int(value)
+
 
 class Settings(BaseSettings):
     """Configuration de l'application LifeHub"""
@@ -72,6 +83,19 @@ class Settings(BaseSettings):
     log_file: str = Field(default="/app/logs/lifehub.log", description="Fichier de log")
     log_max_size: str = Field(default="50MB", description="Taille max du fichier log")
     log_backup_count: int = Field(default=5, description="Nombre de fichiers de sauvegarde")
+    log_json: bool = Field(default=True, description="Logs JSON (sinon texte selon log_format)")
+    log_console: bool = Field(default=True, description="Écrire aussi les logs sur la sortie standard")
+    log_queue_size: int = Field(default=10000, description="Enregistrements en attente d'écriture (au-delà : ignorés)")
+    log_access_sample_rate: float = Field(
+        default=1.0,
+        description="Fraction des requêtes réussies journalisées (erreurs et requêtes lentes : toujours)"
+    )
+    log_access_slow_ms: int = Field(default=1000, description="Requêtes toujours journalisées au-delà de cette durée (ms)")
+    
+    @property
+    def log_max_bytes(self) -> int:
+        """Taille max du fichier log en octets"""
+        return parse_size(self.log_max_size)
     
     # === UPLOAD/STOCKAGE ===
     upload_dir: str = Field(default="/app/data/uploads", description="Répertoire uploads")
@@ -86,15 +110,104 @@ class Settings(BaseSettings):
         """Liste des extensions autorisées"""
         return [ext.strip().lower() for ext in self.allowed_extensions.split(",")]
     
+    @property
+    def max_upload_bytes(self) -> int:
+        """Taille max upload en octets"""
+        return parse_size(self.max_upload_size)
+    
+    # Justificatifs des transactions
+    upload_chunk_size: int = Field(default=64 * 1024, description="Taille des écritures sur disque (octets)")
+    receipt_thumbnail_size: int = Field(default=256, description="Côté max des miniatures (pixels)")
+    receipt_thumbnail_workers: int = Field(default=2, description="Threads de génération des miniatures")
+    receipt_orphan_grace_seconds: int = Field(
+        default=3600,
+        description="Âge minimal d'un fichier non référencé avant suppression (s)"
+    )
+    
     # === PERFORMANCE ===
     workers: int = Field(default=4, description="Nombre de workers")
     worker_connections: int = Field(default=1000, description="Connexions par worker")
     keepalive: int = Field(default=2, description="Keepalive timeout")
+    fast_serialization: bool = Field(
+        default=True,
+        description="Listes sérialisées par projection de colonnes et orjson"
+    )
+    
+    # Protection du pool : pagination bornée et délais des requêtes
+    default_page_size: int = Field(default=100, description="Taille de page par défaut")
+    max_page_size: int = Field(default=500, description="Taille de page maximale")
+    min_page_size: int = Field(default=25, description="Plafond minimal quand le pool est saturé")
+    max_page_offset: int = Field(default=100000, description="Décalage (skip) maximal")
+    page_size_pressure_ratio: float = Field(
+        default=0.75,
+        description="Occupation du pool au-delà de laquelle le plafond des pages est réduit"
+    )
+    query_timeout_ms: int = Field(default=5000, description="Durée maximale des requêtes de liste (ms)")
+    disconnect_poll_interval: float = Field(
+        default=0.1,
+        description="Intervalle de détection des clients déconnectés (s)"
+    )
+    
+    # Compression des réponses
+    compression_enabled: bool = Field(default=True, description="Compression gzip/Brotli des réponses")
+    compression_minimum_size: int = Field(default=1024, description="Taille minimale compressée (octets)")
+    compression_content_types: str = Field(
+        default="application/json,text/plain,text/html,text/csv:0,application/xml",
+        description="Types compressés, avec seuil optionnel type:octets (séparés par virgules)"
+    )
+    compression_gzip_level: int = Field(default=6, description="Niveau de compression gzip (1-9)")
+    compression_brotli_quality: int = Field(default=4, description="Qualité Brotli (0-11)")
+    
+    @property
+    def compression_content_types_map(self) -> Dict[str, int]:
+        """Seuil de compression par type de contenu"""
+        thresholds = {}
+        for entry in self.compression_content_types.split(","):
+            content_type, _, minimum_size = entry.strip().partition(":")
+            if content_type:
+                thresholds[content_type.lower()] = (
+                    int(minimum_size) if minimum_size else self.compression_minimum_size
+                )
+        return thresholds
     
     # === MONITORING ===
     enable_metrics: bool = Field(default=True, description="Activer les métriques")
     metrics_port: int = Field(default=9090, description="Port des métriques")
     
+    # === TRACES ===
+    tracing_enabled: bool = Field(default=False, description="Traces distribuées (requêtes, authentification, SQL)")
+    tracing_exporter: str = Field(default="otlp", description="Exporteur des spans (otlp, file, memory)")
+    tracing_otlp_endpoint: str = Field(
+        default="http://localhost:4318/v1/traces",
+        description="Collecteur OTLP/HTTP (encodage JSON)"
+    )
+    tracing_file: str = Field(default="/app/logs/traces.jsonl", description="Fichier de l'exporteur file")
+    tracing_service_name: str = Field(default="lifehub-api", description="Nom du service dans les traces")
+    tracing_sample_rate: float = Field(default=1.0, description="Fraction des traces racine échantillonnées (0-1)")
+    tracing_batch_size: int = Field(default=512, description="Spans exportés par lot")
+    tracing_queue_size: int = Field(default=4096, description="Spans en attente d'export (au-delà : ignorés)")
+    tracing_export_interval_ms: int = Field(default=2000, description="Intervalle maximal entre deux exports (ms)")
+    
+    # === PROFILAGE ===
+    profiling_enabled: bool = Field(default=False, description="Profilage par échantillonnage des requêtes")
+    profiling_sample_rate: float = Field(default=0.0, description="Fraction des requêtes profilées (0-1)")
+    profiling_header: str = Field(default="X-Profile", description="En-tête demandant le profilage d'une requête")
+    profiling_token: str = Field(default="", description="Valeur attendue de l'en-tête de profilage (vide : désactivé)")
+    profiling_slow_ms: int = Field(default=0, description="Conserver le profil des requêtes plus lentes (ms, 0 : désactivé)")
+    profiling_interval_ms: float = Field(default=5.0, description="Intervalle d'échantillonnage des piles (ms)")
+    profiling_buffer_size: int = Field(default=50, description="Profils conservés en mémoire")
+    profiling_max_samples: int = Field(default=10000, description="Échantillons de pile max par profil")
+    profiling_max_queries: int = Field(default=500, description="Requêtes SQL max par profil")
+    profiling_excluded_paths: str = Field(
+        default="/api/events,/api/admin/profiles",
+        description="Préfixes de chemins jamais profilés (flux longs, consultation des profils)"
+    )
+    
+    @property
+    def profiling_excluded_paths_list(self) -> List[str]:
+        """Préfixes de chemins exclus du profilage"""
+        return [path.strip() for path in self.profiling_excluded_paths.split(",") if path.strip()]
+    
     # === FEATURES ===
     enable_registration: bool = Field(default=True, description="Autoriser l'inscription")
     enable_email_verification: bool = Field(default=False, description="Vérification email")
@@ -105,20 +218,100 @@ class Settings(BaseSettings):
     rate_limit_requests: int = Field(default=100, description="Requêtes par fenêtre")
     rate_limit_window: int = Field(default=60, description="Fenêtre en secondes")
     
+    # === SYNCHRONISATION ===
+    sync_clock_skew_seconds: int = Field(default=2, description="Marge d'horloge entre l'API et la base pour la synchronisation (s)")
+    sync_tombstone_retention_days: int = Field(
+        default=90,
+        description="Rétention des suppressions pour la synchronisation différentielle (jours)"
+    )
+    
+    # === TEMPS RÉEL ===
+    events_backend: str = Field(default="memory", description="Diffusion des événements (memory, redis)")
+    events_coalesce_ms: int = Field(default=200, description="Fenêtre de regroupement des événements (ms)")
+    events_max_pending: int = Field(default=256, description="Événements en attente max par connexion")
+    events_heartbeat_seconds: int = Field(default=15, description="Intervalle des battements de cœur SSE")
+    events_max_connections: int = Field(default=10000, description="Connexions temps réel max par worker")
+    events_publish_queue: int = Field(default=10000, description="Lots d'événements en attente de publication Redis max")
+    
+    # === RAPPELS ===
+    reminder_notifier: str = Field(default="log", description="Notificateur des rappels (log, stub)")
+    reminder_lead_minutes: int = Field(default=15, description="Avance des rappels sur l'échéance (min)")
+    reminder_horizon_seconds: int = Field(default=300, description="Fenêtre chargée en file d'attente (s)")
+    reminder_grace_minutes: int = Field(default=60, description="Retard maximal d'un rappel encore envoyé (min)")
+    reminder_claim_timeout: int = Field(default=300, description="Délai avant reprise d'un rappel non confirmé (s)")
+    reminder_max_attempts: int = Field(default=5, description="Tentatives d'envoi max par rappel")
+    reminder_batch_size: int = Field(default=1000, description="Rappels traités par lot")
+    reminder_shard_index: int = Field(default=0, description="Index du shard de ce dispatcher")
+    reminder_shard_count: int = Field(default=1, description="Nombre de dispatchers (shards par user_id)")
+    
+    # === ALERTES DE BUDGET ===
+    budget_alert_thresholds: str = Field(default="80,100", description="Seuils d'alerte en % du budget mensuel (séparés par virgules, vide : aucune alerte)")
+    budget_alert_notifier: str = Field(default="log", description="Notificateur des alertes de budget (log, events, stub)")
+    
+    @property
+    def budget_alert_thresholds_list(self) -> List[int]:
+        """Seuils d'alerte, croissants"""
+        return sorted({int(value) for value in self.budget_alert_thresholds.split(",") if value.strip()})
+    
+    # === IDEMPOTENCE ===
+    idempotency_enabled: bool = Field(default=True, description="Rejeu des créations répétées (en-tête Idempotency-Key)")
+    idempotency_backend: str = Field(default="memory", description="Stockage des clés d'idempotence (memory, redis)")
+    idempotency_paths: str = Field(
+        default="/api/tasks/,/api/shopping/,/api/budget/transactions",
+        description="Chemins POST acceptant l'en-tête Idempotency-Key (séparés par virgules)"
+    )
+    idempotency_ttl_seconds: int = Field(default=86400, description="Conservation des réponses rejouables (s)")
+    idempotency_lock_seconds: int = Field(default=30, description="Expiration du verrou d'une requête en cours (s)")
+    idempotency_wait_ms: int = Field(default=2000, description="Attente d'un doublon concurrent avant 409 (ms)")
+    idempotency_max_entries: int = Field(default=100000, description="Clés gardées en mémoire (stockage memory)")
+    idempotency_max_response_bytes: int = Field(default=65536, description="Taille max d'une réponse enregistrée (octets)")
+    
+    @property
+    def idempotency_paths_list(self) -> List[str]:
+        """Chemins acceptant l'en-tête Idempotency-Key"""
+        return [path.strip() for path in self.idempotency_paths.split(",") if path.strip()]
+    
+    # === AUTOCOMPLÉTION ===
+    autocomplete_backend: str = Field(default="memory", description="Invalidation des index entre workers (memory, redis)")
+    autocomplete_cache_users: int = Field(default=10000, description="Index d'autocomplétion gardés en mémoire")
+    autocomplete_cache_ttl: int = Field(default=3600, description="Durée de vie d'un index d'autocomplétion (s)")
+    
+    # === SUPPRESSION DE COMPTE ===
+    account_purge_batch_size: int = Field(default=5000, description="Lignes supprimées par transaction lors d'une purge de compte")
+    
+    # === ARCHIVAGE ===
+    archive_after_days: int = Field(
+        default=365,
+        description="Âge des tâches terminées et articles achetés déplacés vers les archives (jours)"
+    )
+    archive_batch_size: int = Field(default=5000, description="Lignes archivées par transaction")
+    archive_partition_months_ahead: int = Field(
+        default=3,
+        description="Partitions mensuelles de budget_transactions créées à l'avance (MySQL)"
+    )
+    
     # === BACKUP ===
     backup_enabled: bool = Field(default=True, description="Activer les sauvegardes")
-    backup_schedule: str = Field(default="0 2 * * *", description="Planning sauvegarde")
+    backup_schedule: str = Field(default="0 2 * * *", description="Planning des sauvegardes (expression cron)")
     backup_retention_days: int = Field(default=30, description="Rétention en jours")
+    backup_dir: str = Field(default="/app/data/backups", description="Répertoire des sauvegardes")
+    backup_full_interval_days: int = Field(
+        default=7,
+        description="Sauvegarde complète au-delà de cet âge de la dernière (sinon incrémentale)"
+    )
+    backup_chunk_rows: int = Field(default=100000, description="Lignes par fichier de sauvegarde")
+    backup_batch_size: int = Field(default=5000, description="Lignes lues ou écrites par requête")
+    backup_compression_level: int = Field(default=6, description="Niveau de compression gzip (1-9)")
     
     class Config:
         # Charger depuis le fichier .env monté
         env_file = "/app/.env"
         env_file_encoding = "utf-8"
         case_sensitive = False
-        
+    
         # Validation des champs
         validate_assignment = True
-        
+    
         # Documentation des champs
         schema_extra = {
             "description": "Configuration de l'application LifeHub",
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+from typing import List, Set
+
+# minute, heure, jour du mois, mois, jour de la semaine (0 ou 7 = dimanche)
+FIELD_BOUNDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+
+def _parse_field(field: str, low: int, high: int) -> Set[int]:
+    values = set()
+    for part in field.split(","):
+        expression, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if expression == "*":
+            start, end = low, high
+        elif "-" in expression:
+            start, end = (int(value) for value in expression.split("-", 1))
+        else:
+            start = int(expression)
+            end = high if step > 1 else start
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"Champ cron invalide : {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """
+    Expression cron à cinq champs (minute heure jour mois jour-de-semaine).
+    
+    Listes, plages, pas et alias (@daily, @hourly…) sont acceptés. Comme cron, si
+    le jour du mois et le jour de la semaine sont tous deux restreints, une date
+    correspond dès que l'un des deux correspond.
+    """
+    
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Expression cron invalide : {expression}")
+        parsed: List[Set[int]] = [
+            _parse_field(field, low, high) for field, (low, high) in zip(fields, FIELD_BOUNDS)
+        ]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {day % 7 for day in weekdays}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+    
+    def _day_matches(self, moment: datetime) -> bool:
+        # isoweekday : lundi = 1 … dimanche = 7
+        day_match = moment.day in self.days
+        weekday_match = moment.isoweekday() % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_match and weekday_match
+        return day_match or weekday_match
+    
+    def matches(self, moment: datetime) -> bool:
+        return (
+            moment.minute in self.minutes
+            and moment.hour in self.hours
+            and moment.month in self.months
+            and self._day_matches(moment)
+        )
+    
+    def next_after(self, moment: datetime) -> datetime:
+        """Première date correspondante strictement postérieure à `moment`"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f"Aucune échéance pour l'expression cron : {self.expression}")
\ No newline at end of file
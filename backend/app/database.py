@@ -1,4 +1,6 @@
-from sqlalchemy import create_engine
+from datetime import datetime, timezone
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
@@ -14,13 +16,50 @@ engine = create_engine(
     pool_recycle=3600,
 )
 
+
+def use_utc_sessions(engine: Engine) -> Engine:
+    """
+    Fixer le fuseau des sessions MySQL à UTC.
+    
+    NOW() et les valeurs par défaut côté serveur (archived_at, deleted_at, lignes
+    insérées en SQL brut) suivent alors la même horloge UTC que utcnow(), quel
+    que soit le fuseau du serveur : les watermarks de synchronisation et de
+    sauvegarde et le contrôle de fraîcheur des ETag comparent des dates UTC.
+    """
+    if engine.dialect.name == "mysql":
+        @event.listens_for(engine, "connect")
+        def set_utc_time_zone(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("SET time_zone = '+00:00'")
+            cursor.close()
+    return engine
+
+
+use_utc_sessions(engine)
+
 # SessionLocal pour les sessions de base de données
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Les sessions vivent le temps d'une requête : les objets restent lisibles après
+# commit sans être rechargés (pas de SELECT implicite pour construire la réponse)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Base pour les modèles SQLAlchemy
 Base = declarative_base()
 
 
+def utcnow() -> datetime:
+    """
+    Horodatage applicatif, calculé en UTC.
+    
+    Valeur par défaut de toutes les colonnes de date écrites par l'API
+    (created_at, updated_at, ...) : une ligne n'est jamais horodatée par deux
+    horloges différentes.
+    
+    Stocké comme la base le restitue (UTC sans fuseau, à la seconde) : l'objet en
+    mémoire et la ligne relue sont identiques, sans SELECT après l'écriture.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
 def get_db() -> Generator[Session, None, None]:
     """
     Générateur de session de base de données pour FastAPI Dependency Injection
@@ -0,0 +1,190 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import List, NamedTuple, Optional
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+
+# Codages appliqués par CompressionMiddleware, suffixés aux ETags forts
+CONTENT_CODINGS = ("gzip", "br")
+
+
+class CacheValidators(NamedTuple):
+    """Validateurs HTTP (ETag / Last-Modified) d'une ressource ou d'une collection"""
+    etag: str
+    last_modified: Optional[datetime]
+    cacheable: bool = True
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Normaliser une date en UTC (les dates naïves sont considérées comme UTC)"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _hash(*parts) -> str:
+    """Empreinte courte et stable d'une liste de valeurs"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def _canonical(value):
+    """
+    Forme stable d'une valeur, qu'elle vienne de la base ou de l'objet modifié en
+    mémoire (FLOAT MySQL en simple précision, dates reçues avec fuseau)
+    """
+    if isinstance(value, float):
+        return format(value, ".6g")
+    if isinstance(value, datetime):
+        return _as_utc(value).replace(microsecond=0)
+    return value
+
+
+def collection_validators(
+    db: Session,
+    user_id: int,
+    *models,
+    request: Optional[Request] = None,
+    extra: tuple = ()
+) -> CacheValidators:
+    """
+    Calculer la version d'une ou plusieurs collections d'un utilisateur.
+    
+    La version est dérivée de COUNT(*) et MAX(updated_at) de chaque table, calculés
+    en une seule requête d'agrégat sur l'index user_id : aucune ligne n'est chargée.
+    Les paramètres de la requête (filtres, pagination) font partie de l'ETag.
+    
+    updated_at n'a qu'une précision à la seconde : tant que la dernière écriture date
+    de la seconde courante (horloge de la base), une autre écriture pourrait produire
+    la même version et la collection n'est pas considérée comme cachable.
+    """
+    columns = [func.now()]
+    for model in models:
+        columns.append(
+            select(func.count(model.id)).where(model.user_id == user_id).scalar_subquery()
+        )
+        columns.append(
+            select(func.max(model.updated_at)).where(model.user_id == user_id).scalar_subquery()
+        )
+    now, *versions = db.execute(select(*columns)).one()
+    
+    timestamps = [value for value in versions[1::2] if value is not None]
+    latest = max(timestamps) if timestamps else None
+    cacheable = latest is None or latest < now - timedelta(seconds=1)
+    
+    variant = sorted(request.query_params.multi_items()) if request is not None else ()
+    etag = _hash(user_id, *(model.__tablename__ for model in models), *versions, variant, *extra)
+    return CacheValidators(
+        etag=f'W/"{etag}"',
+        last_modified=_as_utc(latest),
+        cacheable=cacheable
+    )
+
+
+def resource_validators(obj) -> CacheValidators:
+    """
+    Validateurs d'une ligne déjà chargée.
+    
+    L'ETag est une empreinte du contenu des colonnes : updated_at n'a qu'une précision
+    à la seconde et ne suffit pas pour le contrôle de concurrence optimiste.
+    """
+    values = [_canonical(getattr(obj, column.key)) for column in obj.__table__.columns]
+    etag = _hash(obj.__tablename__, *values)
+    return CacheValidators(etag=f'"{etag}"', last_modified=_as_utc(obj.updated_at))
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    ETag de la représentation compressée avec `encoding`.
+    
+    Un ETag fort désigne des octets précis (RFC 9110 §8.8.3) : le corps gzip ou br
+    reçoit sa propre valeur, l'empreinte suivie du codage. Un ETag faible convient
+    déjà à toutes les représentations équivalentes et reste inchangé.
+    """
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _identity_etag(tag: str) -> str:
+    """ETag de la représentation non compressée dont `tag` est une variante"""
+    for encoding in CONTENT_CODINGS:
+        suffix = f'-{encoding}"'
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + '"'
+    return tag
+
+
+def _parse_etags(header: str) -> List[str]:
+    return [_identity_etag(tag.strip()) for tag in header.split(",") if tag.strip()]
+
+
+def _weak_equal(a: str, b: str) -> bool:
+    return a.removeprefix("W/") == b.removeprefix("W/")
+
+
+def apply_validators(response: Response, validators: CacheValidators) -> None:
+    """Ajouter ETag / Last-Modified aux en-têtes de la réponse"""
+    response.headers["ETag"] = validators.etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.headers["Vary"] = "Authorization"
+    if validators.last_modified is not None:
+        response.headers["Last-Modified"] = format_datetime(validators.last_modified, usegmt=True)
+
+
+def is_not_modified(request: Request, validators: CacheValidators) -> bool:
+    """Évaluer If-None-Match (prioritaire) puis If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = _parse_etags(if_none_match)
+        return "*" in tags or any(_weak_equal(tag, validators.etag) for tag in tags)
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and validators.last_modified is not None:
+        try:
+            since = _as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        return validators.last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    validators: CacheValidators
+) -> Optional[Response]:
+    """
+    Renseigner les validateurs sur la réponse et retourner une réponse 304
+    si le client possède déjà la représentation courante.
+    """
+    if not validators.cacheable:
+        return None
+    
+    apply_validators(response, validators)
+    if is_not_modified(request, validators):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=dict(response.headers))
+    return None
+
+
+def check_if_match(request: Request, validators: CacheValidators) -> None:
+    """Contrôle de concurrence optimiste : refuser la mise à jour si If-Match ne correspond pas"""
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return
+    
+    tags = _parse_etags(if_match)
+    # If-Match utilise la comparaison forte : les ETags faibles ne correspondent jamais
+    if "*" in tags or validators.etag in tags:
+        return
+    
+    raise HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="La ressource a été modifiée entre-temps",
+        headers={"ETag": validators.etag}
+    )
\ No newline at end of file
@@ -0,0 +1,121 @@
+import asyncio
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Union
+from fastapi import HTTPException, Query as QueryParam, Request, Response
+from sqlalchemy import Select, create_engine, text
+from sqlalchemy.engine import Engine, URL
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.pool import NullPool
+from .config import settings
+from .database import engine
+
+# Code MySQL d'une requête interrompue par MAX_EXECUTION_TIME
+MYSQL_EXECUTION_TIME_EXCEEDED = 3024
+
+
+class Page(NamedTuple):
+    """Pagination effective d'une liste"""
+    skip: int
+    limit: int
+
+
+def page_size_ceiling() -> int:
+    """
+    Taille de page maximale autorisée.
+    
+    Quand le pool de connexions est presque saturé, le plafond est réduit pour
+    libérer les connexions plus vite.
+    """
+    ceiling = settings.max_page_size
+    pool = engine.pool
+    if hasattr(pool, "checkedout") and hasattr(pool, "size"):
+        capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        if capacity and pool.checkedout() / capacity >= settings.page_size_pressure_ratio:
+            ceiling = max(settings.min_page_size, ceiling // 4)
+    return ceiling
+
+
+def _page_limit(response: Response, limit: Optional[int]) -> int:
+    effective = min(limit or settings.default_page_size, page_size_ceiling())
+    response.headers["X-Page-Limit"] = str(effective)
+    return effective
+
+
+def pagination(
+    response: Response,
+    skip: int = QueryParam(0, ge=0, le=settings.max_page_offset),
+    limit: Optional[int] = QueryParam(None, ge=1)
+) -> Page:
+    """Dépendance de pagination : borne `limit` et indique la taille retenue dans X-Page-Limit"""
+    return Page(skip=skip, limit=_page_limit(response, limit))
+
+
+def cursor_pagination(
+    response: Response,
+    limit: Optional[int] = QueryParam(None, ge=1)
+) -> Page:
+    """Pagination par curseur : même plafond et même X-Page-Limit, sans `skip`"""
+    return Page(skip=0, limit=_page_limit(response, limit))
+
+
+def with_statement_timeout(query: Union[Query, Select], timeout_ms: Optional[int] = None) -> Union[Query, Select]:
+    """Borner la durée d'exécution côté MySQL (indice MAX_EXECUTION_TIME, ignoré ailleurs)"""
+    timeout_ms = timeout_ms or settings.query_timeout_ms
+    return query.prefix_with(f"/*+ MAX_EXECUTION_TIME({int(timeout_ms)}) */", dialect="mysql")
+
+
+@lru_cache(maxsize=None)
+def _control_engine(url: URL) -> Engine:
+    """
+    Engine sans pool pour KILL QUERY.
+    
+    L'annulation sert justement quand le pool est saturé : emprunter une connexion
+    au pool attendrait pool_timeout avant de pouvoir libérer quoi que ce soit.
+    """
+    return create_engine(url, poolclass=NullPool)
+
+
+def _kill_query(bind: Engine, connection_id: int) -> None:
+    """Interrompre la requête en cours d'une connexion MySQL depuis une connexion dédiée"""
+    with _control_engine(bind.url).connect() as connection:
+        connection.execute(text(f"KILL QUERY {int(connection_id)}"))
+
+
+async def fetch_all(request: Request, db: Session, query: Union[Query, Select]) -> List:
+    """
+    Exécuter une requête de liste (ORM ou SELECT Core) avec délai maximal et annulation.
+    
+    Sur MySQL, la requête s'exécute dans un thread pendant que la connexion du client
+    est surveillée : si le client se déconnecte, la requête est tuée (KILL QUERY) au
+    lieu d'occuper une connexion du pool jusqu'à la fin.
+    """
+    query = with_statement_timeout(query)
+    
+    def run() -> List:
+        if isinstance(query, Query):
+            return query.all()
+        return db.execute(query).all()
+    
+    if db.get_bind().dialect.name != "mysql":
+        return run()
+    
+    connection_id = db.execute(text("SELECT CONNECTION_ID()")).scalar()
+    task = asyncio.ensure_future(asyncio.to_thread(run))
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=settings.disconnect_poll_interval)
+        if done:
+            return task.result()
+        if await request.is_disconnected():
+            await asyncio.to_thread(_kill_query, db.get_bind(), connection_id)
+            try:
+                await task
+            except OperationalError:
+                pass
+            raise HTTPException(status_code=499, detail="Requête annulée par le client")
+
+
+def is_query_timeout(exc: OperationalError) -> bool:
+    """La requête a-t-elle été interrompue par MAX_EXECUTION_TIME ?"""
+    args = getattr(exc.orig, "args", ())
+    return bool(args) and args[0] == MYSQL_EXECUTION_TIME_EXCEEDED
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+Journalisation asynchrone de l'API.
+
+Les appels de log ne font que déposer l'enregistrement dans une file bornée :
+le formatage (JSON) et l'écriture (fichier à rotation par taille, console) ont
+lieu dans le thread d'un QueueListener. Quand la file est pleine, les
+enregistrements sont ignorés et comptés plutôt que de bloquer les requêtes.
+Chaque enregistrement porte l'identifiant de la requête en cours.
+"""
+import copy
+import logging
+import os
+import queue
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+import orjson
+from .config import Settings
+
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributs standard d'un LogRecord : les autres viennent de `extra=` et sont exportés
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Un objet JSON par ligne : horodatage, niveau, logger, message, request_id et extras"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class AsyncQueueHandler(QueueHandler):
+    """
+    Dépôt non bloquant dans la file.
+    
+    Seuls le message (arguments fusionnés) et la trace d'exception sont calculés
+    dans le thread appelant ; le formatage complet est laissé au listener.
+    """
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        record.request_id = request_id.get()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _formatter(settings: Settings) -> logging.Formatter:
+    if settings.log_json:
+        return JsonFormatter()
+    return logging.Formatter(settings.log_format)
+
+
+def configure_logging(settings: Settings) -> QueueListener:
+    """
+    Installer la file de logs sur le logger racine et démarrer son listener.
+    
+    Les loggers d'uvicorn sont redirigés vers la file ; son journal d'accès est
+    désactivé, remplacé par AccessLogMiddleware. Le listener retourné doit être
+    arrêté à l'arrêt de l'application (vidage de la file).
+    """
+    formatter = _formatter(settings)
+    handlers = []
+    try:
+        os.makedirs(os.path.dirname(settings.log_file) or ".", exist_ok=True)
+        file_handler = RotatingFileHandler(
+            settings.log_file,
+            maxBytes=settings.log_max_bytes,
+            backupCount=settings.log_backup_count,
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    except OSError as exc:
+        print(f"⚠️ Fichier de log indisponible ({settings.log_file}) : {exc}", file=sys.stderr)
+    if settings.log_console or not handlers:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+    
+    log_queue = queue.Queue(maxsize=settings.log_queue_size)
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(AsyncQueueHandler(log_queue))
+    root.setLevel(settings.log_level.upper())
+    
+    for name in ("uvicorn", "uvicorn.error"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+    logging.getLogger("uvicorn.access").disabled = True
+    
+    listener.start()
+    return listener
\ No newline at end of file
@@ -1,18 +1,45 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from sqlalchemy.exc import OperationalError
 from .config import settings
-from .database import create_tables
-from .routers import auth, users, tasks, shopping, budget
+from .middleware.compression import CompressionMiddleware
+from .middleware.idempotency import IdempotencyMiddleware
+from .middleware.profiling import ProfilingMiddleware
+from .middleware.access_log import AccessLogMiddleware
+from .middleware.tracing import TracingMiddleware
+from .logging_config import configure_logging
+from .database import SessionLocal, create_tables
+from .limits import is_query_timeout
+from .routers import auth, users, tasks, shopping, budget, dashboard, sync, events, admin
+from .services.sync import purge_tombstones
+from .services.events import broker
+from .services.idempotency import idempotency_store
+from .services.profiler import profiler
+from .services.receipts import thumbnails
+from .tracing import tracer
 
 # Gestionnaire de contexte pour le cycle de vie de l'application
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Au démarrage
+    log_listener = configure_logging(settings)
     create_tables()
+    db = SessionLocal()
+    try:
+        purge_tombstones(db)
+    finally:
+        db.close()
+    await broker.start()
+    await idempotency_store.start()
     yield
-    # À l'arrêt (si nécessaire)
-    pass
+    # À l'arrêt
+    await broker.stop()
+    await idempotency_store.stop()
+    thumbnails.shutdown()
+    tracer.shutdown()
+    log_listener.stop()
 
 # Créer l'instance FastAPI
 app = FastAPI(
@@ -37,12 +64,74 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Rejeu des créations répétées : à l'intérieur de la compression, la réponse
+# enregistrée est celle de la route et reste compressible au rejeu
+if settings.idempotency_enabled:
+    app.add_middleware(
+        IdempotencyMiddleware,
+        store=idempotency_store,
+        paths=settings.idempotency_paths_list,
+        ttl=settings.idempotency_ttl_seconds,
+        lock_seconds=settings.idempotency_lock_seconds,
+        wait_ms=settings.idempotency_wait_ms,
+        max_response_bytes=settings.idempotency_max_response_bytes,
+    )
+
+# Compression des réponses volumineuses (JSON, exports)
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        content_types=settings.compression_content_types_map,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+
+# Profilage par échantillonnage (opt-in) : placé après la compression pour
+# mesurer aussi le temps passé à compresser
+if settings.profiling_enabled:
+    profiler.install()
+    app.add_middleware(
+        ProfilingMiddleware,
+        profiler=profiler,
+        sample_rate=settings.profiling_sample_rate,
+        header=settings.profiling_header,
+        token=settings.profiling_token,
+        slow_ms=settings.profiling_slow_ms,
+        excluded_paths=settings.profiling_excluded_paths_list,
+    )
+
+# Traces distribuées : span de la requête, de l'authentification et du SQL
+if settings.tracing_enabled:
+    tracer.install()
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+
+# Journal d'accès et identifiant de requête (le plus externe : couvre toute la requête)
+app.add_middleware(
+    AccessLogMiddleware,
+    sample_rate=settings.log_access_sample_rate,
+    slow_ms=settings.log_access_slow_ms,
+)
+
+@app.exception_handler(OperationalError)
+async def operational_error_handler(request: Request, exc: OperationalError):
+    """Répondre 503 quand une requête dépasse son délai d'exécution"""
+    if is_query_timeout(exc):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "La requête a dépassé le délai d'exécution autorisé"}
+        )
+    raise exc
+
 # Inclure les routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
 app.include_router(tasks.router, prefix="/api/tasks", tags=["Tasks"])
 app.include_router(shopping.router, prefix="/api/shopping", tags=["Shopping"])
 app.include_router(budget.router, prefix="/api/budget", tags=["Budget"])
+app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
+app.include_router(sync.router, prefix="/api/sync", tags=["Sync"])
+app.include_router(events.router, prefix="/api/events", tags=["Events"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 
 @app.get("/")
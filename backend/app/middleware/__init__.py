@@ -0,0 +1 @@
+# Middlewares ASGI de l'API LifeHub
\ No newline at end of file
@@ -0,0 +1,75 @@
+import logging
+import random
+import re
+import time
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..logging_config import request_id
+
+logger = logging.getLogger("lifehub.access")
+
+# Identifiant fourni par le client ou le proxy, repris s'il est raisonnable
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+class AccessLogMiddleware:
+    """
+    Journal d'accès structuré et identifiant de requête.
+    
+    L'en-tête X-Request-ID entrant est repris (sinon un identifiant est généré),
+    exposé aux logs de la requête via le contexte et renvoyé dans la réponse.
+    Les requêtes réussies sont échantillonnées (sample_rate) ; les erreurs
+    (status >= 400) et les requêtes plus lentes que slow_ms sont toujours
+    journalisées.
+    """
+    
+    def __init__(self, app: ASGIApp, sample_rate: float = 1.0, slow_ms: int = 1000):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+    
+        incoming = Headers(scope=scope).get("x-request-id")
+        # Identifiant aléatoire de 128 bits : uuid4 lit os.urandom à chaque appel, bien plus lent
+        current_id = incoming if incoming and _REQUEST_ID.match(incoming) else f"{random.getrandbits(128):032x}"
+        token = request_id.set(current_id)
+        started = time.perf_counter()
+        response = {"status": 500, "bytes": 0}
+    
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                MutableHeaders(scope=message)["X-Request-ID"] = current_id
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+    
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if (
+                response["status"] >= 400
+                or duration_ms >= self.slow_ms
+                or self.sample_rate >= 1
+                or random.random() < self.sample_rate
+            ):
+                client = scope.get("client")
+                logger.info(
+                    "%s %s %s",
+                    scope["method"], scope["path"], response["status"],
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": response["status"],
+                        "duration_ms": round(duration_ms, 3),
+                        "bytes": response["bytes"],
+                        "client": client[0] if client else None,
+                        "sampled": self.sample_rate < 1,
+                    }
+                )
+            request_id.reset(token)
\ No newline at end of file
@@ -0,0 +1,195 @@
+import zlib
+from typing import Dict, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..etag import encoded_etag
+
+try:
+    import brotli
+except ImportError:  # Brotli est optionnel : gzip seul sinon
+    brotli = None
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        # wbits=31 : flux deflate avec en-tête et pied gzip
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        if finish:
+            return self._compressor.compress(data) + self._compressor.flush()
+        # Z_SYNC_FLUSH : chaque morceau est décodable dès sa réception
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+    
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        if finish:
+            return self._compressor.process(data) + self._compressor.finish()
+        return self._compressor.process(data) + self._compressor.flush()
+
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    """Analyser Accept-Encoding en {encodage: qvalue}"""
+    accepted = {}
+    for part in header.split(","):
+        name, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        name = name.strip().lower()
+        if name:
+            accepted[name] = quality
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    Compression gzip / Brotli des réponses.
+    
+    Seuls les types de contenu configurés sont compressés, chacun avec sa taille
+    minimale. Les réponses en plusieurs morceaux (exports, StreamingResponse) sont
+    compressées au fil de l'eau sans être mises en mémoire. Les flux
+    text/event-stream ne sont jamais compressés : le regroupement retarderait
+    les événements. Un ETag fort est suffixé du codage (voir `encoded_etag`).
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        content_types: Dict[str, int],
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        self.app = app
+        self.content_types = content_types
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+    
+    def _select_encoding(self, scope: Scope) -> Optional[str]:
+        """
+        Codage de plus haute qvalue ; la préférence du serveur (Brotli, puis gzip)
+        ne départage que les égalités. Aucun si `identity` est explicitement préféré.
+        """
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        wildcard = accepted.get("*", 0.0)
+        selected, best = None, 0.0
+        for encoding in ("br", "gzip") if brotli is not None else ("gzip",):
+            quality = accepted.get(encoding, wildcard)
+            if quality > best:
+                selected, best = encoding, quality
+        if best < accepted.get("identity", 0.0):
+            return None
+        return selected
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+    
+        encoding = self._select_encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+    
+        await _CompressionResponder(self, encoding, send)(scope, receive)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.minimum_size: Optional[int] = None
+        self.compressor = None
+        self.passthrough = False
+        self.if_none_match = ""
+    
+    async def __call__(self, scope: Scope, receive: Receive) -> None:
+        self.if_none_match = Headers(scope=scope).get("if-none-match", "")
+        await self.middleware.app(scope, receive, self.send_compressed)
+    
+    def _minimum_size(self, headers: Headers) -> Optional[int]:
+        """Seuil du type de contenu, ou None s'il ne doit pas être compressé"""
+        if "content-encoding" in headers:
+            return None
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return self.middleware.content_types.get(content_type)
+    
+    def _new_compressor(self):
+        if self.encoding == "br":
+            return _BrotliCompressor(self.middleware.brotli_quality)
+        return _GzipCompressor(self.middleware.gzip_level)
+    
+    def _compressed_headers(self, streaming: bool) -> MutableHeaders:
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "etag" in headers:
+            headers["ETag"] = encoded_etag(headers["etag"], self.encoding)
+        if streaming and "content-length" in headers:
+            del headers["content-length"]
+        return headers
+    
+    def _not_modified_headers(self, message: Message) -> None:
+        """304 : rappeler l'ETag de la variante compressée si c'est celle que le client détient"""
+        headers = MutableHeaders(raw=message["headers"])
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag is not None:
+            encoded = encoded_etag(etag, self.encoding)
+            if encoded != etag and encoded in self.if_none_match:
+                headers["ETag"] = encoded
+    
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            if message["status"] == 304:
+                self._not_modified_headers(message)
+            self.start_message = message
+            self.minimum_size = self._minimum_size(Headers(raw=message["headers"]))
+            self.passthrough = self.minimum_size is None
+            if self.passthrough:
+                await self.send(message)
+            return
+    
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+    
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+    
+        if self.compressor is None:
+            if not more_body:
+                # Réponse complète : compresser seulement au-dessus du seuil
+                if len(body) < self.minimum_size:
+                    self.passthrough = True
+                    await self.send(self.start_message)
+                    await self.send(message)
+                    return
+                body = self._new_compressor().compress(body, finish=True)
+                headers = self._compressed_headers(streaming=False)
+                headers["Content-Length"] = str(len(body))
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+    
+            # Réponse en flux : taille inconnue, compression morceau par morceau
+            self.compressor = self._new_compressor()
+            self._compressed_headers(streaming=True)
+            await self.send(self.start_message)
+    
+        await self.send({
+            "type": "http.response.body",
+            "body": self.compressor.compress(body, finish=not more_body),
+            "more_body": more_body,
+        })
\ No newline at end of file
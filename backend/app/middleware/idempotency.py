@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from typing import Iterable, Optional
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..auth import verify_token
+from ..services.idempotency import DONE
+
+logger = logging.getLogger(__name__)
+
+HEADER = "idempotency-key"
+_KEY = re.compile(r"^[\x21-\x7e]{1,255}$")
+
+# Réponses qui ne dépendent pas que de la requête : une nouvelle tentative doit être traitée
+_NOT_STORED = {401, 403, 408, 409, 429}
+
+
+def _error(status_code: int, detail: str, headers: Optional[dict] = None) -> JSONResponse:
+    return JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
+
+
+class IdempotencyMiddleware:
+    """
+    Rejouer la réponse d'une création déjà traitée (en-tête Idempotency-Key).
+    
+    Seules les requêtes POST authentifiées vers les chemins listés sont
+    concernées. La clé est propre à l'utilisateur du token (vérifié sans accès à
+    la base) ; l'empreinte de la requête (chemin, paramètres, corps) est
+    enregistrée avec elle. Une nouvelle tentative reçoit la réponse d'origine,
+    avec l'en-tête Idempotent-Replayed, sans atteindre la base. Un doublon
+    concurrent attend la fin de la première requête (au plus wait_ms), puis
+    reçoit 409. Les erreurs serveur ne sont pas enregistrées : la clé est libérée
+    et la requête pourra être retentée.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        store,
+        paths: Iterable[str],
+        ttl: int = 86400,
+        lock_seconds: int = 30,
+        wait_ms: int = 2000,
+        max_response_bytes: int = 65536
+    ):
+        self.app = app
+        self.store = store
+        self.paths = set(paths)
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+        self.wait_ms = wait_ms
+        self.max_response_bytes = max_response_bytes
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get(HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not _KEY.match(key):
+            await _error(400, "En-tête Idempotency-Key invalide (1 à 255 caractères ASCII visibles)")(scope, receive, send)
+            return
+    
+        subject = self._subject(headers.get("authorization"))
+        if subject is None:
+            # Non authentifié : la route répond 401
+            await self.app(scope, receive, send)
+            return
+    
+        body = await self._read_body(receive)
+        fingerprint = hashlib.sha256(
+            b"\n".join((scope["path"].encode(), scope.get("query_string", b""), body))
+        ).hexdigest()
+        store_key = f"{subject}:{key}"
+    
+        try:
+            acquired = await self._acquire(store_key, fingerprint, scope, receive, send)
+        except Exception:
+            logger.exception("Stockage des clés d'idempotence indisponible")
+            acquired = None
+        if acquired is False:
+            return
+    
+        await self._process(scope, body, receive, send, store_key if acquired else None, fingerprint)
+    
+    @staticmethod
+    def _subject(authorization: Optional[str]) -> Optional[str]:
+        if not authorization or not authorization.lower().startswith("bearer "):
+            return None
+        payload = verify_token(authorization[7:].strip())
+        subject = payload.get("sub") if payload else None
+        return None if subject is None else str(subject)
+    
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+    
+    async def _acquire(self, store_key: str, fingerprint: str, scope: Scope, receive: Receive, send: Send) -> bool:
+        """
+        Poser le verrou de la clé, ou répondre à la place de l'application.
+    
+        Retourne False si la réponse a déjà été envoyée (rejeu, conflit).
+        """
+        deadline = time.monotonic() + self.wait_ms / 1000
+        while True:
+            if await self.store.acquire(store_key, fingerprint, self.lock_seconds):
+                return True
+            record = await self.store.get(store_key)
+            if record is None:
+                # Expirée ou libérée entre-temps
+                continue
+            if record["fingerprint"] != fingerprint:
+                await _error(
+                    422, "Clé d'idempotence déjà utilisée pour une autre requête"
+                )(scope, receive, send)
+                return False
+            if record["state"] == DONE:
+                await self._replay(record, send)
+                return False
+            if time.monotonic() >= deadline:
+                await _error(
+                    409, "Une requête avec cette clé d'idempotence est en cours", {"Retry-After": "1"}
+                )(scope, receive, send)
+                return False
+            await asyncio.sleep(0.05)
+    
+    @staticmethod
+    async def _replay(record: dict, send: Send) -> None:
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record["headers"]]
+        headers.append((b"idempotent-replayed", b"true"))
+        await send({"type": "http.response.start", "status": record["status"], "headers": headers})
+        await send({"type": "http.response.body", "body": record["body"], "more_body": False})
+    
+    async def _process(
+        self,
+        scope: Scope,
+        body: bytes,
+        receive: Receive,
+        send: Send,
+        store_key: Optional[str],
+        fingerprint: str
+    ) -> None:
+        consumed = False
+    
+        async def replay_body() -> Message:
+            nonlocal consumed
+            if not consumed:
+                consumed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+    
+        if store_key is None:
+            await self.app(scope, replay_body, send)
+            return
+    
+        response = {"status": 500, "headers": [], "body": []}
+        size = 0
+    
+        async def capture(message: Message) -> None:
+            nonlocal size
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = [
+                    (name.decode("latin-1"), value.decode("latin-1")) for name, value in message.get("headers", [])
+                ]
+            elif message["type"] == "http.response.body" and size <= self.max_response_bytes:
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                response["body"].append(chunk)
+            await send(message)
+    
+        stored = False
+        try:
+            await self.app(scope, replay_body, capture)
+            status_code = response["status"]
+            if status_code < 500 and status_code not in _NOT_STORED and size <= self.max_response_bytes:
+                record = {
+                    "fingerprint": fingerprint,
+                    "status": status_code,
+                    "headers": response["headers"],
+                    "body": b"".join(response["body"]),
+                }
+                try:
+                    await self.store.complete(store_key, record, self.ttl)
+                    stored = True
+                except Exception:
+                    logger.exception("Impossible d'enregistrer la réponse de la clé d'idempotence %s", store_key)
+        finally:
+            # Erreur, réponse non rejouable ou client parti : une nouvelle tentative sera traitée
+            if not stored:
+                await self._release(store_key)
+    
+    async def _release(self, store_key: str) -> None:
+        try:
+            await self.store.release(store_key)
+        except Exception:
+            logger.exception("Impossible de libérer la clé d'idempotence %s", store_key)
\ No newline at end of file
@@ -0,0 +1,76 @@
+import hmac
+import random
+from typing import Optional, Sequence
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..services.profiler import Profiler, activate, deactivate
+
+
+class ProfilingMiddleware:
+    """
+    Profilage par échantillonnage d'une partie des requêtes.
+    
+    Une requête est profilée si elle est tirée au sort (sample_rate), si elle
+    porte l'en-tête de profilage avec le bon jeton, ou — quand slow_ms est
+    défini — si elle s'avère plus lente que ce seuil : toutes les requêtes sont
+    alors profilées et seul le profil des lentes est conservé. L'identifiant du
+    profil est renvoyé dans X-Profile-Id lorsque la décision est prise avant la
+    réponse.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        profiler: Profiler,
+        sample_rate: float = 0.0,
+        header: str = "X-Profile",
+        token: str = "",
+        slow_ms: int = 0,
+        excluded_paths: Sequence[str] = ()
+    ):
+        self.app = app
+        self.profiler = profiler
+        self.sample_rate = sample_rate
+        self.header = header.lower()
+        self.token = token
+        self.slow_ms = slow_ms
+        self.excluded_paths = tuple(excluded_paths)
+    
+    def _reason(self, scope: Scope) -> Optional[str]:
+        if self.token:
+            value = Headers(scope=scope).get(self.header)
+            if value is not None and hmac.compare_digest(value.encode(), self.token.encode()):
+                return "header"
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.excluded_paths):
+            await self.app(scope, receive, send)
+            return
+    
+        reason = self._reason(scope)
+        if reason is None and not self.slow_ms:
+            await self.app(scope, receive, send)
+            return
+    
+        profile = self.profiler.begin(scope["method"], scope["path"], reason)
+    
+        async def send_with_profile(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+                if reason is not None:
+                    MutableHeaders(scope=message)["X-Profile-Id"] = str(profile.id)
+            await send(message)
+    
+        token = activate(profile)
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            deactivate(token)
+            self.profiler.end(profile)
+            if reason is None and profile.duration_ms >= self.slow_ms:
+                profile.reason = "slow"
+            if profile.reason is not None:
+                self.profiler.keep(profile)
\ No newline at end of file
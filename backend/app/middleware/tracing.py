@@ -0,0 +1,56 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..tracing import SERVER, Tracer, describe_error, format_traceparent, parse_traceparent
+
+
+class TracingMiddleware:
+    """
+    Span serveur de chaque requête HTTP.
+    
+    Le contexte entrant (en-tête W3C traceparent) est repris : la requête
+    rejoint la trace de l'appelant et respecte sa décision d'échantillonnage.
+    Le contexte du span est renvoyé dans l'en-tête traceresponse. Le span est
+    renommé d'après le gabarit de la route une fois celle-ci résolue.
+    """
+    
+    def __init__(self, app: ASGIApp, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+    
+        parent = parse_traceparent(Headers(scope=scope).get("traceparent"))
+        span = self.tracer.start_span(
+            f"{scope['method']} {scope['path']}",
+            SERVER,
+            {"http.method": scope["method"], "http.target": scope["path"]},
+            remote_parent=parent,
+        )
+        if span is None:
+            await self.app(scope, receive, send)
+            return
+    
+        async def send_with_trace(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.set_error(f"HTTP {message['status']}")
+                MutableHeaders(scope=message)["traceresponse"] = format_traceparent(span.context)
+            await send(message)
+    
+        token = self.tracer.activate(span)
+        try:
+            await self.app(scope, receive, send_with_trace)
+        except BaseException as exc:
+            span.set_error(describe_error(exc))
+            raise
+        finally:
+            self.tracer.deactivate(token)
+            route = scope.get("route")
+            if route is not None and hasattr(route, "path"):
+                span.name = f"{scope['method']} {route.path}"
+                span.set_attribute("http.route", route.path)
+            self.tracer.end_span(span)
\ No newline at end of file
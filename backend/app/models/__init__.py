@@ -1,12 +1,20 @@
 from .user import User
 from .task import Task
 from .shopping import ShoppingItem
-from .budget import BudgetCategory, BudgetTransaction
+from .budget import BudgetCategory, BudgetTransaction, BudgetMonthTotal
+from .sync import SyncTombstone
+from .reminder import TaskReminder
+from .archive import ArchivedTask, ArchivedShoppingItem
 
 __all__ = [
     "User",
     "Task", 
     "ShoppingItem",
     "BudgetCategory",
-    "BudgetTransaction"
+    "BudgetTransaction",
+    "BudgetMonthTotal",
+    "SyncTombstone",
+    "TaskReminder",
+    "ArchivedTask",
+    "ArchivedShoppingItem"
 ] 
\ No newline at end of file
@@ -0,0 +1,53 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum, Index
+from sqlalchemy.sql import func
+from ..database import Base
+from ..money import Money
+from .task import TaskPriority, TaskStatus
+from .shopping import ShoppingCategory
+
+
+class ArchivedTask(Base):
+    """Tâche terminée depuis longtemps, déplacée hors de tasks (mêmes colonnes et identifiant)"""
+    __tablename__ = "tasks_archive"
+    __table_args__ = (
+        Index("ix_tasks_archive_user_completed", "user_id", "completed_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    priority = Column(Enum(TaskPriority), default=TaskPriority.MEDIUM)
+    status = Column(Enum(TaskStatus), default=TaskStatus.PENDING)
+    completed = Column(Boolean, default=False)
+    due_date = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+
+class ArchivedShoppingItem(Base):
+    """Article acheté depuis longtemps, déplacé hors de shopping_items (mêmes colonnes et identifiant)"""
+    __tablename__ = "shopping_items_archive"
+    __table_args__ = (
+        Index("ix_shopping_items_archive_user_purchased", "user_id", "purchased_at"),
+        Index("ix_shopping_items_archive_user_name_purchased", "user_id", "name", "purchased_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(255), nullable=False)
+    quantity = Column(Integer, default=1)
+    unit = Column(String(50), default="unité")
+    estimated_price = Column(Money, nullable=True)
+    actual_price = Column(Money, nullable=True)
+    category = Column(Enum(ShoppingCategory), default=ShoppingCategory.EPICERIE)
+    notes = Column(String(500), nullable=True)
+    completed = Column(Boolean, default=False)
+    purchased_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
\ No newline at end of file
@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Float, Text, Enum
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Text, Enum, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from decimal import Decimal
 from enum import Enum as PyEnum
-from ..database import Base
+from ..database import Base, utcnow
+from ..money import Money
 
 
 class BudgetCategoryType(PyEnum):
@@ -25,20 +27,23 @@ class TransactionType(PyEnum):
 
 class BudgetCategory(Base):
     __tablename__ = "budget_categories"
+    __table_args__ = (
+        Index("ix_budget_categories_user_updated", "user_id", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     category_type = Column(Enum(BudgetCategoryType), nullable=False)
-    monthly_budget = Column(Float, nullable=False, default=0.0)
+    monthly_budget = Column(Money, nullable=False, default=0)
     color = Column(String(7), default="#3B82F6")  # Couleur hex
     icon = Column(String(50), nullable=True)
     description = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), onupdate=utcnow)
     
     # Clé étrangère vers User
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Relations
     owner = relationship("User", back_populates="budget_categories")
@@ -46,9 +51,12 @@ class BudgetCategory(Base):
     
     @property
     def spent_this_month(self):
-        """Calcule le montant dépensé ce mois-ci pour cette catégorie"""
-        # Cette propriété sera calculée via une requête SQL dans les services
-        return 0
+        """Montant dépensé ce mois-ci, renseigné par services.budget_stats"""
+        return getattr(self, "_spent_this_month", Decimal(0))
+    
+    @spent_this_month.setter
+    def spent_this_month(self, value):
+        self._spent_this_month = value
     
     @property
     def remaining_budget(self):
@@ -59,28 +67,32 @@ class BudgetCategory(Base):
     def budget_percentage_used(self):
         """Pourcentage du budget utilisé"""
         if self.monthly_budget > 0:
-            return (self.spent_this_month / self.monthly_budget) * 100
+            return float(self.spent_this_month / self.monthly_budget * 100)
         return 0
 
 
 class BudgetTransaction(Base):
     __tablename__ = "budget_transactions"
+    __table_args__ = (
+        Index("ix_budget_transactions_user_updated", "user_id", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)
     transaction_type = Column(Enum(TransactionType), nullable=False)
-    transaction_date = Column(DateTime(timezone=True), server_default=func.now())
+    # Sur MySQL, clé de partitionnement mensuel de la table (migration 0007)
+    transaction_date = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
     receipt_url = Column(String(500), nullable=True)  # URL vers un justificatif
     tags = Column(String(500), nullable=True)  # Tags séparés par des virgules
     is_recurring = Column(Boolean, default=False)
     recurring_interval = Column(String(50), nullable=True)  # monthly, weekly, yearly
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), onupdate=utcnow)
     
     # Clés étrangères
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     category_id = Column(Integer, ForeignKey("budget_categories.id"), nullable=True)
     
     # Relations
@@ -106,4 +118,24 @@ class BudgetTransaction(Base):
         current_tags = self.tags_list
         if tag in current_tags:
             current_tags.remove(tag)
-            self.tags = ", ".join(current_tags) 
\ No newline at end of file
+            self.tags = ", ".join(current_tags)
+
+
+class BudgetMonthTotal(Base):
+    """
+    Dépenses cumulées d'une catégorie sur un mois, tenues à jour à chaque écriture
+    de transaction (services.budget_alerts), et plus haut seuil d'alerte déjà envoyé.
+    """
+    __tablename__ = "budget_month_totals"
+    __table_args__ = (
+        UniqueConstraint("category_id", "period", name="uq_budget_month_totals_category_period"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    period = Column(Date, nullable=False)  # Premier jour du mois
+    spent = Column(Money, nullable=False, default=0)
+    alerted_percent = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), onupdate=utcnow)
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    category_id = Column(Integer, ForeignKey("budget_categories.id", ondelete="CASCADE"), nullable=False)
\ No newline at end of file
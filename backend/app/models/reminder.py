@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum, String, UniqueConstraint
+from sqlalchemy.sql import func
+from enum import Enum as PyEnum
+from ..database import Base, utcnow
+
+
+class ReminderStatus(PyEnum):
+    CLAIMED = "claimed"  # Pris en charge par un dispatcher, envoi en cours
+    SENT = "sent"        # Notification délivrée
+    FAILED = "failed"    # Échec, nouvelle tentative possible
+
+
+class TaskReminder(Base):
+    """État de livraison du rappel d'échéance d'une tâche"""
+    __tablename__ = "task_reminders"
+    __table_args__ = (
+        # Un seul rappel par échéance : reprogrammer la tâche ouvre un nouveau rappel
+        UniqueConstraint("task_id", "due_date", name="uq_task_reminders_task_due"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    due_date = Column(DateTime(timezone=True), nullable=False)
+    status = Column(Enum(ReminderStatus), nullable=False, default=ReminderStatus.CLAIMED)
+    attempts = Column(Integer, nullable=False, default=0)
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+    # Jeton de la dernière réservation : identifie les lignes réservées par un lot
+    claim_token = Column(String(32), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    
+    # Clés étrangères
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, nullable=False, index=True)
\ No newline at end of file
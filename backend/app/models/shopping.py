@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum, Float
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum, Index, bindparam, case, literal
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from decimal import Decimal
 from enum import Enum as PyEnum
-from ..database import Base
+from ..database import Base, utcnow
+from ..money import Money, to_decimal
 
 
 class ShoppingCategory(PyEnum):
@@ -19,38 +21,68 @@ class ShoppingCategory(PyEnum):
 
 class ShoppingItem(Base):
     __tablename__ = "shopping_items"
+    __table_args__ = (
+        Index("ix_shopping_items_user_updated", "user_id", "updated_at"),
+        # Historique des prix d'un article
+        Index("ix_shopping_items_user_name_purchased", "user_id", "name", "purchased_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     quantity = Column(Integer, default=1)
     unit = Column(String(50), default="unité")  # kg, L, unité, etc.
-    estimated_price = Column(Float, nullable=True)
-    actual_price = Column(Float, nullable=True)
+    estimated_price = Column(Money, nullable=True)
+    actual_price = Column(Money, nullable=True)
     category = Column(Enum(ShoppingCategory), default=ShoppingCategory.EPICERIE)
     notes = Column(String(500), nullable=True)
     completed = Column(Boolean, default=False)
     purchased_at = Column(DateTime(timezone=True), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), onupdate=utcnow)
     
     # Clé étrangère vers User
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Relations
     owner = relationship("User", back_populates="shopping_items")
     
-    def mark_purchased(self, actual_price: float = None):
+    @staticmethod
+    def purchase_values(purchased: bool, actual_price: Decimal = None) -> dict:
+        """Colonnes modifiées quand l'article est acheté ou remis dans la liste"""
+        if purchased:
+            values = {"completed": True, "purchased_at": utcnow()}
+            if actual_price is not None:
+                values["actual_price"] = to_decimal(actual_price)
+            return values
+        return {"completed": False, "purchased_at": None, "actual_price": None}
+    
+    @classmethod
+    def toggle_values(cls, actual_price: Decimal = None) -> list:
+        """
+        Affectations SQL qui basculent l'état d'achat sans lire l'article.
+    
+        `completed` est affecté en dernier : MySQL évalue les SET de gauche à droite.
+        """
+        purchasing = func.coalesce(cls.completed, False) == False  # noqa: E712
+        price = cls.actual_price if actual_price is None else literal(actual_price, cls.actual_price.type)
+        return [
+            (cls.purchased_at, case(
+                (purchasing, bindparam("purchased_at", callable_=utcnow, type_=cls.purchased_at.type)),
+                else_=None
+            )),
+            (cls.actual_price, case((purchasing, price), else_=None)),
+            (cls.completed, purchasing),
+        ]
+    
+    def mark_purchased(self, actual_price: Decimal = None):
         """Marquer l'article comme acheté"""
-        self.completed = True
-        self.purchased_at = func.now()
-        if actual_price is not None:
-            self.actual_price = actual_price
+        for field, value in self.purchase_values(True, actual_price).items():
+            setattr(self, field, value)
     
     def mark_unpurchased(self):
         """Marquer l'article comme non acheté"""
-        self.completed = False
-        self.purchased_at = None
-        self.actual_price = None
+        for field, value in self.purchase_values(False).items():
+            setattr(self, field, value)
     
     @property
     def total_estimated_cost(self):
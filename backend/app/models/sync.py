@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class SyncTombstone(Base):
+    """Trace d'une suppression, conservée pour la synchronisation différentielle"""
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (
+        Index("ix_sync_tombstones_user_deleted", "user_id", "deleted_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    # Pas de clé étrangère : la trace survit à la ligne supprimée
+    user_id = Column(Integer, nullable=False)
+    entity = Column(String(50), nullable=False)  # Nom de la table
+    entity_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
\ No newline at end of file
@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum, Index, bindparam, case, literal
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from enum import Enum as PyEnum
-from ..database import Base
+from ..database import Base, utcnow
 
 
 class TaskPriority(PyEnum):
@@ -20,6 +20,16 @@ class TaskStatus(PyEnum):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Synchronisation différentielle : changements d'un utilisateur depuis un instant
+        Index("ix_tasks_user_updated", "user_id", "updated_at"),
+        # Agenda : tâches en cours par échéance
+        Index("ix_tasks_user_completed_due", "user_id", "completed", "due_date"),
+        # Filtres par statut et priorité
+        Index("ix_tasks_user_status_priority", "user_id", "status", "priority"),
+        # Rappels : balayage global des échéances proches, tous utilisateurs confondus
+        Index("ix_tasks_completed_due", "completed", "due_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
@@ -29,23 +39,53 @@ class Task(Base):
     completed = Column(Boolean, default=False)
     due_date = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), onupdate=utcnow)
     
     # Clé étrangère vers User
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Relations
     owner = relationship("User", back_populates="tasks")
     
+    _toggle_values = None
+    
+    @staticmethod
+    def completion_values(completed: bool) -> dict:
+        """Colonnes modifiées quand la tâche est terminée ou rouverte"""
+        if completed:
+            return {"completed": True, "status": TaskStatus.COMPLETED, "completed_at": utcnow()}
+        return {"completed": False, "status": TaskStatus.PENDING, "completed_at": None}
+    
+    @classmethod
+    def toggle_values(cls) -> list:
+        """
+        Affectations SQL qui basculent l'état de la tâche sans la lire.
+    
+        `completed` est affecté en dernier : MySQL évalue les SET de gauche à droite.
+        Les expressions sont construites une fois ; l'horodatage est évalué à l'exécution.
+        """
+        if cls._toggle_values is None:
+            completing = func.coalesce(cls.completed, False) == False  # noqa: E712
+            cls._toggle_values = [
+                (cls.status, case(
+                    (completing, literal(TaskStatus.COMPLETED, cls.status.type)),
+                    else_=literal(TaskStatus.PENDING, cls.status.type)
+                )),
+                (cls.completed_at, case(
+                    (completing, bindparam("completed_at", callable_=utcnow, type_=cls.completed_at.type)),
+                    else_=None
+                )),
+                (cls.completed, completing),
+            ]
+        return cls._toggle_values
+    
     def mark_completed(self):
         """Marquer la tâche comme terminée"""
-        self.completed = True
-        self.status = TaskStatus.COMPLETED
-        self.completed_at = func.now()
+        for field, value in self.completion_values(True).items():
+            setattr(self, field, value)
     
     def mark_uncompleted(self):
         """Marquer la tâche comme non terminée"""
-        self.completed = False
-        self.status = TaskStatus.PENDING
-        self.completed_at = None 
\ No newline at end of file
+        for field, value in self.completion_values(False).items():
+            setattr(self, field, value) 
\ No newline at end of file
@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from ..database import Base
+from ..database import Base, utcnow
 
 
 class User(Base):
@@ -17,14 +17,24 @@ class User(Base):
     is_superuser = Column(Boolean, default=False)
     avatar_url = Column(String(500), nullable=True)
     timezone = Column(String(50), default="Europe/Paris")
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), onupdate=utcnow)
+    # Compte en attente de purge (voir app/services/account_purge.py)
+    deletion_requested_at = Column(DateTime(timezone=True), nullable=True, index=True)
     
     # Relations
-    tasks = relationship("Task", back_populates="owner", cascade="all, delete-orphan")
-    shopping_items = relationship("ShoppingItem", back_populates="owner", cascade="all, delete-orphan")
-    budget_categories = relationship("BudgetCategory", back_populates="owner", cascade="all, delete-orphan")
-    budget_transactions = relationship("BudgetTransaction", back_populates="owner", cascade="all, delete-orphan")
+    # passive_deletes : les lignes filles sont supprimées par la base (ON DELETE CASCADE)
+    # ou par la purge par lots, jamais chargées en mémoire pour être supprimées une à une
+    tasks = relationship("Task", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True)
+    shopping_items = relationship(
+        "ShoppingItem", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True
+    )
+    budget_categories = relationship(
+        "BudgetCategory", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True
+    )
+    budget_transactions = relationship(
+        "BudgetTransaction", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True
+    )
     
     @property
     def full_name(self):
@@ -0,0 +1,54 @@
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Annotated, Optional
+from pydantic import AfterValidator, PlainSerializer
+from sqlalchemy import BigInteger, type_coerce
+from sqlalchemy.types import TypeDecorator
+
+CENT = Decimal("0.01")
+
+
+def to_decimal(value) -> Optional[Decimal]:
+    """Montant arrondi au centime (les float passent par leur représentation décimale)"""
+    if value is None:
+        return None
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+class Money(TypeDecorator):
+    """
+    Montant stocké en centimes entiers, manipulé en Decimal côté Python.
+    
+    Les sommes sont calculées par la base sur des entiers : elles sont exactes quel
+    que soit le nombre de lignes, contrairement à SUM sur une colonne FLOAT. SUM d'une
+    colonne Money est elle-même de type Money ; une expression arithmétique
+    (quantité × prix) doit être typée explicitement avec money().
+    """
+    
+    impl = BigInteger
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return int(to_decimal(value).scaleb(2))
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # MySQL renvoie SUM(BIGINT) en DECIMAL, SQLite AVG en REAL
+        return to_decimal(Decimal(str(value)).scaleb(-2))
+
+
+def money(expression):
+    """Typer une expression SQL calculée en centimes comme un montant"""
+    return type_coerce(expression, Money())
+
+
+# Montant des schémas : accepté comme nombre, arrondi au centime, renvoyé en nombre JSON
+Amount = Annotated[
+    Decimal,
+    AfterValidator(to_decimal),
+    PlainSerializer(float, return_type=float, when_used="json"),
+]
\ No newline at end of file
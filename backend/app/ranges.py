@@ -0,0 +1,132 @@
+import os
+from typing import Mapping, Optional, Tuple
+import anyio
+from fastapi import Request, Response, status
+from starlette.types import Receive, Scope, Send
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Analyser un en-tête Range à plage unique (bytes=a-b, bytes=a-, bytes=-n).
+    
+    Retourne (début, fin) inclus, None si l'en-tête est absent, invalide ou
+    multi-plages (la réponse est alors complète), ou lève ValueError si la plage
+    est hors du fichier.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, separator, last = header[6:].strip().partition("-")
+    try:
+        start = int(first) if first else None
+        end = int(last) if last else None
+    except ValueError:
+        return None
+    if not separator or (start is None and end is None):
+        return None
+    if start is None:
+        # Suffixe : les `end` derniers octets
+        if end == 0:
+            raise ValueError("plage vide")
+        return max(0, size - end), size - 1
+    if end is not None and end < start:
+        return None
+    if start >= size:
+        raise ValueError("plage hors du fichier")
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+class RangeFileResponse(Response):
+    """
+    Réponse fichier (complète ou partielle) lue par morceaux.
+    
+    Si le serveur ASGI propose l'extension http.response.zerocopysend, le noyau
+    copie directement le fichier vers la socket (sendfile) ; sinon le fichier est
+    lu par blocs de chunk_size dans un thread.
+    """
+    
+    chunk_size = 64 * 1024
+    
+    def __init__(
+        self,
+        path: str,
+        start: int,
+        end: int,
+        media_type: str,
+        status_code: int = status.HTTP_200_OK,
+        headers: Optional[Mapping[str, str]] = None
+    ):
+        self.path = path
+        self.start = start
+        self.length = end - start + 1
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers(headers)
+        self.headers["Content-Length"] = str(self.length)
+        self.headers["Accept-Ranges"] = "bytes"
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+    
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file.wrapped.fileno(),
+                    "offset": self.start,
+                    "count": self.length,
+                    "more_body": False,
+                })
+                return
+    
+            await file.seek(self.start)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # Fichier tronqué entre-temps : terminer la réponse
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def file_response(
+    request: Request,
+    path: str,
+    media_type: str,
+    etag: str,
+    cache_control: str = "private, max-age=31536000, immutable"
+) -> Response:
+    """
+    Servir un fichier avec ETag, If-None-Match, Range et If-Range.
+    
+    Réponses : 304 si le client a déjà le fichier, 206 pour une plage valide,
+    416 pour une plage hors du fichier, 200 sinon.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Authorization"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    size = os.stat(path).st_size
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if size > 0 and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(request.headers.get("range"), size)
+        except ValueError:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={**headers, "Content-Range": f"bytes */{size}"}
+            )
+    
+    if byte_range is None:
+        return RangeFileResponse(path, 0, size - 1, media_type, headers=headers)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return RangeFileResponse(path, start, end, media_type, status.HTTP_206_PARTIAL_CONTENT, headers)
\ No newline at end of file
@@ -0,0 +1,128 @@
+from typing import Iterable, List, Sequence, Tuple, Union
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from .models.task import Task
+from .models.shopping import ShoppingItem
+from .models.budget import BudgetCategory, BudgetTransaction
+from .services.events import queue_change_event
+from .services.sync import record_deletions
+
+Values = Union[dict, Sequence[Tuple[object, object]]]
+
+
+class OwnedRepository:
+    """
+    Lignes appartenant à un utilisateur, modifiées par des requêtes filtrées sur
+    (id, user_id).
+    
+    UPDATE et DELETE sont émis directement, sans SELECT préalable : une ligne
+    absente ou appartenant à un autre utilisateur se traduit par 0 ligne touchée
+    et une 404. Ces requêtes contournent l'unité de travail de la session : les
+    traces de suppression et les événements temps réel sont donc ajoutés ici.
+    """
+    
+    def __init__(self, model, not_found: str, cascade: Iterable[Tuple[object, object]] = ()):
+        self.model = model
+        self.not_found = not_found
+        # Enfants supprimés avec la ligne (modèle, clé étrangère)
+        self.cascade = tuple(cascade)
+    
+    def _owned(self, user_id: int, obj_id: int):
+        return (self.model.id == obj_id, self.model.user_id == user_id)
+    
+    def _not_found(self) -> HTTPException:
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=self.not_found)
+    
+    def get(self, db: Session, user_id: int, obj_id: int, for_update: bool = False):
+        """
+        Charger une ligne de l'utilisateur ou lever une 404.
+    
+        `for_update` verrouille la ligne (SELECT ... FOR UPDATE) jusqu'à la fin de la
+        transaction : une précondition If-Match vérifiée sur cette lecture reste vraie
+        jusqu'à l'UPDATE, les PUT concurrents sur la même ligne étant sérialisés.
+        """
+        query = db.query(self.model).filter(*self._owned(user_id, obj_id))
+        if for_update:
+            # populate_existing : la version verrouillée remplace celle de la session
+            query = query.with_for_update().populate_existing()
+        obj = query.first()
+        if obj is None:
+            raise self._not_found()
+        return obj
+    
+    def update(self, db: Session, user_id: int, obj_id: int, values: Values):
+        """
+        Mettre à jour une ligne en une requête et retourner l'objet à jour.
+    
+        `values` est un dictionnaire ou une liste ordonnée de paires (colonne, valeur) ;
+        l'ordre compte quand une valeur dépend d'une autre colonne modifiée (MySQL
+        évalue les SET de gauche à droite). Avec RETURNING, la ligne à jour est lue
+        par la même requête ; sinon (MySQL), elle est relue par clé primaire.
+        """
+        statement = update(self.model).where(*self._owned(user_id, obj_id))
+        if isinstance(values, dict):
+            statement = statement.values(values)
+        else:
+            statement = statement.ordered_values(*values)
+        if db.get_bind().dialect.update_returning:
+            # "fetch" met aussi à jour l'objet déjà chargé dans la session (If-Match)
+            obj = db.execute(
+                statement.returning(self.model),
+                execution_options={"synchronize_session": "fetch"}
+            ).scalars().first()
+            if obj is None:
+                raise self._not_found()
+        else:
+            # rowcount compte les lignes trouvées (CLIENT_FOUND_ROWS), même inchangées
+            if db.execute(statement, execution_options={"synchronize_session": False}).rowcount == 0:
+                raise self._not_found()
+            obj = db.query(self.model).populate_existing().filter(self.model.id == obj_id).one()
+    
+        queue_change_event(db, user_id, self.model.__tablename__, obj_id, "updated")
+        return obj
+    
+    def _delete_children(self, db: Session, user_id: int, obj_id: int) -> None:
+        for child, foreign_key in self.cascade:
+            condition = (foreign_key == obj_id, child.user_id == user_id)
+            if db.get_bind().dialect.delete_returning:
+                ids = db.execute(
+                    delete(child).where(*condition).returning(child.id),
+                    execution_options={"synchronize_session": False}
+                ).scalars().all()
+            else:
+                ids = db.execute(select(child.id).where(*condition)).scalars().all()
+                if ids:
+                    db.execute(
+                        delete(child).where(child.id.in_(ids)),
+                        execution_options={"synchronize_session": False}
+                    )
+            self._record_deleted(db, child, user_id, ids)
+    
+    @staticmethod
+    def _record_deleted(db: Session, model, user_id: int, ids: List[int]) -> None:
+        record_deletions(db, model, user_id, ids)
+        for deleted_id in ids:
+            queue_change_event(db, user_id, model.__tablename__, deleted_id, "deleted")
+    
+    def delete(self, db: Session, user_id: int, obj_id: int) -> None:
+        """Supprimer une ligne (et ses enfants) en une requête par table"""
+        self._delete_children(db, user_id, obj_id)
+        result = db.execute(
+            delete(self.model).where(*self._owned(user_id, obj_id)),
+            execution_options={"synchronize_session": False}
+        )
+        if result.rowcount == 0:
+            db.rollback()
+            raise self._not_found()
+        self._record_deleted(db, self.model, user_id, [obj_id])
+
+
+tasks = OwnedRepository(Task, "Tâche non trouvée")
+shopping_items = OwnedRepository(ShoppingItem, "Article non trouvé")
+budget_categories = OwnedRepository(
+    BudgetCategory,
+    "Catégorie non trouvée",
+    cascade=((BudgetTransaction, BudgetTransaction.category_id),)
+)
+budget_transactions = OwnedRepository(BudgetTransaction, "Transaction non trouvée")
\ No newline at end of file
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from typing import List
+from ..auth import get_current_superuser
+from ..models.user import User
+from ..schemas.profiling import ProfileDetail, ProfileSummary
+from ..services.profiler import profiler
+
+router = APIRouter()
+
+
+@router.get("/profiles", response_model=List[ProfileSummary])
+async def list_profiles(current_user: User = Depends(get_current_superuser)):
+    """Lister les profils conservés, du plus récent au plus ancien"""
+    return [profile.summary() for profile in profiler.recent()]
+
+
+@router.get("/profiles/{profile_id}", response_model=ProfileDetail)
+async def get_profile(
+    profile_id: int,
+    format: str = Query("json", pattern="^(json|folded)$"),
+    current_user: User = Depends(get_current_superuser)
+):
+    """
+    Obtenir un profil.
+    
+    `format=folded` renvoie les piles au format replié (une pile par ligne suivie
+    du nombre d'échantillons), lisible par flamegraph.pl ou speedscope.
+    """
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profil non trouvé"
+        )
+    if format == "folded":
+        return PlainTextResponse(profile.folded())
+    return profile.detail(profiler.interval_ms)
\ No newline at end of file
@@ -1,17 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import os
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
 from typing import List, Optional
-from datetime import datetime, date
-from ..database import get_db
+from datetime import date
+from ..config import settings
+from ..database import get_db, utcnow
 from ..auth import get_current_active_user
+from ..etag import (
+    apply_validators, check_if_match, collection_validators, conditional_response,
+    resource_validators
+)
+from ..limits import Page, fetch_all, pagination
 from ..models.user import User
 from ..models.budget import BudgetCategory, BudgetTransaction, TransactionType
+from ..repository import budget_categories, budget_transactions
+from ..services import budget_alerts
+from ..services.budget_stats import attach_spending, budget_overview
 from ..schemas.budget import (
     BudgetCategoryCreate, BudgetCategoryUpdate, BudgetCategoryResponse,
     BudgetTransactionCreate, BudgetTransactionUpdate, BudgetTransactionResponse,
     BudgetOverview
 )
+from ..serialization import BUDGET_TRANSACTION_PROJECTION
+from ..ranges import file_response
+from ..services.receipts import (
+    MEDIA_TYPES, check_declared_size, owns_receipt, parse_name, receipt_path, receipt_url,
+    store_stream, thumbnail_path, thumbnails, upload_extension
+)
 
 router = APIRouter()
 
@@ -32,19 +47,9 @@ async def get_budget_categories(
     
     categories = query.all()
     
-    # Calculer les dépenses pour chaque catégorie
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    
-    for category in categories:
-        spent = db.query(func.sum(BudgetTransaction.amount)).filter(
-            BudgetTransaction.category_id == category.id,
-            BudgetTransaction.transaction_type == TransactionType.EXPENSE,
-            extract('month', BudgetTransaction.transaction_date) == current_month,
-            extract('year', BudgetTransaction.transaction_date) == current_year
-        ).scalar() or 0
-        
-        category.spent_this_month = spent
+    # Dépenses du mois de toutes les catégories en une requête
+    now = utcnow()
+    attach_spending(db, current_user.id, categories, now.year, now.month)
     
     return categories
 
@@ -56,27 +61,11 @@ async def get_budget_category(
     db: Session = Depends(get_db)
 ):
     """Obtenir une catégorie de budget spécifique"""
-    category = db.query(BudgetCategory).filter(
-        BudgetCategory.id == category_id,
-        BudgetCategory.user_id == current_user.id
-    ).first()
-    if not category:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Catégorie non trouvée"
-        )
+    category = budget_categories.get(db, current_user.id, category_id)
     
     # Calculer les dépenses pour cette catégorie
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    spent = db.query(func.sum(BudgetTransaction.amount)).filter(
-        BudgetTransaction.category_id == category.id,
-        BudgetTransaction.transaction_type == TransactionType.EXPENSE,
-        extract('month', BudgetTransaction.transaction_date) == current_month,
-        extract('year', BudgetTransaction.transaction_date) == current_year
-    ).scalar() or 0
-    
-    category.spent_this_month = spent
+    now = utcnow()
+    attach_spending(db, current_user.id, [category], now.year, now.month)
     
     return category
 
@@ -104,26 +93,19 @@ async def create_budget_category(
 async def update_budget_category(
     category_id: int,
     category_update: BudgetCategoryUpdate,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Mettre à jour une catégorie de budget"""
-    category = db.query(BudgetCategory).filter(
-        BudgetCategory.id == category_id,
-        BudgetCategory.user_id == current_user.id
-    ).first()
-    if not category:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Catégorie non trouvée"
-        )
+    if "if-match" in request.headers:
+        check_if_match(request, resource_validators(budget_categories.get(db, current_user.id, category_id, for_update=True)))
     
     update_data = category_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(category, field, value)
-    
+    category = budget_categories.update(db, current_user.id, category_id, update_data)
     db.commit()
-    db.refresh(category)
+    apply_validators(response, resource_validators(category))
     
     return category
 
@@ -134,18 +116,9 @@ async def delete_budget_category(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Supprimer une catégorie de budget"""
-    category = db.query(BudgetCategory).filter(
-        BudgetCategory.id == category_id,
-        BudgetCategory.user_id == current_user.id
-    ).first()
-    if not category:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Catégorie non trouvée"
-        )
-    
-    db.delete(category)
+    """Supprimer une catégorie de budget et ses transactions"""
+    budget_categories.delete(db, current_user.id, category_id)
+    budget_alerts.forget_category(db, current_user.id, category_id)
     db.commit()
     
     return {"message": "Catégorie supprimée avec succès"}
@@ -155,16 +128,24 @@ async def delete_budget_category(
 
 @router.get("/transactions", response_model=List[BudgetTransactionResponse])
 async def get_budget_transactions(
+    request: Request,
+    response: Response,
     category_id: Optional[int] = None,
     transaction_type: Optional[TransactionType] = None,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    skip: int = 0,
-    limit: int = 100,
+    page: Page = Depends(pagination),
+    fields: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Obtenir toutes les transactions de budget de l'utilisateur"""
+    """Obtenir toutes les transactions de budget de l'utilisateur (`fields` : champs à renvoyer)"""
+    projection = BUDGET_TRANSACTION_PROJECTION.only(fields)
+    validators = collection_validators(db, current_user.id, BudgetTransaction, request=request)
+    not_modified = conditional_response(request, response, validators)
+    if not_modified:
+        return not_modified
+    
     query = db.query(BudgetTransaction).filter(BudgetTransaction.user_id == current_user.id)
     
     if category_id:
@@ -179,7 +160,12 @@ async def get_budget_transactions(
     if end_date:
         query = query.filter(BudgetTransaction.transaction_date <= end_date)
     
-    transactions = query.order_by(BudgetTransaction.transaction_date.desc()).offset(skip).limit(limit).all()
+    query = query.order_by(BudgetTransaction.transaction_date.desc()).offset(page.skip).limit(page.limit)
+    if fields or settings.fast_serialization:
+        rows = await fetch_all(request, db, projection.select(query))
+        return projection.response(rows, response)
+    
+    transactions = await fetch_all(request, db, query)
     return transactions
 
 
@@ -192,22 +178,19 @@ async def create_budget_transaction(
     """Créer une nouvelle transaction de budget"""
     # Vérifier que la catégorie appartient à l'utilisateur si fournie
     if transaction_data.category_id:
-        category = db.query(BudgetCategory).filter(
-            BudgetCategory.id == transaction_data.category_id,
-            BudgetCategory.user_id == current_user.id
-        ).first()
-        if not category:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Catégorie non trouvée"
-            )
+        budget_categories.get(db, current_user.id, transaction_data.category_id)
     
     db_transaction = BudgetTransaction(
         **transaction_data.dict(),
         user_id=current_user.id
     )
+    # Date fixée ici plutôt que par la base : le mois du total est connu sans relecture
+    if db_transaction.transaction_date is None:
+        db_transaction.transaction_date = utcnow()
     
     db.add(db_transaction)
+    db.flush()
+    budget_alerts.record_change(db, current_user.id, None, budget_alerts.transaction_contribution(db_transaction))
     db.commit()
     db.refresh(db_transaction)
     
@@ -218,39 +201,32 @@ async def create_budget_transaction(
 async def update_budget_transaction(
     transaction_id: int,
     transaction_update: BudgetTransactionUpdate,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Mettre à jour une transaction de budget"""
-    transaction = db.query(BudgetTransaction).filter(
-        BudgetTransaction.id == transaction_id,
-        BudgetTransaction.user_id == current_user.id
-    ).first()
-    if not transaction:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Transaction non trouvée"
-        )
+    if "if-match" in request.headers:
+        check_if_match(request, resource_validators(
+            budget_transactions.get(db, current_user.id, transaction_id, for_update=True)
+        ))
     
     update_data = transaction_update.dict(exclude_unset=True)
     
     # Vérifier la catégorie si modifiée
     if "category_id" in update_data and update_data["category_id"]:
-        category = db.query(BudgetCategory).filter(
-            BudgetCategory.id == update_data["category_id"],
-            BudgetCategory.user_id == current_user.id
-        ).first()
-        if not category:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Catégorie non trouvée"
-            )
-    
-    for field, value in update_data.items():
-        setattr(transaction, field, value)
-    
+        budget_categories.get(db, current_user.id, update_data["category_id"])
+    
+    tracked = not budget_alerts.TRACKED_FIELDS.isdisjoint(update_data)
+    previous = budget_alerts.load_contribution(db, current_user.id, transaction_id) if tracked else None
+    transaction = budget_transactions.update(db, current_user.id, transaction_id, update_data)
+    if tracked:
+        budget_alerts.record_change(
+            db, current_user.id, previous, budget_alerts.transaction_contribution(transaction)
+        )
     db.commit()
-    db.refresh(transaction)
+    apply_validators(response, resource_validators(transaction))
     
     return transaction
 
@@ -262,58 +238,122 @@ async def delete_budget_transaction(
     db: Session = Depends(get_db)
 ):
     """Supprimer une transaction de budget"""
-    transaction = db.query(BudgetTransaction).filter(
-        BudgetTransaction.id == transaction_id,
-        BudgetTransaction.user_id == current_user.id
-    ).first()
-    if not transaction:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Transaction non trouvée"
-        )
-    
-    db.delete(transaction)
+    previous = budget_alerts.load_contribution(db, current_user.id, transaction_id)
+    budget_transactions.delete(db, current_user.id, transaction_id)
+    budget_alerts.record_change(db, current_user.id, previous, None)
     db.commit()
     
     return {"message": "Transaction supprimée avec succès"}
 
 
+# === JUSTIFICATIFS ===
+
+@router.put("/transactions/{transaction_id}/receipt", response_model=BudgetTransactionResponse)
+async def upload_transaction_receipt(
+    transaction_id: int,
+    request: Request,
+    response: Response,
+    filename: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Envoyer le justificatif d'une transaction.
+    
+    Le corps de la requête est le fichier brut, typé par son Content-Type ou par
+    l'extension de `filename`. Il est écrit sur disque au fil de sa réception ;
+    un fichier identique déjà stocké est réutilisé.
+    """
+    user_id = current_user.id
+    transaction = budget_transactions.get(db, user_id, transaction_id)
+    if "if-match" in request.headers:
+        check_if_match(request, resource_validators(transaction))
+    extension = upload_extension(request.headers.get("content-type"), filename)
+    check_declared_size(request.headers.get("content-length"))
+    
+    # Rendre la connexion au pool pendant la réception du fichier
+    db.close()
+    digest = await store_stream(request.stream(), extension)
+    
+    # Le verrou ne peut pas couvrir la réception : la précondition est revérifiée
+    # sur la ligne verrouillée, juste avant l'UPDATE
+    if "if-match" in request.headers:
+        check_if_match(request, resource_validators(budget_transactions.get(db, user_id, transaction_id, for_update=True)))
+    transaction = budget_transactions.update(
+        db, user_id, transaction_id, {"receipt_url": receipt_url(digest, extension)}
+    )
+    db.commit()
+    thumbnails.submit(digest, extension)
+    apply_validators(response, resource_validators(transaction))
+    
+    return transaction
+
+
+@router.delete("/transactions/{transaction_id}/receipt")
+async def delete_transaction_receipt(
+    transaction_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Retirer le justificatif d'une transaction (le fichier est supprimé par le balayage des orphelins)"""
+    budget_transactions.update(db, current_user.id, transaction_id, {"receipt_url": None})
+    db.commit()
+    
+    return {"message": "Justificatif supprimé avec succès"}
+
+
+@router.get("/receipts/{name}")
+async def get_receipt(
+    name: str,
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Télécharger un justificatif (requêtes partielles Range acceptées)"""
+    digest, extension = parse_name(name)
+    path = receipt_path(digest, extension)
+    if not owns_receipt(db, current_user.id, receipt_url(digest, extension)) or not os.path.exists(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Justificatif non trouvé")
+    return file_response(request, path, MEDIA_TYPES[extension], f'"{digest}"')
+
+
+@router.get("/receipts/{name}/thumbnail")
+async def get_receipt_thumbnail(
+    name: str,
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Miniature JPEG d'un justificatif image (404 tant qu'elle n'est pas générée)"""
+    digest, extension = parse_name(name)
+    if not owns_receipt(db, current_user.id, receipt_url(digest, extension)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Justificatif non trouvé")
+    path = thumbnail_path(digest)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Miniature non disponible")
+    return file_response(request, path, "image/jpeg", f'"{digest}-thumbnail"')
+
+
 # === OVERVIEW ===
 
 @router.get("/overview", response_model=BudgetOverview)
 async def get_budget_overview(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Obtenir l'aperçu global du budget"""
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    
-    # Obtenir toutes les catégories actives
-    categories = db.query(BudgetCategory).filter(
-        BudgetCategory.user_id == current_user.id,
-        BudgetCategory.is_active == True
-    ).all()
-    
-    total_budget = 0
-    total_spent = 0
-    
-    # Calculer les dépenses pour chaque catégorie
-    for category in categories:
-        spent = db.query(func.sum(BudgetTransaction.amount)).filter(
-            BudgetTransaction.category_id == category.id,
-            BudgetTransaction.transaction_type == TransactionType.EXPENSE,
-            extract('month', BudgetTransaction.transaction_date) == current_month,
-            extract('year', BudgetTransaction.transaction_date) == current_year
-        ).scalar() or 0
-        
-        category.spent_this_month = spent
-        total_budget += category.monthly_budget
-        total_spent += spent
-    
-    return BudgetOverview(
-        total_budget=total_budget,
-        total_spent=total_spent,
-        remaining_budget=total_budget - total_spent,
-        categories=categories
-    ) 
\ No newline at end of file
+    # Mois courant en UTC, comme les dates de transaction stockées
+    now = utcnow()
+    
+    # Les montants dépendent du mois courant : il fait partie de la version
+    validators = collection_validators(
+        db, current_user.id, BudgetCategory, BudgetTransaction,
+        extra=(now.year, now.month)
+    )
+    not_modified = conditional_response(request, response, validators)
+    if not_modified:
+        return not_modified
+    
+    return budget_overview(db, current_user.id, now.year, now.month) 
\ No newline at end of file
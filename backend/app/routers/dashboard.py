@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.orm import Session
+from ..database import get_db, utcnow
+from ..auth import get_current_active_user
+from ..etag import collection_validators, conditional_response, resource_validators
+from ..limits import Page, fetch_all, pagination
+from ..models.user import User
+from ..models.task import Task
+from ..models.shopping import ShoppingItem
+from ..models.budget import BudgetCategory, BudgetTransaction
+from ..schemas.dashboard import DashboardResponse
+from ..serialization import TASK_PROJECTION
+from ..services.budget_stats import budget_overview
+from ..services.shopping_stats import shopping_summary
+
+router = APIRouter()
+
+
+@router.get("/", response_model=DashboardResponse)
+async def get_dashboard(
+    request: Request,
+    response: Response,
+    page: Page = Depends(pagination),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Écran d'accueil en un seul appel : `/api/users/me`, `/api/tasks/`,
+    `/api/shopping/stats/summary` et `/api/budget/overview`.
+    
+    Une seule authentification et une seule connexion du pool ; la version des
+    quatre collections et du profil est calculée en une requête d'agrégat, et un
+    client à jour reçoit 304 sans qu'aucune donnée ne soit chargée.
+    """
+    # Mois du budget en UTC, comme /api/budget/overview et les dates stockées
+    now = utcnow()
+    validators = collection_validators(
+        db, current_user.id, Task, ShoppingItem, BudgetCategory, BudgetTransaction,
+        request=request,
+        extra=(resource_validators(current_user).etag, now.year, now.month)
+    )
+    not_modified = conditional_response(request, response, validators)
+    if not_modified:
+        return not_modified
+    
+    query = db.query(Task).filter(Task.user_id == current_user.id).offset(page.skip).limit(page.limit)
+    tasks = TASK_PROJECTION.serialize(await fetch_all(request, db, TASK_PROJECTION.select(query)))
+    
+    return DashboardResponse(
+        user=current_user,
+        tasks=tasks,
+        shopping=shopping_summary(db, current_user.id),
+        budget=budget_overview(db, current_user.id, now.year, now.month)
+    )
\ No newline at end of file
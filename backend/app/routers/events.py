@@ -0,0 +1,47 @@
+import json
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from ..auth import get_current_active_user_id
+from ..config import settings
+from ..services.events import Subscriber, broker
+
+router = APIRouter()
+
+
+@router.get("/stream")
+async def stream_events(user_id: int = Depends(get_current_active_user_id)):
+    """
+    Flux Server-Sent Events des changements de l'utilisateur.
+    
+    Chaque événement `changes` contient les lignes créées, modifiées ou supprimées
+    (entité, id, action) ; le client recharge le détail via /api/sync.
+    Un événement `resync` signale que des changements ont été perdus.
+    """
+    if broker.hub.connection_count >= settings.events_max_connections:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Trop de connexions temps réel sur ce serveur"
+        )
+    
+    # Aucune session ni connexion n'est gardée pendant toute la durée du flux
+    subscriber = Subscriber(user_id)
+    await broker.subscribe(subscriber)
+    
+    async def event_stream():
+        try:
+            yield f"retry: {settings.events_heartbeat_seconds * 1000}\n\n"
+            while True:
+                batch = await subscriber.next_batch(settings.events_heartbeat_seconds)
+                if batch is None:
+                    # Battement de cœur : garde la connexion ouverte derrière les proxies
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {batch['type']}\ndata: {json.dumps(batch)}\n\n"
+        finally:
+            await broker.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
\ No newline at end of file
@@ -1,25 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from decimal import Decimal
+from ..config import settings
 from ..database import get_db
 from ..auth import get_current_active_user
+from ..etag import (
+    apply_validators, check_if_match, collection_validators, conditional_response,
+    resource_validators
+)
+from ..limits import Page, fetch_all, pagination
 from ..models.user import User
 from ..models.shopping import ShoppingItem
-from ..schemas.shopping import ShoppingItemCreate, ShoppingItemUpdate, ShoppingItemResponse
+from ..repository import shopping_items
+from ..services.archive import collection_models, with_archive
+from ..services.autocomplete import suggestions
+from ..services.shopping_stats import price_history, shopping_summary
+from ..schemas.shopping import (
+    PriceHistory, ShoppingItemCreate, ShoppingItemUpdate, ShoppingItemResponse, ShoppingSuggestion,
+    ShoppingSummary
+)
+from ..serialization import SHOPPING_ITEM_PROJECTION
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[ShoppingItemResponse])
 async def get_shopping_items(
+    request: Request,
+    response: Response,
     completed: Optional[bool] = None,
     category: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
+    page: Page = Depends(pagination),
+    fields: Optional[str] = None,
+    include_archived: bool = False,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Obtenir tous les articles de courses de l'utilisateur"""
+    """
+    Obtenir tous les articles de courses de l'utilisateur (`fields` : champs à renvoyer).
+    
+    `include_archived` ajoute les articles archivés (achetés depuis longtemps).
+    """
+    projection = SHOPPING_ITEM_PROJECTION.only(fields)
+    models = collection_models(ShoppingItem, include_archived)
+    validators = collection_validators(db, current_user.id, *models, request=request)
+    not_modified = conditional_response(request, response, validators)
+    if not_modified:
+        return not_modified
+    
     query = db.query(ShoppingItem).filter(ShoppingItem.user_id == current_user.id)
     
     if completed is not None:
@@ -28,26 +57,45 @@ async def get_shopping_items(
     if category:
         query = query.filter(ShoppingItem.category == category)
     
-    items = query.offset(skip).limit(limit).all()
+    query = query.offset(page.skip).limit(page.limit)
+    if include_archived:
+        statement = with_archive(projection.select(query), ShoppingItem, current_user.id)
+        rows = await fetch_all(request, db, statement)
+        return projection.response(rows, response)
+    
+    if fields or settings.fast_serialization:
+        rows = await fetch_all(request, db, projection.select(query))
+        return projection.response(rows, response)
+    
+    items = await fetch_all(request, db, query)
     return items
 
 
+@router.get("/suggestions", response_model=List[ShoppingSuggestion])
+async def get_suggestions(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Suggérer des articles déjà ajoutés dont un mot commence par `q`"""
+    return suggestions.get(db, current_user.id).search(q, limit)
+
+
 @router.get("/{item_id}", response_model=ShoppingItemResponse)
 async def get_shopping_item(
     item_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Obtenir un article de courses spécifique"""
-    item = db.query(ShoppingItem).filter(
-        ShoppingItem.id == item_id, 
-        ShoppingItem.user_id == current_user.id
-    ).first()
-    if not item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Article non trouvé"
-        )
+    item = shopping_items.get(db, current_user.id, item_id)
+    
+    not_modified = conditional_response(request, response, resource_validators(item))
+    if not_modified:
+        return not_modified
     return item
 
 
@@ -66,6 +114,7 @@ async def create_shopping_item(
     db.add(db_item)
     db.commit()
     db.refresh(db_item)
+    suggestions.record_added(current_user.id, db_item)
     
     return db_item
 
@@ -74,38 +123,37 @@ async def create_shopping_item(
 async def update_shopping_item(
     item_id: int,
     item_update: ShoppingItemUpdate,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Mettre à jour un article de courses"""
-    item = db.query(ShoppingItem).filter(
-        ShoppingItem.id == item_id, 
-        ShoppingItem.user_id == current_user.id
-    ).first()
-    if not item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Article non trouvé"
-        )
-    
     update_data = item_update.dict(exclude_unset=True)
+    fields = set(update_data)
+    
+    # L'état précédent n'est lu que s'il est nécessaire (If-Match, passage à acheté),
+    # verrouillé jusqu'au commit pour que la précondition tienne jusqu'à l'UPDATE
+    purchased = False
+    if "if-match" in request.headers or update_data.get("completed") is True:
+        item = shopping_items.get(db, current_user.id, item_id, for_update=True)
+        check_if_match(request, resource_validators(item))
+        purchased = update_data.get("completed") is True and not item.completed
     
     # Gestion spéciale pour le changement de statut completed
+    values = {}
     if "completed" in update_data:
-        if update_data["completed"]:
-            actual_price = update_data.get("actual_price")
-            item.mark_purchased(actual_price)
-        else:
-            item.mark_unpurchased()
-        # Retirer de update_data pour éviter la double mise à jour
-        del update_data["completed"]
-    
-    # Mettre à jour les autres champs
-    for field, value in update_data.items():
-        setattr(item, field, value)
+        values.update(ShoppingItem.purchase_values(
+            update_data.pop("completed"), update_data.get("actual_price")
+        ))
     
+    # Les autres champs l'emportent
+    values.update(update_data)
+    
+    item = shopping_items.update(db, current_user.id, item_id, values)
     db.commit()
-    db.refresh(item)
+    suggestions.record_update(current_user.id, item, fields, purchased)
+    apply_validators(response, resource_validators(item))
     
     return item
 
@@ -117,18 +165,9 @@ async def delete_shopping_item(
     db: Session = Depends(get_db)
 ):
     """Supprimer un article de courses"""
-    item = db.query(ShoppingItem).filter(
-        ShoppingItem.id == item_id, 
-        ShoppingItem.user_id == current_user.id
-    ).first()
-    if not item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Article non trouvé"
-        )
-    
-    db.delete(item)
+    shopping_items.delete(db, current_user.id, item_id)
     db.commit()
+    suggestions.invalidate(current_user.id)
     
     return {"message": "Article supprimé avec succès"}
 
@@ -136,48 +175,51 @@ async def delete_shopping_item(
 @router.patch("/{item_id}/toggle", response_model=ShoppingItemResponse)
 async def toggle_item_completion(
     item_id: int,
-    actual_price: Optional[float] = None,
+    actual_price: Optional[Decimal] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Basculer l'état d'achat d'un article"""
-    item = db.query(ShoppingItem).filter(
-        ShoppingItem.id == item_id, 
-        ShoppingItem.user_id == current_user.id
-    ).first()
-    if not item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Article non trouvé"
-        )
-    
+    item = shopping_items.update(db, current_user.id, item_id, ShoppingItem.toggle_values(actual_price))
+    db.commit()
     if item.completed:
-        item.mark_unpurchased()
+        suggestions.record_purchase(current_user.id, item)
     else:
-        item.mark_purchased(actual_price)
-    
-    db.commit()
-    db.refresh(item)
+        suggestions.invalidate(current_user.id)
     
     return item
 
 
-@router.get("/stats/summary")
+@router.get("/stats/summary", response_model=ShoppingSummary)
 async def get_shopping_summary(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Obtenir un résumé des statistiques de courses (avancement, dépenses, écart de prix)"""
+    validators = collection_validators(db, current_user.id, ShoppingItem)
+    not_modified = conditional_response(request, response, validators)
+    if not_modified:
+        return not_modified
+    
+    return shopping_summary(db, current_user.id)
+
+
+@router.get("/stats/prices", response_model=PriceHistory)
+async def get_price_history(
+    request: Request,
+    response: Response,
+    name: str = Query(..., min_length=1, max_length=255),
+    limit: int = Query(50, ge=1, le=500),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Obtenir un résumé des statistiques de courses"""
-    total_items = db.query(ShoppingItem).filter(ShoppingItem.user_id == current_user.id).count()
-    completed_items = db.query(ShoppingItem).filter(
-        ShoppingItem.user_id == current_user.id,
-        ShoppingItem.completed == True
-    ).count()
-    pending_items = total_items - completed_items
-    
-    return {
-        "total_items": total_items,
-        "completed_items": completed_items,
-        "pending_items": pending_items,
-        "completion_rate": (completed_items / total_items * 100) if total_items > 0 else 0
-    } 
\ No newline at end of file
+    """Historique des prix payés pour un article, par nom (achats archivés compris)"""
+    models = collection_models(ShoppingItem, include_archived=True)
+    validators = collection_validators(db, current_user.id, *models, request=request)
+    not_modified = conditional_response(request, response, validators)
+    if not_modified:
+        return not_modified
+    
+    return price_history(db, current_user.id, name.strip(), limit)
\ No newline at end of file
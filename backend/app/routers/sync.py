@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
+from ..database import get_db
+from ..auth import get_current_active_user
+from ..limits import Page, cursor_pagination
+from ..models.user import User
+from ..schemas.sync import SyncResponse
+from ..services.sync import collect_changes
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SyncResponse)
+async def sync_changes(
+    since: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    page: Page = Depends(cursor_pagination),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtenir les changements depuis le watermark du client.
+    
+    Le client conserve le `watermark` de la réponse et le renvoie tel quel
+    dans `since` à la synchronisation suivante. Un instantané complet est
+    paginé (`limit`, plafonné comme les listes) : tant que `cursor` n'est pas
+    nul, le client le renvoie pour obtenir la page suivante.
+    """
+    return collect_changes(db, current_user.id, since, cursor, page.limit)
\ No newline at end of file
@@ -1,25 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import datetime
+from ..config import settings
 from ..database import get_db
 from ..auth import get_current_active_user
+from ..etag import (
+    apply_validators, check_if_match, collection_validators, conditional_response,
+    resource_validators
+)
+from ..limits import Page, fetch_all, pagination
 from ..models.user import User
 from ..models.task import Task, TaskStatus
+from ..repository import tasks
+from ..services.agenda import AgendaWindow, agenda_query, urgency_order
+from ..services.archive import collection_models, with_archive
 from ..schemas.task import TaskCreate, TaskUpdate, TaskResponse
+from ..serialization import TASK_PROJECTION
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[TaskResponse])
 async def get_tasks(
+    request: Request,
+    response: Response,
     completed: Optional[bool] = None,
     priority: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
+    status_filter: Optional[TaskStatus] = Query(None, alias="status"),
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    sort: Optional[str] = Query(None, pattern="^(urgency|due_date)$"),
+    page: Page = Depends(pagination),
+    fields: Optional[str] = None,
+    include_archived: bool = False,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Obtenir toutes les tâches de l'utilisateur"""
+    """
+    Obtenir toutes les tâches de l'utilisateur (`fields` : champs à renvoyer, ex. id,title,completed).
+    
+    `include_archived` ajoute les tâches archivées (terminées depuis longtemps).
+    """
+    projection = TASK_PROJECTION.only(fields)
+    models = collection_models(Task, include_archived)
+    validators = collection_validators(db, current_user.id, *models, request=request)
+    not_modified = conditional_response(request, response, validators)
+    if not_modified:
+        return not_modified
+    
     query = db.query(Task).filter(Task.user_id == current_user.id)
     
     if completed is not None:
@@ -28,23 +57,67 @@ async def get_tasks(
     if priority:
         query = query.filter(Task.priority == priority)
     
-    tasks = query.offset(skip).limit(limit).all()
+    if status_filter:
+        query = query.filter(Task.status == status_filter)
+    
+    if due_after:
+        query = query.filter(Task.due_date >= due_after)
+    
+    if due_before:
+        query = query.filter(Task.due_date < due_before)
+    
+    if sort == "urgency":
+        query = urgency_order(query)
+    elif sort == "due_date":
+        query = query.order_by(Task.due_date.is_(None), Task.due_date, Task.id)
+    
+    query = query.offset(page.skip).limit(page.limit)
+    if include_archived:
+        statement = with_archive(projection.select(query), Task, current_user.id)
+        rows = await fetch_all(request, db, statement)
+        return projection.response(rows, response)
+    
+    if fields or settings.fast_serialization:
+        rows = await fetch_all(request, db, projection.select(query))
+        return projection.response(rows, response)
+    
+    tasks = await fetch_all(request, db, query)
     return tasks
 
 
+@router.get("/agenda/{window}", response_model=List[TaskResponse])
+async def get_agenda(
+    window: AgendaWindow,
+    request: Request,
+    response: Response,
+    days: int = Query(7, ge=1, le=90),
+    page: Page = Depends(pagination),
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Tâches en retard, du jour ou des `days` prochains jours, par priorité puis échéance"""
+    projection = TASK_PROJECTION.only(fields)
+    query = agenda_query(db, current_user.id, window, current_user.timezone, days)
+    query = query.offset(page.skip).limit(page.limit)
+    rows = await fetch_all(request, db, projection.select(query))
+    return projection.response(rows, response)
+
+
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Obtenir une tâche spécifique"""
-    task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Tâche non trouvée"
-        )
+    task = tasks.get(db, current_user.id, task_id)
+    
+    not_modified = conditional_response(request, response, resource_validators(task))
+    if not_modified:
+        return not_modified
     return task
 
 
@@ -71,34 +144,28 @@ async def create_task(
 async def update_task(
     task_id: int,
     task_update: TaskUpdate,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Mettre à jour une tâche"""
-    task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Tâche non trouvée"
-        )
+    if "if-match" in request.headers:
+        check_if_match(request, resource_validators(tasks.get(db, current_user.id, task_id, for_update=True)))
     
     update_data = task_update.dict(exclude_unset=True)
     
     # Gestion spéciale pour le changement de statut completed
+    values = {}
     if "completed" in update_data:
-        if update_data["completed"]:
-            task.mark_completed()
-        else:
-            task.mark_uncompleted()
-        # Retirer de update_data pour éviter la double mise à jour
-        del update_data["completed"]
+        values.update(Task.completion_values(update_data.pop("completed")))
     
-    # Mettre à jour les autres champs
-    for field, value in update_data.items():
-        setattr(task, field, value)
+    # Les autres champs l'emportent (ex. un statut explicite)
+    values.update(update_data)
     
+    task = tasks.update(db, current_user.id, task_id, values)
     db.commit()
-    db.refresh(task)
+    apply_validators(response, resource_validators(task))
     
     return task
 
@@ -110,14 +177,7 @@ async def delete_task(
     db: Session = Depends(get_db)
 ):
     """Supprimer une tâche"""
-    task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Tâche non trouvée"
-        )
-    
-    db.delete(task)
+    tasks.delete(db, current_user.id, task_id)
     db.commit()
     
     return {"message": "Tâche supprimée avec succès"}
@@ -130,19 +190,7 @@ async def toggle_task_completion(
     db: Session = Depends(get_db)
 ):
     """Basculer l'état de completion d'une tâche"""
-    task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Tâche non trouvée"
-        )
-    
-    if task.completed:
-        task.mark_uncompleted()
-    else:
-        task.mark_completed()
-    
+    task = tasks.update(db, current_user.id, task_id, Task.toggle_values())
     db.commit()
-    db.refresh(task)
     
-    return task 
\ No newline at end of file
+    return task
\ No newline at end of file
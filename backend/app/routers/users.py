@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
-from ..database import get_db
+from ..database import SessionLocal, get_db
 from ..auth import get_current_active_user, get_password_hash
 from ..models.user import User
 from ..schemas.user import UserUpdate, UserResponse
+from ..services.account_purge import purge_user, request_deletion
 
 router = APIRouter()
 
@@ -55,12 +56,18 @@ async def update_current_user(
     return current_user
 
 
-@router.delete("/me")
+@router.delete("/me", status_code=status.HTTP_202_ACCEPTED)
 async def delete_current_user(
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Supprimer le compte de l'utilisateur actuel"""
-    db.delete(current_user)
-    db.commit()
-    return {"message": "Compte supprimé avec succès"} 
\ No newline at end of file
+    """
+    Supprimer le compte de l'utilisateur actuel.
+    
+    Le compte est désactivé immédiatement ; ses données sont purgées par lots
+    après la réponse.
+    """
+    request_deletion(db, current_user)
+    background_tasks.add_task(purge_user, SessionLocal, current_user.id)
+    return {"message": "Suppression du compte programmée"} 
\ No newline at end of file
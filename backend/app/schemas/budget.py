@@ -2,12 +2,13 @@ from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 from ..models.budget import BudgetCategoryType, TransactionType
+from ..money import Amount
 
 
 class BudgetCategoryBase(BaseModel):
     name: str
     category_type: BudgetCategoryType
-    monthly_budget: float
+    monthly_budget: Amount
     color: str = "#3B82F6"
     icon: Optional[str] = None
     description: Optional[str] = None
@@ -20,7 +21,7 @@ class BudgetCategoryCreate(BudgetCategoryBase):
 class BudgetCategoryUpdate(BaseModel):
     name: Optional[str] = None
     category_type: Optional[BudgetCategoryType] = None
-    monthly_budget: Optional[float] = None
+    monthly_budget: Optional[Amount] = None
     color: Optional[str] = None
     icon: Optional[str] = None
     description: Optional[str] = None
@@ -33,8 +34,8 @@ class BudgetCategoryResponse(BudgetCategoryBase):
     created_at: datetime
     updated_at: datetime
     user_id: int
-    spent_this_month: float
-    remaining_budget: float
+    spent_this_month: Amount
+    remaining_budget: Amount
     budget_percentage_used: float
 
     class Config:
@@ -44,7 +45,7 @@ class BudgetCategoryResponse(BudgetCategoryBase):
 class BudgetTransactionBase(BaseModel):
     title: str
     description: Optional[str] = None
-    amount: float
+    amount: Amount
     transaction_type: TransactionType
     transaction_date: Optional[datetime] = None
     receipt_url: Optional[str] = None
@@ -60,7 +61,7 @@ class BudgetTransactionCreate(BudgetTransactionBase):
 class BudgetTransactionUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
-    amount: Optional[float] = None
+    amount: Optional[Amount] = None
     transaction_type: Optional[TransactionType] = None
     transaction_date: Optional[datetime] = None
     receipt_url: Optional[str] = None
@@ -84,7 +85,7 @@ class BudgetTransactionResponse(BudgetTransactionBase):
 
 class BudgetOverview(BaseModel):
     """Aperçu global du budget"""
-    total_budget: float
-    total_spent: float
-    remaining_budget: float
+    total_budget: Amount
+    total_spent: Amount
+    remaining_budget: Amount
     categories: List[BudgetCategoryResponse] 
\ No newline at end of file
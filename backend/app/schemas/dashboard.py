@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List
+from .user import UserResponse
+from .task import TaskResponse
+from .shopping import ShoppingSummary
+from .budget import BudgetOverview
+
+
+class DashboardResponse(BaseModel):
+    """Écran d'accueil : utilisateur, tâches, résumé des courses et aperçu du budget"""
+    user: UserResponse
+    tasks: List[TaskResponse]
+    shopping: ShoppingSummary
+    budget: BudgetOverview
\ No newline at end of file
@@ -0,0 +1,39 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+
+class ProfileSummary(BaseModel):
+    """Résumé d'un profil de requête"""
+    id: int
+    method: str
+    path: str
+    status_code: Optional[int] = None
+    reason: str
+    started_at: datetime
+    duration_ms: float
+    samples: int
+    sql_count: int
+    sql_ms: float
+
+
+class ProfileStack(BaseModel):
+    """Pile d'appels repliée et nombre d'échantillons"""
+    stack: str
+    samples: int
+
+
+class ProfileQuery(BaseModel):
+    """Requête SQL, décalée depuis le début de la requête HTTP"""
+    start_ms: float
+    duration_ms: float
+    statement: str
+
+
+class ProfileDetail(ProfileSummary):
+    """Profil complet : piles échantillonnées et chronologie SQL"""
+    interval_ms: float
+    dropped_samples: int
+    dropped_queries: int
+    stacks: List[ProfileStack]
+    sql: List[ProfileQuery]
\ No newline at end of file
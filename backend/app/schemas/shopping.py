@@ -1,14 +1,15 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from ..models.shopping import ShoppingCategory
+from ..money import Amount
 
 
 class ShoppingItemBase(BaseModel):
     name: str
     quantity: int = 1
     unit: str = "unité"
-    estimated_price: Optional[float] = None
+    estimated_price: Optional[Amount] = None
     category: ShoppingCategory = ShoppingCategory.EPICERIE
     notes: Optional[str] = None
 
@@ -21,8 +22,8 @@ class ShoppingItemUpdate(BaseModel):
     name: Optional[str] = None
     quantity: Optional[int] = None
     unit: Optional[str] = None
-    estimated_price: Optional[float] = None
-    actual_price: Optional[float] = None
+    estimated_price: Optional[Amount] = None
+    actual_price: Optional[Amount] = None
     category: Optional[ShoppingCategory] = None
     notes: Optional[str] = None
     completed: Optional[bool] = None
@@ -30,14 +31,70 @@ class ShoppingItemUpdate(BaseModel):
 
 class ShoppingItemResponse(ShoppingItemBase):
     id: int
-    actual_price: Optional[float] = None
+    actual_price: Optional[Amount] = None
     completed: bool
     purchased_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
     user_id: int
-    total_estimated_cost: float
-    total_actual_cost: float
+    total_estimated_cost: Amount
+    total_actual_cost: Amount
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+
+class ShoppingSuggestion(BaseModel):
+    """Suggestion d'article tirée de l'historique"""
+    name: str
+    unit: Optional[str] = None
+    category: Optional[ShoppingCategory] = None
+    average_price: Optional[Amount] = None
+    times_added: int
+    last_added_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ShoppingCategorySummary(BaseModel):
+    """Statistiques d'une catégorie de courses"""
+    category: ShoppingCategory
+    total_items: int
+    completed_items: int
+    estimated_total: Amount
+    actual_total: Amount
+
+
+class ShoppingSummary(BaseModel):
+    """Résumé des courses : avancement, dépenses estimées et réelles"""
+    total_items: int
+    completed_items: int
+    pending_items: int
+    completion_rate: float
+    estimated_total: Amount
+    pending_estimated_total: Amount
+    actual_total: Amount
+    # Écart réel - estimé sur les articles achetés dont les deux prix sont connus
+    compared_items: int
+    price_variance: Amount
+    price_variance_rate: Optional[float] = None
+    categories: List[ShoppingCategorySummary]
+
+
+class PricePoint(BaseModel):
+    """Prix payé lors d'un achat"""
+    purchased_at: datetime
+    actual_price: Amount
+    quantity: int
+    unit: Optional[str] = None
+
+
+class PriceHistory(BaseModel):
+    """Historique des prix d'achat d'un article"""
+    name: str
+    purchases: int
+    min_price: Optional[Amount] = None
+    max_price: Optional[Amount] = None
+    average_price: Optional[Amount] = None
+    points: List[PricePoint]
\ No newline at end of file
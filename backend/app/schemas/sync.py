@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+from datetime import datetime
+from .task import TaskResponse
+from .shopping import ShoppingItemResponse
+from .budget import BudgetCategoryResponse, BudgetTransactionResponse
+
+T = TypeVar("T")
+
+
+class SyncChanges(BaseModel, Generic[T]):
+    """Changements d'une collection depuis le watermark du client"""
+    created: List[T] = []
+    updated: List[T] = []
+    deleted: List[int] = []
+
+
+class SyncResponse(BaseModel):
+    """Réponse de synchronisation différentielle"""
+    watermark: datetime
+    full: bool
+    cursor: Optional[str] = None  # Page suivante de l'instantané complet, None sur la dernière
+    tasks: SyncChanges[TaskResponse]
+    shopping_items: SyncChanges[ShoppingItemResponse]
+    budget_categories: SyncChanges[BudgetCategoryResponse]
+    budget_transactions: SyncChanges[BudgetTransactionResponse]
\ No newline at end of file
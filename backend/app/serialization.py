@@ -0,0 +1,141 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from fastapi import HTTPException, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import case
+from sqlalchemy.orm import Query
+from .models.task import Task
+from .models.shopping import ShoppingItem
+from .models.budget import BudgetTransaction
+from .money import Money, money
+from .schemas.task import TaskResponse
+from .schemas.shopping import ShoppingItemResponse
+from .schemas.budget import BudgetTransactionResponse
+
+
+class Projection:
+    """
+    Colonnes nécessaires à un schéma de réponse, lues comme des tuples.
+    
+    Évite de charger des objets ORM puis de les valider un par un avec Pydantic :
+    les lignes sont converties en dictionnaires et encodées directement par orjson.
+    Les champs calculés sont fournis soit comme expressions SQL, soit comme
+    fonctions Python appliquées au dictionnaire de la ligne (avec les colonnes
+    dont elles dépendent).
+    """
+    
+    def __init__(
+        self,
+        model,
+        schema,
+        expressions: Optional[Dict[str, object]] = None,
+        computed: Optional[Dict[str, Tuple[Callable[[dict], object], List[str]]]] = None,
+        fields: Optional[List[str]] = None
+    ):
+        self.model = model
+        self.schema = schema
+        self.expressions = expressions or {}
+        self.computed = computed or {}
+        self.fields = fields or list(schema.model_fields)
+        
+        # Colonnes lues : champs demandés + dépendances des champs calculés
+        needed = [field for field in self.fields if field not in self.computed]
+        for field in self.fields:
+            if field in self.computed:
+                needed.extend(dep for dep in self.computed[field][1] if dep not in needed)
+        
+        self.columns = []
+        for field in needed:
+            if field in self.expressions:
+                self.columns.append(self.expressions[field].label(field))
+            else:
+                self.columns.append(getattr(model, field))
+        self.keys = [column.key for column in self.columns]
+        self._hidden = [key for key in self.keys if key not in self.fields]
+        # Montants lus en Decimal : orjson ne les encode pas, ils sont renvoyés en nombres
+        self._amounts = [column.key for column in self.columns if isinstance(column.type, Money)]
+    
+    def only(self, fields: Optional[str]) -> "Projection":
+        """
+        Restreindre la projection à une liste de champs séparés par des virgules.
+        
+        L'identifiant est toujours renvoyé ; un champ inconnu du schéma produit une 400.
+        """
+        if not fields:
+            return self
+        
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in self.schema.model_fields]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Champs inconnus : {', '.join(unknown)}"
+            )
+        
+        selected = ["id"] + [field for field in requested if field != "id"]
+        return Projection(
+            self.model, self.schema, self.expressions, self.computed,
+            fields=list(dict.fromkeys(selected))
+        )
+    
+    def serialize(self, rows) -> List[dict]:
+        """Convertir des tuples en dictionnaires conformes au schéma"""
+        keys = self.keys
+        hidden = self._hidden
+        amounts = self._amounts
+        computed = [(field, self.computed[field][0]) for field in self.fields if field in self.computed]
+        items = []
+        for row in rows:
+            item = dict(zip(keys, row))
+            for key in amounts:
+                if item[key] is not None:
+                    item[key] = float(item[key])
+            for field, compute in computed:
+                item[field] = compute(item)
+            for key in hidden:
+                del item[key]
+            items.append(item)
+        return items
+    
+    def select(self, query: Query) -> Query:
+        """Restreindre une requête ORM aux seules colonnes projetées"""
+        return query.with_entities(*self.columns)
+    
+    def response(self, rows, response: Optional[Response] = None) -> ORJSONResponse:
+        """Encoder les lignes projetées"""
+        fast_response = ORJSONResponse(self.serialize(rows))
+        if response is not None:
+            # Conserver les en-têtes posés sur la réponse injectée (ETag, ...)
+            fast_response.headers.update(response.headers)
+        return fast_response
+
+
+def _total_cost(price_column):
+    return money(case(
+        (price_column.isnot(None), ShoppingItem.quantity * price_column),
+        else_=0
+    ))
+
+
+def _tags_list(item: dict) -> List[str]:
+    tags = item["tags"]
+    if tags:
+        return [tag.strip() for tag in tags.split(",")]
+    return []
+
+
+TASK_PROJECTION = Projection(Task, TaskResponse)
+
+SHOPPING_ITEM_PROJECTION = Projection(
+    ShoppingItem,
+    ShoppingItemResponse,
+    expressions={
+        "total_estimated_cost": _total_cost(ShoppingItem.estimated_price),
+        "total_actual_cost": _total_cost(ShoppingItem.actual_price),
+    }
+)
+
+BUDGET_TRANSACTION_PROJECTION = Projection(
+    BudgetTransaction,
+    BudgetTransactionResponse,
+    computed={"tags_list": (_tags_list, ["tags"])}
+)
\ No newline at end of file
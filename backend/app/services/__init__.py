@@ -0,0 +1 @@
+# Services métier de l'API LifeHub
\ No newline at end of file
@@ -0,0 +1,112 @@
+import argparse
+import logging
+from typing import Callable, Dict, Optional
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import utcnow
+from ..models.user import User
+from ..models.task import Task
+from ..models.shopping import ShoppingItem
+from ..models.budget import BudgetCategory, BudgetMonthTotal, BudgetTransaction
+from ..models.sync import SyncTombstone
+from ..models.reminder import TaskReminder
+from ..models.archive import ArchivedShoppingItem, ArchivedTask
+
+logger = logging.getLogger(__name__)
+
+# Tables purgées, enfants avant parents (clés étrangères)
+PURGE_ORDER = (
+    TaskReminder, Task, ShoppingItem, ArchivedTask, ArchivedShoppingItem,
+    BudgetTransaction, BudgetMonthTotal, BudgetCategory, SyncTombstone
+)
+
+
+def request_deletion(db: Session, user: User) -> None:
+    """
+    Désactiver le compte et le marquer pour la purge.
+    
+    Le compte devient inutilisable immédiatement (is_active) ; ses données sont
+    supprimées ensuite par purge_user, hors de la requête.
+    """
+    db.execute(
+        update(User).where(User.id == user.id).values(is_active=False, deletion_requested_at=utcnow()),
+        execution_options={"synchronize_session": False}
+    )
+    db.commit()
+
+
+def _purge_table(session_factory: Callable[[], Session], model, user_id: int, batch_size: int) -> int:
+    """Supprimer les lignes d'un utilisateur par lots d'identifiants, une transaction par lot"""
+    deleted = 0
+    while True:
+        with session_factory() as db:
+            ids = db.execute(
+                select(model.id).where(model.user_id == user_id).order_by(model.id).limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                return deleted
+            db.execute(delete(model).where(model.id.in_(ids)), execution_options={"synchronize_session": False})
+            db.commit()
+        deleted += len(ids)
+
+
+def purge_user(
+    session_factory: Callable[[], Session],
+    user_id: int,
+    batch_size: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Supprimer toutes les données d'un compte marqué, puis le compte.
+    
+    Chaque lot est une transaction courte sur au plus `batch_size` lignes : la
+    mémoire et la durée des verrous sont bornées quel que soit le volume du compte.
+    Une purge interrompue reprend là où elle s'est arrêtée (purge_pending). Aucune
+    trace de suppression n'est écrite : les traces du compte sont elles-mêmes purgées.
+    """
+    batch_size = batch_size or settings.account_purge_batch_size
+    with session_factory() as db:
+        pending = db.execute(
+            select(User.id).where(User.id == user_id, User.deletion_requested_at.isnot(None))
+        ).first()
+    if pending is None:
+        return {}
+    
+    counts = {}
+    for model in PURGE_ORDER:
+        counts[model.__tablename__] = _purge_table(session_factory, model, user_id, batch_size)
+    
+    with session_factory() as db:
+        db.execute(delete(User).where(User.id == user_id), execution_options={"synchronize_session": False})
+        db.commit()
+    
+    logger.info("Compte %s purgé : %s", user_id, counts)
+    return counts
+
+
+def purge_pending(session_factory: Callable[[], Session], batch_size: Optional[int] = None) -> int:
+    """Purger les comptes dont la suppression a été demandée et n'a pas abouti"""
+    with session_factory() as db:
+        user_ids = db.execute(
+            select(User.id).where(User.deletion_requested_at.isnot(None)).order_by(User.deletion_requested_at)
+        ).scalars().all()
+    
+    for user_id in user_ids:
+        purge_user(session_factory, user_id, batch_size)
+    return len(user_ids)
+
+
+def main():
+    from ..database import SessionLocal
+    
+    parser = argparse.ArgumentParser(description="Purge des comptes en attente de suppression")
+    parser.add_argument("--batch-size", type=int, default=settings.account_purge_batch_size)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=settings.log_level)
+    purged = purge_pending(SessionLocal, args.batch_size)
+    logger.info("%s compte(s) purgé(s)", purged)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,83 @@
+from datetime import datetime, time, timedelta, timezone
+from enum import Enum as PyEnum
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlalchemy import case
+from sqlalchemy.orm import Query, Session
+from ..models.task import Task, TaskPriority, TaskStatus
+
+
+class AgendaWindow(PyEnum):
+    OVERDUE = "overdue"    # Échéance dépassée
+    TODAY = "today"        # Échéance dans la journée (fuseau de l'utilisateur)
+    UPCOMING = "upcoming"  # Échéance dans les prochains jours
+
+
+# Tri par urgence : priorité décroissante puis échéance la plus proche
+PRIORITY_RANK = case(
+    (Task.priority == TaskPriority.HIGH, 0),
+    (Task.priority == TaskPriority.MEDIUM, 1),
+    else_=2
+)
+
+
+def urgency_order(query: Query) -> Query:
+    """Trier des tâches par priorité puis par échéance (sans échéance en dernier)"""
+    return query.order_by(PRIORITY_RANK, Task.due_date.is_(None), Task.due_date, Task.id)
+
+
+def _utc_naive(value: datetime) -> datetime:
+    """Les échéances sont comparées en UTC sans fuseau, comme elles sont stockées"""
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _user_zone(name: Optional[str]) -> ZoneInfo:
+    try:
+        return ZoneInfo(name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo("UTC")
+
+
+def agenda_bounds(
+    window: AgendaWindow,
+    user_timezone: Optional[str],
+    days: int = 7,
+    now: Optional[datetime] = None
+) -> Tuple[Optional[datetime], datetime]:
+    """Bornes [début, fin) des échéances d'une fenêtre d'agenda"""
+    now = now or datetime.now(timezone.utc)
+    
+    if window == AgendaWindow.OVERDUE:
+        return None, _utc_naive(now)
+    
+    if window == AgendaWindow.TODAY:
+        zone = _user_zone(user_timezone)
+        start = datetime.combine(now.astimezone(zone).date(), time.min, tzinfo=zone)
+        return _utc_naive(start), _utc_naive(start + timedelta(days=1))
+    
+    return _utc_naive(now), _utc_naive(now + timedelta(days=days))
+
+
+def agenda_query(
+    db: Session,
+    user_id: int,
+    window: AgendaWindow,
+    user_timezone: Optional[str],
+    days: int = 7
+) -> Query:
+    """
+    Tâches non terminées dont l'échéance tombe dans la fenêtre, par urgence.
+    
+    Le filtre (user_id, completed, due_date) parcourt une plage de l'index
+    ix_tasks_user_completed_due ; seul ce sous-ensemble est trié.
+    """
+    start, end = agenda_bounds(window, user_timezone, days)
+    query = db.query(Task).filter(
+        Task.user_id == user_id,
+        Task.completed == False,  # noqa: E712
+        Task.due_date < end,
+        Task.status != TaskStatus.CANCELLED
+    )
+    if start is not None:
+        query = query.filter(Task.due_date >= start)
+    return urgency_order(query)
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""
+Archivage de l'historique.
+
+Les tâches terminées et les articles achetés depuis plus de ARCHIVE_AFTER_DAYS
+jours sont déplacés vers tasks_archive et shopping_items_archive, par lots d'au
+plus ARCHIVE_BATCH_SIZE lignes (copie puis suppression dans la même transaction) :
+les tables vivantes et leurs index restent à la taille de l'activité courante.
+Les lignes archivées gardent leur identifiant et restent lisibles par les listes
+avec include_archived.
+
+Sur MySQL, budget_transactions est partitionnée par mois de transaction_date
+(migration 0007) ; le même job crée à l'avance les partitions des mois à venir.
+
+    python -m app.services.archive [--days 365] [--batch-size 5000]
+"""
+import argparse
+import logging
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import delete, func, insert, select, text, union_all
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.util import ClauseAdapter
+from ..config import settings
+from ..models.task import Task
+from ..models.shopping import ShoppingItem
+from ..models.reminder import TaskReminder
+from ..models.archive import ArchivedShoppingItem, ArchivedTask
+
+logger = logging.getLogger(__name__)
+
+ARCHIVES = {Task: ArchivedTask, ShoppingItem: ArchivedShoppingItem}
+
+# Lignes archivables : terminées, et depuis quand
+ARCHIVE_RULES = {
+    Task: (Task.completed == True, func.coalesce(Task.completed_at, Task.updated_at)),  # noqa: E712
+    ShoppingItem: (ShoppingItem.completed == True, func.coalesce(ShoppingItem.purchased_at, ShoppingItem.updated_at)),  # noqa: E712
+}
+
+PARTITIONED_TABLE = "budget_transactions"
+
+
+# === LECTURE AVEC LES ARCHIVES ===
+
+def with_archive(statement, model, user_id: int):
+    """
+    Réécrire une requête sur `model` pour qu'elle lise aussi les lignes archivées.
+    
+    La table est remplacée par l'union des lignes vivantes et archivées de
+    l'utilisateur (filtre appliqué dans chaque branche, sur l'index user_id) ;
+    filtres, tri et pagination de la requête s'appliquent à l'ensemble.
+    """
+    source = model.__table__
+    archive = ARCHIVES[model].__table__
+    union = union_all(
+        select(*source.columns).where(source.c.user_id == user_id),
+        select(*(archive.c[column.name] for column in source.columns)).where(archive.c.user_id == user_id),
+    ).subquery(source.name)
+    return ClauseAdapter(union).traverse(getattr(statement, "statement", statement))
+
+
+def collection_models(model, include_archived: bool) -> tuple:
+    """Tables dont dépend la version (ETag) d'une liste"""
+    return (model, ARCHIVES[model]) if include_archived else (model,)
+
+
+# === DÉPLACEMENT VERS LES ARCHIVES ===
+
+def _archive_batch(db: Session, model, ids: List[int]) -> None:
+    source = model.__table__
+    archive = ARCHIVES[model].__table__
+    names = [column.name for column in source.columns]
+    db.execute(insert(archive).from_select(names, select(*source.columns).where(source.c.id.in_(ids))))
+    if model is Task:
+        # Rappels déjà envoyés ou sans objet : la tâche est terminée
+        db.execute(delete(TaskReminder).where(TaskReminder.task_id.in_(ids)))
+    db.execute(delete(model).where(model.id.in_(ids)), execution_options={"synchronize_session": False})
+
+
+def archive_model(
+    session_factory: Callable[[], Session],
+    model,
+    cutoff: datetime,
+    batch_size: int
+) -> int:
+    """
+    Archiver les lignes terminées avant `cutoff`, une transaction par lot.
+    
+    Les lots sont parcourus par identifiant croissant : un job interrompu reprend
+    sur les lignes restantes. Aucune trace de suppression n'est écrite, les lignes
+    ne sont pas supprimées pour l'utilisateur.
+    """
+    done, finished_at = ARCHIVE_RULES[model]
+    archived = 0
+    last_id = 0
+    while True:
+        with session_factory() as db:
+            ids = db.execute(
+                select(model.id)
+                .where(done, finished_at < cutoff, model.id > last_id)
+                .order_by(model.id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                return archived
+            _archive_batch(db, model, ids)
+            db.commit()
+        archived += len(ids)
+        last_id = ids[-1]
+
+
+# === PARTITIONS MENSUELLES (MySQL) ===
+
+def _month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def _next_month(value: date) -> date:
+    return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(month: date) -> str:
+    return f"p{month:%Y%m}"
+
+
+def partition_clause(month: date) -> str:
+    """Partition des transactions du mois `month`"""
+    return f"PARTITION {partition_name(month)} VALUES LESS THAN (TO_DAYS('{_next_month(month):%Y-%m-%d}'))"
+
+
+def partition_names(connection: Connection) -> List[str]:
+    return connection.execute(text(
+        "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION"
+    ), {"table": PARTITIONED_TABLE}).scalars().all()
+
+
+def roll_partitions(connection: Connection, months_ahead: int, today: Optional[date] = None) -> List[str]:
+    """
+    Créer les partitions mensuelles jusqu'à `months_ahead` mois après le mois courant.
+    
+    Les nouvelles partitions sont découpées dans pmax (VALUES LESS THAN MAXVALUE),
+    qui ne contient normalement aucune ligne : l'opération ne copie presque rien.
+    Sans effet si la table n'est pas partitionnée (SQLite, migration 0007 non appliquée).
+    """
+    if connection.dialect.name != "mysql":
+        return []
+    names = partition_names(connection)
+    if "pmax" not in names:
+        return []
+    bounded = sorted(name for name in names if name != "pmax")
+    month = _month_start(today or date.today())
+    if bounded:
+        last = datetime.strptime(bounded[-1], "p%Y%m").date()
+        month = max(month, _next_month(last))
+    target = _month_start(today or date.today())
+    for _ in range(months_ahead):
+        target = _next_month(target)
+    
+    created = []
+    while month <= target:
+        created.append(month)
+        month = _next_month(month)
+    if created:
+        clauses = ", ".join(partition_clause(month) for month in created)
+        connection.execute(text(
+            f"ALTER TABLE {PARTITIONED_TABLE} REORGANIZE PARTITION pmax INTO "
+            f"({clauses}, PARTITION pmax VALUES LESS THAN MAXVALUE)"
+        ))
+    return [partition_name(month) for month in created]
+
+
+def run_archive(
+    session_factory: Callable[[], Session],
+    days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    now: Optional[datetime] = None
+) -> Dict[str, int]:
+    """Créer les partitions à venir puis archiver les lignes terminées depuis plus de `days` jours"""
+    days = settings.archive_after_days if days is None else days
+    batch_size = batch_size or settings.archive_batch_size
+    cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+    
+    with session_factory() as db:
+        created = roll_partitions(db.connection(), settings.archive_partition_months_ahead)
+        db.commit()
+    if created:
+        logger.info("Partitions créées : %s", ", ".join(created))
+    
+    counts = {}
+    for model in ARCHIVES:
+        counts[model.__tablename__] = archive_model(session_factory, model, cutoff, batch_size)
+    logger.info("Lignes archivées : %s", counts)
+    return counts
+
+
+def main():
+    from ..database import SessionLocal
+    
+    parser = argparse.ArgumentParser(description="Archivage des tâches terminées et articles achetés")
+    parser.add_argument("--days", type=int, default=settings.archive_after_days)
+    parser.add_argument("--batch-size", type=int, default=settings.archive_batch_size)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=settings.log_level)
+    run_archive(SessionLocal, args.days, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
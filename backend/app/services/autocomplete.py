@@ -0,0 +1,259 @@
+import heapq
+import logging
+import re
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models.shopping import ShoppingCategory, ShoppingItem
+from ..money import to_decimal
+from .archive import with_archive
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "lifehub:autocomplete:{user_id}:version"
+
+# Colonnes dont dépend l'index : les modifier impose de le reconstruire
+INDEXED_FIELDS = frozenset({"name", "unit", "category", "actual_price", "completed"})
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """Forme de comparaison : minuscules, sans accents ni espaces superflus"""
+    decomposed = unicodedata.normalize("NFKD", text.strip().casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class Suggestion:
+    """Historique agrégé d'un nom d'article"""
+    
+    __slots__ = ("name", "unit", "category", "times_added", "price_total", "price_count", "last_added_at")
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.unit: Optional[str] = None
+        self.category: Optional[ShoppingCategory] = None
+        self.times_added = 0
+        self.price_total = Decimal(0)
+        self.price_count = 0
+        self.last_added_at: Optional[datetime] = None
+    
+    @property
+    def average_price(self) -> Optional[Decimal]:
+        if not self.price_count:
+            return None
+        return to_decimal(self.price_total / self.price_count)
+    
+    def rank(self) -> Tuple[int, datetime]:
+        return self.times_added, self.last_added_at or datetime.min
+
+
+class SuggestionIndex:
+    """
+    Index de préfixes des articles d'un utilisateur.
+    
+    Chaque mot de chaque nom normalisé est une clé d'une liste triée : une recherche
+    est une dichotomie suivie d'un parcours des seules clés qui commencent par le
+    préfixe, puis d'une sélection des plus fréquentes.
+    """
+    
+    def __init__(self, version: Optional[int] = None):
+        self.version = version
+        self.built_at = time.monotonic()
+        self._entries: Dict[str, Suggestion] = {}
+        self._keys: List[Tuple[str, str]] = []
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _entry(self, name: str) -> Suggestion:
+        key = normalize(name)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = Suggestion(name)
+            for match in _WORD.finditer(key):
+                insort(self._keys, (key[match.start():], key))
+        return entry
+    
+    def add(
+        self,
+        name: str,
+        unit: Optional[str],
+        category: Optional[ShoppingCategory],
+        added_at: Optional[datetime],
+        times_added: int = 1,
+        price_total: Decimal = Decimal(0),
+        price_count: int = 0
+    ) -> None:
+        """Ajouter des occurrences d'un nom ; l'unité et la catégorie les plus récentes l'emportent"""
+        entry = self._entry(name)
+        if entry.last_added_at is None or (added_at is not None and added_at >= entry.last_added_at):
+            entry.name = name
+            entry.unit = unit
+            entry.category = category
+            entry.last_added_at = added_at
+        entry.times_added += times_added
+        entry.price_total += price_total
+        entry.price_count += price_count
+    
+    def add_price(self, name: str, price: Decimal) -> None:
+        """Enregistrer un prix d'achat"""
+        entry = self._entry(name)
+        entry.price_total += price
+        entry.price_count += 1
+    
+    def search(self, prefix: str, limit: int = 10) -> List[Suggestion]:
+        """Noms dont un mot commence par le préfixe, les plus utilisés d'abord"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+    
+        candidates = {}
+        keys = self._keys
+        for position in range(bisect_left(keys, (prefix,)), len(keys)):
+            token, key = keys[position]
+            if not token.startswith(prefix):
+                break
+            candidates[key] = self._entries[key]
+        return heapq.nlargest(limit, candidates.values(), key=Suggestion.rank)
+
+
+def build_index(db: Session, user_id: int, version: Optional[int] = None) -> SuggestionIndex:
+    """
+    Construire l'index d'un utilisateur en une requête.
+    
+    Les articles, archivés compris comme pour `price_history`, sont agrégés par nom
+    en base ; l'unité et la catégorie viennent de la ligne la plus récente de chaque
+    nom (jointure sur MAX(id)).
+    """
+    purchased = and_(ShoppingItem.completed == True, ShoppingItem.actual_price.isnot(None))  # noqa: E712
+    history = select(
+        ShoppingItem.name.label("name"),
+        func.count(ShoppingItem.id).label("times_added"),
+        func.sum(case((purchased, ShoppingItem.actual_price), else_=0)).label("price_total"),
+        func.sum(case((purchased, 1), else_=0)).label("price_count"),
+        func.max(ShoppingItem.id).label("last_id"),
+    ).where(
+        ShoppingItem.user_id == user_id
+    ).group_by(ShoppingItem.name).subquery()
+    
+    query = select(
+        history.c.name, ShoppingItem.unit, ShoppingItem.category, ShoppingItem.created_at,
+        history.c.times_added, history.c.price_total, history.c.price_count
+    ).join(ShoppingItem, ShoppingItem.id == history.c.last_id)
+    rows = db.execute(with_archive(query, ShoppingItem, user_id)).all()
+    
+    index = SuggestionIndex(version)
+    for name, unit, category, created_at, times_added, price_total, price_count in rows:
+        index.add(name, unit, category, created_at, times_added, price_total or Decimal(0), int(price_count or 0))
+    return index
+
+
+class SuggestionCache:
+    """
+    Index des utilisateurs récents, gardés en mémoire (LRU borné, durée de vie).
+    
+    Avec plusieurs workers, un compteur de version par utilisateur dans Redis est
+    incrémenté à chaque écriture : un worker dont l'index n'est pas à jour le
+    reconstruit au lieu de servir des suggestions périmées.
+    """
+    
+    def __init__(self, max_users: int, ttl: int, redis_url: Optional[str] = None):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._indexes: "OrderedDict[int, SuggestionIndex]" = OrderedDict()
+        self._redis = None
+        if redis_url:
+            import redis
+            self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.05)
+    
+    def _remote_version(self, user_id: int) -> Optional[int]:
+        if self._redis is None:
+            return None
+        try:
+            return int(self._redis.get(VERSION_KEY.format(user_id=user_id)) or 0)
+        except Exception:
+            logger.exception("Version d'autocomplétion indisponible pour l'utilisateur %s", user_id)
+            return -1
+    
+    def _bump_version(self, user_id: int) -> Optional[int]:
+        if self._redis is None:
+            return None
+        try:
+            return int(self._redis.incr(VERSION_KEY.format(user_id=user_id)))
+        except Exception:
+            logger.exception("Impossible d'incrémenter la version d'autocomplétion de l'utilisateur %s", user_id)
+            return -1
+    
+    def get(self, db: Session, user_id: int) -> SuggestionIndex:
+        """Index de l'utilisateur, reconstruit s'il est absent, expiré ou périmé"""
+        version = self._remote_version(user_id)
+        index = self._indexes.get(user_id)
+        if (
+            index is not None
+            and time.monotonic() - index.built_at < self.ttl
+            and (version is None or (version >= 0 and index.version == version))
+        ):
+            self._indexes.move_to_end(user_id)
+            return index
+    
+        index = build_index(db, user_id, version)
+        self._indexes[user_id] = index
+        self._indexes.move_to_end(user_id)
+        while len(self._indexes) > self.max_users:
+            self._indexes.popitem(last=False)
+        return index
+    
+    def _apply(self, user_id: int, update) -> None:
+        version = self._bump_version(user_id)
+        index = self._indexes.get(user_id)
+        if index is None:
+            return
+        if version is not None and (version < 0 or index.version != version - 1):
+            # Un autre worker a écrit entre-temps : reconstruire à la prochaine lecture
+            del self._indexes[user_id]
+            return
+        update(index)
+        index.version = version
+    
+    def record_added(self, user_id: int, item: ShoppingItem) -> None:
+        """Prendre en compte un article ajouté à la liste"""
+        self._apply(user_id, lambda index: index.add(item.name, item.unit, item.category, item.created_at))
+    
+    def record_purchase(self, user_id: int, item: ShoppingItem) -> None:
+        """Prendre en compte le prix réel d'un article qui vient d'être acheté"""
+        if item.actual_price is None:
+            return
+        self._apply(user_id, lambda index: index.add_price(item.name, item.actual_price))
+    
+    def record_update(self, user_id: int, item: ShoppingItem, fields: Iterable[str], purchased: bool) -> None:
+        """
+        Prendre en compte la modification d'un article.
+    
+        Un achat simple reste une mise à jour incrémentale ; renommer, changer un prix
+        déjà compté ou remettre l'article dans la liste invalide l'index.
+        """
+        fields = INDEXED_FIELDS.intersection(fields)
+        if purchased and fields <= {"completed", "actual_price"}:
+            self.record_purchase(user_id, item)
+        elif fields:
+            self.invalidate(user_id)
+    
+    def invalidate(self, user_id: int) -> None:
+        """Oublier l'index de l'utilisateur : il sera reconstruit à la prochaine lecture"""
+        self._bump_version(user_id)
+        self._indexes.pop(user_id, None)
+
+
+suggestions = SuggestionCache(
+    settings.autocomplete_cache_users,
+    settings.autocomplete_cache_ttl,
+    settings.redis_url if settings.autocomplete_backend == "redis" else None
+)
\ No newline at end of file
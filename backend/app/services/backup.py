@@ -0,0 +1,583 @@
+"""
+Sauvegardes en ligne de la base.
+
+Toutes les tables sont lues dans une même transaction à instantané cohérent
+(START TRANSACTION WITH CONSISTENT SNAPSHOT sur MySQL), par pages de clé
+primaire : la mémoire ne dépend pas du volume d'une table. Chaque table est
+écrite en fichiers JSON lines compressés (gzip) de BACKUP_CHUNK_ROWS lignes ; le
+manifeste, écrit en dernier, liste les fichiers et leur empreinte SHA-256.
+
+Une sauvegarde incrémentale ne contient que les lignes modifiées depuis le
+watermark de la précédente (updated_at), plus la liste des identifiants
+présents pour rejouer les suppressions. La restauration rejoue la chaîne depuis
+la dernière sauvegarde complète.
+
+    python -m app.services.backup create [--full]
+    python -m app.services.backup list
+    python -m app.services.backup prune
+    python -m app.services.backup restore <id> --database-url <url> [--replace]
+    python -m app.services.backup schedule
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import signal
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+import orjson
+from sqlalchemy import (
+    BigInteger, Column, Date, DateTime, Enum, MetaData, String, Table, create_engine, delete, exists,
+    func, insert, inspect, select
+)
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.types import TypeDecorator
+from ..config import settings
+from ..cron import CronSchedule
+from ..database import Base
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+# Colonne de watermark des sauvegardes incrémentales (updated_at par défaut). Les
+# lignes archivées gardent l'updated_at de leur dernière modification, ancien :
+# elles sont repérées par leur date d'archivage (horloge de la base).
+WATERMARK_COLUMNS = {
+    "sync_tombstones": "deleted_at",
+    "tasks_archive": "archived_at",
+    "shopping_items_archive": "archived_at",
+}
+
+
+class BackupError(Exception):
+    """Sauvegarde introuvable, incomplète ou incompatible avec la base cible"""
+
+
+# === REPRÉSENTATION BRUTE DES TABLES ===
+
+def _raw_type(column):
+    """Type tel que stocké : centimes plutôt que Decimal, noms plutôt qu'enums"""
+    column_type = column.type
+    if isinstance(column_type, TypeDecorator):
+        column_type = column_type.impl_instance
+    if isinstance(column_type, Enum):
+        return String(column_type.length)
+    return column_type
+
+
+def raw_table(table: Table) -> Table:
+    """Copie de la table sans conversions Python, pour lire et réinsérer les valeurs telles quelles"""
+    return Table(
+        table.name, MetaData(),
+        *(Column(column.name, _raw_type(column), primary_key=column.primary_key) for column in table.columns)
+    )
+
+
+def _decoder(column):
+    """Conversion inverse de la sérialisation JSON (dates en ISO 8601)"""
+    if isinstance(column.type, DateTime):
+        return lambda value: value and datetime.fromisoformat(value)
+    if isinstance(column.type, Date):
+        return lambda value: value and date.fromisoformat(value)
+    return None
+
+
+def _watermark_column(table: Table) -> Optional[str]:
+    name = WATERMARK_COLUMNS.get(table.name, "updated_at")
+    return name if name in table.columns else None
+
+
+# === FICHIERS ===
+
+class _HashingFile:
+    """Fichier en écriture dont l'empreinte SHA-256 est calculée au fil de l'eau"""
+    
+    def __init__(self, path: str):
+        self._file = open(path, "wb")
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+    
+    def write(self, data) -> int:
+        self.sha256.update(data)
+        self.size += len(data)
+        return self._file.write(data)
+    
+    def flush(self) -> None:
+        self._file.flush()
+    
+    def close(self) -> None:
+        self._file.close()
+
+
+class ChunkWriter:
+    """Lignes d'une table réparties en fichiers gzip de chunk_rows lignes"""
+    
+    def __init__(self, directory: str, prefix: str, chunk_rows: int, level: int):
+        self.directory = directory
+        self.prefix = prefix
+        self.chunk_rows = chunk_rows
+        self.level = level
+        self.chunks: List[dict] = []
+        self.rows = 0
+        self.raw_bytes = 0
+        self._file = None
+        self._gzip = None
+        self._chunk_rows = 0
+    
+    def _open(self) -> None:
+        name = f"{self.prefix}-{len(self.chunks):05d}.jsonl.gz"
+        self._file = _HashingFile(os.path.join(self.directory, name + ".part"))
+        self._gzip = gzip.GzipFile(filename="", mode="wb", fileobj=self._file, compresslevel=self.level, mtime=0)
+        self._name = name
+        self._chunk_rows = 0
+    
+    def _close(self) -> None:
+        self._gzip.close()
+        self._file.close()
+        os.replace(os.path.join(self.directory, self._name + ".part"), os.path.join(self.directory, self._name))
+        self.chunks.append({
+            "file": self._name,
+            "rows": self._chunk_rows,
+            "bytes": self._file.size,
+            "sha256": self._file.sha256.hexdigest(),
+        })
+        self._gzip = None
+    
+    def write(self, rows) -> None:
+        for row in rows:
+            if self._gzip is None:
+                self._open()
+            line = orjson.dumps(tuple(row)) + b"\n"
+            self._gzip.write(line)
+            self.raw_bytes += len(line)
+            self._chunk_rows += 1
+            self.rows += 1
+            if self._chunk_rows >= self.chunk_rows:
+                self._close()
+    
+    def close(self) -> List[dict]:
+        if self._gzip is not None:
+            self._close()
+        return self.chunks
+
+
+def read_chunk(directory: str, chunk: dict) -> Iterator[list]:
+    """Lignes d'un fichier, après vérification de son empreinte"""
+    path = os.path.join(directory, chunk["file"])
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            sha256.update(block)
+    if sha256.hexdigest() != chunk["sha256"]:
+        raise BackupError(f"Fichier corrompu : {path}")
+    with gzip.open(path, "rb") as file:
+        for line in file:
+            yield orjson.loads(line)
+
+
+def _write_json(path: str, data: dict) -> None:
+    temporary = path + ".part"
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2, default=str)
+    os.replace(temporary, path)
+
+
+# === SAUVEGARDE ===
+
+def _begin_snapshot(connection: Connection) -> Connection:
+    """Ouvrir une transaction dont toutes les lectures voient le même état de la base"""
+    dialect = connection.dialect.name
+    if dialect == "mysql":
+        connection = connection.execution_options(isolation_level="REPEATABLE READ")
+        connection.exec_driver_sql("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+    elif dialect == "postgresql":
+        connection = connection.execution_options(isolation_level="REPEATABLE READ")
+    elif dialect == "sqlite":
+        # pysqlite n'ouvre pas de transaction pour les SELECT
+        connection.exec_driver_sql("BEGIN")
+    return connection
+
+
+def _keyset_pages(connection: Connection, statement, key, batch_size: int) -> Iterator[list]:
+    """Lignes par pages de clé primaire croissante (aucune table n'est chargée en entier)"""
+    last = None
+    while True:
+        page = statement if last is None else statement.where(key > last)
+        rows = connection.execute(page.order_by(key).limit(batch_size)).all()
+        if not rows:
+            return
+        yield rows
+        last = rows[-1]._mapping[key.name]
+
+
+def _schema_revision(connection: Connection) -> Optional[str]:
+    if not inspect(connection).has_table("alembic_version"):
+        return None
+    return connection.exec_driver_sql("SELECT version_num FROM alembic_version").scalar()
+
+
+def list_backups(backup_dir: str = None) -> List[dict]:
+    """Manifestes des sauvegardes terminées, de la plus ancienne à la plus récente"""
+    backup_dir = backup_dir or settings.backup_dir
+    manifests = []
+    if not os.path.isdir(backup_dir):
+        return manifests
+    for name in os.listdir(backup_dir):
+        path = os.path.join(backup_dir, name, MANIFEST)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                manifests.append(json.load(file))
+    return sorted(manifests, key=lambda manifest: manifest["started_at"])
+
+
+def create_backup(
+    engine: Engine,
+    backup_dir: str = None,
+    full: bool = False,
+    chunk_rows: int = None,
+    batch_size: int = None,
+    level: int = None
+) -> dict:
+    """
+    Sauvegarder toutes les tables et retourner le manifeste.
+    
+    Incrémentale si une sauvegarde précédente existe et que full est faux : les
+    lignes dont le watermark est postérieur à celui de la précédente (moins la
+    marge d'horloge) sont écrites, avec la liste complète des identifiants.
+    """
+    backup_dir = backup_dir or settings.backup_dir
+    chunk_rows = chunk_rows or settings.backup_chunk_rows
+    batch_size = batch_size or settings.backup_batch_size
+    level = level or settings.backup_compression_level
+    
+    previous = list_backups(backup_dir)
+    base = None if full or not previous else previous[-1]
+    since = None
+    if base is not None:
+        since = datetime.fromisoformat(base["watermark"]) - timedelta(seconds=settings.sync_clock_skew_seconds)
+    
+    started_at = datetime.utcnow()
+    backup_id = started_at.strftime("%Y%m%dT%H%M%S%fZ") + ("-incremental" if base else "-full")
+    directory = os.path.join(backup_dir, backup_id)
+    os.makedirs(directory)
+    
+    manifest = {
+        "format": FORMAT_VERSION,
+        "id": backup_id,
+        "kind": "incremental" if base else "full",
+        "base": base["id"] if base else None,
+        "started_at": started_at.isoformat(),
+        "tables": {},
+    }
+    with engine.connect() as connection:
+        connection = _begin_snapshot(connection)
+        # Watermark lu dans l'instantané : horloge de la base, comme updated_at
+        watermark = connection.execute(select(func.now())).scalar()
+        if watermark.tzinfo is not None:
+            watermark = watermark.astimezone(timezone.utc).replace(tzinfo=None)
+        manifest["watermark"] = watermark.isoformat()
+        manifest["schema_revision"] = _schema_revision(connection)
+    
+        for table in Base.metadata.sorted_tables:
+            raw = raw_table(table)
+            key = raw.c.id
+            watermark = _watermark_column(table)
+            statement = select(raw)
+            mode = "full"
+            if since is not None and watermark is not None:
+                statement = statement.where(raw.c[watermark] >= since)
+                mode = "changes"
+    
+            writer = ChunkWriter(directory, table.name, chunk_rows, level)
+            for rows in _keyset_pages(connection, statement, key, batch_size):
+                writer.write(rows)
+            entry = {
+                "mode": mode,
+                "columns": [column.name for column in raw.columns],
+                "rows": writer.rows,
+                "raw_bytes": writer.raw_bytes,
+                "chunks": writer.close(),
+            }
+            if mode == "changes":
+                # Identifiants présents : les absents ont été supprimés depuis la précédente
+                ids = ChunkWriter(directory, f"{table.name}.ids", chunk_rows * 10, level)
+                for rows in _keyset_pages(connection, select(key), key, batch_size * 10):
+                    ids.write(rows)
+                entry["ids"] = ids.close()
+            manifest["tables"][table.name] = entry
+        connection.rollback()
+    
+    manifest["finished_at"] = datetime.utcnow().isoformat()
+    _write_json(os.path.join(directory, MANIFEST), manifest)
+    logger.info(
+        "Sauvegarde %s terminée : %s lignes",
+        backup_id, sum(entry["rows"] for entry in manifest["tables"].values())
+    )
+    return manifest
+
+
+# === RÉTENTION ===
+
+def _chain(manifests: Dict[str, dict], backup_id: str) -> List[dict]:
+    """Sauvegardes à rejouer pour restaurer backup_id, de la complète à backup_id"""
+    chain = []
+    current = manifests.get(backup_id)
+    if current is None:
+        raise BackupError(f"Sauvegarde introuvable : {backup_id}")
+    while current is not None:
+        chain.append(current)
+        if current["base"] is None:
+            return list(reversed(chain))
+        current = manifests.get(current["base"])
+    raise BackupError(f"Chaîne incomplète pour la sauvegarde {backup_id}")
+
+
+def prune_backups(backup_dir: str = None, retention_days: int = None, now: datetime = None) -> List[str]:
+    """
+    Supprimer les sauvegardes plus anciennes que la rétention.
+    
+    Les sauvegardes dont dépend une sauvegarde conservée (chaîne incrémentale) et
+    la chaîne la plus récente sont toujours gardées. Les répertoires sans
+    manifeste (sauvegarde interrompue) sont supprimés passé le même délai.
+    """
+    backup_dir = backup_dir or settings.backup_dir
+    retention_days = settings.backup_retention_days if retention_days is None else retention_days
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    manifests = {manifest["id"]: manifest for manifest in list_backups(backup_dir)}
+    
+    keep = set()
+    retained = [
+        manifest for manifest in manifests.values()
+        if datetime.fromisoformat(manifest["started_at"]) >= cutoff
+    ]
+    if not retained and manifests:
+        retained = [max(manifests.values(), key=lambda manifest: manifest["started_at"])]
+    for manifest in retained:
+        keep.update(item["id"] for item in _chain(manifests, manifest["id"]))
+    
+    removed = []
+    for name in os.listdir(backup_dir) if os.path.isdir(backup_dir) else ():
+        path = os.path.join(backup_dir, name)
+        if name in keep or not os.path.isdir(path):
+            continue
+        if name not in manifests and datetime.utcfromtimestamp(os.path.getmtime(path)) >= cutoff:
+            continue
+        shutil.rmtree(path)
+        removed.append(name)
+    return removed
+
+
+# === RESTAURATION ===
+
+def _upsert(connection: Connection, table: Table, rows: List[dict]) -> None:
+    """Insérer ou remplacer des lignes par clé primaire"""
+    dialect = connection.dialect.name
+    columns = [column.name for column in table.columns if not column.primary_key]
+    if dialect == "mysql":
+        statement = mysql.insert(table)
+        statement = statement.on_duplicate_key_update({name: statement.inserted[name] for name in columns})
+    elif dialect in ("sqlite", "postgresql"):
+        statement = (sqlite if dialect == "sqlite" else postgresql).insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=["id"], set_={name: statement.excluded[name] for name in columns}
+        )
+    else:
+        raise BackupError(f"Restauration incrémentale non prise en charge pour {dialect}")
+    connection.execute(statement, rows)
+
+
+def _load_rows(connection: Connection, directory: str, table: Table, entry: dict, batch_size: int, upsert: bool) -> int:
+    columns = entry["columns"]
+    decoders = [_decoder(table.c[name]) for name in columns]
+    count = 0
+    for chunk in entry["chunks"]:
+        batch = []
+        for values in read_chunk(directory, chunk):
+            batch.append({
+                name: decoder(value) if decoder else value
+                for name, decoder, value in zip(columns, decoders, values)
+            })
+            if len(batch) >= batch_size:
+                _upsert(connection, table, batch) if upsert else connection.execute(insert(table), batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            _upsert(connection, table, batch) if upsert else connection.execute(insert(table), batch)
+            count += len(batch)
+        # Une transaction par fichier : verrous et journal bornés
+        connection.commit()
+    return count
+
+
+def _apply_deletions(connection: Connection, directory: str, table: Table, entry: dict, batch_size: int) -> None:
+    """Supprimer les lignes dont l'identifiant n'est plus présent dans la sauvegarde"""
+    present = Table(
+        "backup_restore_ids", MetaData(),
+        Column("id", BigInteger, primary_key=True),
+        prefixes=["TEMPORARY"],
+    )
+    present.create(connection)
+    for chunk in entry["ids"]:
+        batch = []
+        for (identifier,) in read_chunk(directory, chunk):
+            batch.append({"id": identifier})
+            if len(batch) >= batch_size:
+                connection.execute(insert(present), batch)
+                batch = []
+        if batch:
+            connection.execute(insert(present), batch)
+    connection.execute(delete(table).where(~exists(select(present.c.id).where(present.c.id == table.c.id))))
+    present.drop(connection)
+    connection.commit()
+
+
+def restore_backup(
+    engine: Engine,
+    backup_id: str,
+    backup_dir: str = None,
+    replace: bool = False,
+    batch_size: int = None
+) -> Dict[str, int]:
+    """
+    Restaurer une sauvegarde (et la chaîne dont elle dépend) dans une base.
+    
+    Les tables manquantes sont créées. La base cible doit être vide, sauf avec
+    replace, qui supprime d'abord ses lignes. Retourne le nombre de lignes par
+    table après restauration.
+    """
+    backup_dir = backup_dir or settings.backup_dir
+    batch_size = batch_size or settings.backup_batch_size
+    manifests = {manifest["id"]: manifest for manifest in list_backups(backup_dir)}
+    chain = _chain(manifests, backup_id)
+    tables = Base.metadata.sorted_tables
+    
+    Base.metadata.create_all(engine)
+    with engine.connect() as connection:
+        revision = _schema_revision(connection)
+        expected = chain[-1]["schema_revision"]
+        if revision is not None and expected is not None and revision != expected:
+            raise BackupError(f"Révision du schéma différente (sauvegarde {expected}, base {revision})")
+        non_empty = [
+            table.name for table in tables
+            if connection.execute(select(func.count()).select_from(table)).scalar()
+        ]
+        if non_empty and not replace:
+            raise BackupError(f"Base cible non vide ({', '.join(non_empty)}) : utiliser --replace")
+        for table in reversed(tables):
+            connection.execute(delete(table))
+        connection.commit()
+    
+        for manifest in chain:
+            if manifest["format"] != FORMAT_VERSION:
+                raise BackupError(f"Format de sauvegarde non pris en charge : {manifest['format']}")
+            directory = os.path.join(backup_dir, manifest["id"])
+            # Parents d'abord pour les insertions, enfants d'abord pour les suppressions
+            for table in tables:
+                entry = manifest["tables"].get(table.name)
+                if entry is None:
+                    continue
+                raw = raw_table(table)
+                if entry["mode"] == "full" and manifest["kind"] == "incremental":
+                    connection.execute(delete(raw))
+                _load_rows(connection, directory, raw, entry, batch_size, upsert=entry["mode"] == "changes")
+            for table in reversed(tables):
+                entry = manifest["tables"].get(table.name)
+                if entry is not None and entry["mode"] == "changes":
+                    _apply_deletions(connection, directory, raw_table(table), entry, batch_size * 10)
+            logger.info("Sauvegarde %s rejouée", manifest["id"])
+    
+        return {
+            table.name: connection.execute(select(func.count()).select_from(table)).scalar()
+            for table in tables
+        }
+
+
+# === PLANIFICATION ===
+
+def run_scheduled_backup(engine: Engine) -> dict:
+    """Sauvegarde planifiée : complète si la dernière complète est trop ancienne, sinon incrémentale"""
+    backups = list_backups()
+    fulls = [manifest for manifest in backups if manifest["kind"] == "full"]
+    full = not fulls or (
+        datetime.utcnow() - datetime.fromisoformat(fulls[-1]["started_at"])
+        >= timedelta(days=settings.backup_full_interval_days)
+    )
+    manifest = create_backup(engine, full=full)
+    removed = prune_backups()
+    if removed:
+        logger.info("%s sauvegarde(s) expirée(s) supprimée(s)", len(removed))
+    return manifest
+
+
+def run_scheduler(engine: Engine, stop: threading.Event) -> None:
+    """Lancer les sauvegardes selon BACKUP_SCHEDULE (heure locale) jusqu'à l'arrêt demandé"""
+    schedule = CronSchedule(settings.backup_schedule)
+    logger.info("Planificateur de sauvegardes démarré (%s)", settings.backup_schedule)
+    while not stop.is_set():
+        next_run = schedule.next_after(datetime.now())
+        if stop.wait(max(0.0, (next_run - datetime.now()).total_seconds())):
+            break
+        try:
+            run_scheduled_backup(engine)
+        except Exception:
+            logger.exception("Échec de la sauvegarde planifiée")
+    logger.info("Planificateur de sauvegardes arrêté")
+
+
+def main():
+    from ..database import engine
+    
+    parser = argparse.ArgumentParser(description="Sauvegardes de la base")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="Sauvegarder maintenant")
+    create.add_argument("--full", action="store_true", help="Sauvegarde complète (incrémentale sinon)")
+    commands.add_parser("list", help="Lister les sauvegardes")
+    commands.add_parser("prune", help="Supprimer les sauvegardes expirées")
+    restore = commands.add_parser("restore", help="Restaurer une sauvegarde")
+    restore.add_argument("backup_id", nargs="?", help="Identifiant (la plus récente par défaut)")
+    restore.add_argument("--before", type=datetime.fromisoformat, help="Dernière sauvegarde avant cette date (UTC)")
+    restore.add_argument("--database-url", required=True, help="Base cible")
+    restore.add_argument("--replace", action="store_true", help="Remplacer les données de la base cible")
+    commands.add_parser("schedule", help="Sauvegardes planifiées (BACKUP_SCHEDULE)")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=settings.log_level)
+    if args.command == "create":
+        create_backup(engine, full=args.full)
+    elif args.command == "list":
+        for manifest in list_backups():
+            rows = sum(entry["rows"] for entry in manifest["tables"].values())
+            print(f"{manifest['id']}  {manifest['kind']:<11}  watermark {manifest['watermark']}  {rows} lignes")
+    elif args.command == "prune":
+        for name in prune_backups():
+            print(f"supprimée : {name}")
+    elif args.command == "restore":
+        backups = [
+            manifest for manifest in list_backups()
+            if args.before is None or datetime.fromisoformat(manifest["started_at"]) <= args.before
+        ]
+        backup_id = args.backup_id or (backups[-1]["id"] if backups else None)
+        if backup_id is None:
+            raise SystemExit("Aucune sauvegarde à restaurer")
+        counts = restore_backup(create_engine(args.database_url), backup_id, replace=args.replace)
+        for table, count in counts.items():
+            print(f"{table:<20} {count}")
+    elif args.command == "schedule":
+        if not settings.backup_enabled:
+            logger.info("Sauvegardes désactivées (BACKUP_ENABLED)")
+            return
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+        run_scheduler(engine, stop)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,269 @@
+"""
+Alertes de dépassement de budget, évaluées à l'écriture des transactions.
+
+Chaque création, modification ou suppression d'une dépense reporte sa variation
+sur le total du mois de sa catégorie (budget_month_totals) par un UPDATE
+spent = spent + delta : le mois n'est jamais re-sommé, sauf à la première
+écriture d'un mois, où le total est initialisé par monthly_spending.
+
+Quand le total atteint un seuil de BUDGET_ALERT_THRESHOLDS (% du budget mensuel),
+une alerte est envoyée au notificateur après le commit. alerted_percent retient le
+plus haut seuil déjà signalé : une seule alerte par seuil, catégorie et mois, même
+avec plusieurs workers, et un seul envoi (le plus haut seuil) si une dépense en
+franchit plusieurs. Une baisse des dépenses ne réarme pas les seuils du mois.
+"""
+import logging
+from datetime import date, timezone
+from decimal import Decimal
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import delete, event, insert, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models.budget import BudgetCategory, BudgetMonthTotal, BudgetTransaction, TransactionType
+from ..money import to_decimal
+from .budget_stats import monthly_spending
+from .events import broker
+
+logger = logging.getLogger(__name__)
+
+# Champs d'une transaction dont dépend sa contribution aux totaux
+TRACKED_FIELDS = frozenset({"amount", "transaction_type", "category_id", "transaction_date"})
+
+
+class Contribution(NamedTuple):
+    """Part d'une transaction dans le total d'une catégorie sur un mois"""
+    category_id: int
+    period: date
+    amount: Decimal
+
+
+class BudgetAlert(NamedTuple):
+    """Seuil de budget franchi"""
+    user_id: int
+    category_id: int
+    category_name: str
+    period: date
+    threshold: int
+    spent: Decimal
+    monthly_budget: Decimal
+
+
+# === NOTIFICATEURS ===
+
+class LogNotifier:
+    """Notificateur par défaut : journalise les alertes"""
+    
+    def send(self, alert: BudgetAlert) -> None:
+        logger.info(
+            "Budget « %s » de l'utilisateur %s à %d %% en %s (%s / %s)",
+            alert.category_name, alert.user_id, alert.threshold, f"{alert.period:%Y-%m}",
+            alert.spent, alert.monthly_budget
+        )
+
+
+class EventsNotifier:
+    """Alertes publiées sur le flux temps réel de l'utilisateur (/api/events)"""
+    
+    def send(self, alert: BudgetAlert) -> None:
+        broker.publish(alert.user_id, [{
+            "entity": "budget_alerts",
+            "id": alert.category_id,
+            "action": "threshold",
+            "period": f"{alert.period:%Y-%m}",
+            "threshold": alert.threshold,
+            "spent": float(alert.spent),
+            "monthly_budget": float(alert.monthly_budget),
+        }])
+
+
+class StubNotifier:
+    """Notificateur local qui garde les alertes envoyées (tests)"""
+    
+    def __init__(self):
+        self.alerts: List[BudgetAlert] = []
+    
+    def send(self, alert: BudgetAlert) -> None:
+        self.alerts.append(alert)
+
+
+def create_notifier():
+    """Instancier le notificateur configuré"""
+    if settings.budget_alert_notifier == "events":
+        return EventsNotifier()
+    if settings.budget_alert_notifier == "stub":
+        return StubNotifier()
+    return LogNotifier()
+
+
+notifier = create_notifier()
+
+
+# === CONTRIBUTIONS ===
+
+def contribution(transaction_type, category_id, transaction_date, amount) -> Optional[Contribution]:
+    """Contribution d'une transaction ; None si elle ne compte dans aucun total (revenu, sans catégorie)"""
+    if category_id is None or transaction_date is None or amount is None:
+        return None
+    if TransactionType(transaction_type) != TransactionType.EXPENSE:
+        return None
+    if transaction_date.tzinfo is not None:
+        transaction_date = transaction_date.astimezone(timezone.utc).replace(tzinfo=None)
+    return Contribution(category_id, transaction_date.date().replace(day=1), to_decimal(amount))
+
+
+def transaction_contribution(transaction: BudgetTransaction) -> Optional[Contribution]:
+    return contribution(
+        transaction.transaction_type, transaction.category_id,
+        transaction.transaction_date, transaction.amount
+    )
+
+
+def load_contribution(db: Session, user_id: int, transaction_id: int) -> Optional[Contribution]:
+    """Contribution actuelle d'une transaction, lue avant de la modifier ou de la supprimer"""
+    row = db.execute(
+        select(
+            BudgetTransaction.transaction_type, BudgetTransaction.category_id,
+            BudgetTransaction.transaction_date, BudgetTransaction.amount
+        ).where(BudgetTransaction.id == transaction_id, BudgetTransaction.user_id == user_id)
+    ).first()
+    return contribution(*row) if row is not None else None
+
+
+# === TOTAUX ET SEUILS ===
+
+def _total_filter(category_id: int, period: date):
+    return (BudgetMonthTotal.category_id == category_id, BudgetMonthTotal.period == period)
+
+
+def _add(db: Session, category_id: int, period: date, delta: Decimal) -> int:
+    return db.execute(
+        update(BudgetMonthTotal)
+        .where(*_total_filter(category_id, period))
+        .values(spent=BudgetMonthTotal.spent + delta),
+        execution_options={"synchronize_session": False}
+    ).rowcount
+
+
+def _seed(db: Session, user_id: int, category_id: int, period: date, delta: Decimal) -> None:
+    """
+    Créer le total d'un mois à sa première écriture.
+    
+    La somme inclut la transaction qui vient d'être écrite. Si un autre worker a
+    créé le total entre-temps, sa somme ne voyait pas cette transaction (non
+    validée) : l'insertion devient un ajout de la variation (upsert, sans point de
+    sauvegarde qui déclencherait les hooks de commit de la session).
+    """
+    spent = monthly_spending(db, user_id, period.year, period.month, [category_id]).get(category_id, Decimal(0))
+    values = {
+        "user_id": user_id, "category_id": category_id, "period": period,
+        "spent": spent, "alerted_percent": 0,
+    }
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        statement = mysql.insert(BudgetMonthTotal).values(values).on_duplicate_key_update(
+            spent=BudgetMonthTotal.spent + delta
+        )
+    elif dialect in ("sqlite", "postgresql"):
+        statement = (sqlite if dialect == "sqlite" else postgresql).insert(BudgetMonthTotal).values(values)
+        statement = statement.on_conflict_do_update(
+            index_elements=["category_id", "period"], set_={"spent": BudgetMonthTotal.spent + delta}
+        )
+    else:
+        statement = insert(BudgetMonthTotal).values(values)
+    db.execute(statement)
+
+
+def _check_thresholds(db: Session, user_id: int, category_id: int, period: date) -> None:
+    thresholds = settings.budget_alert_thresholds_list
+    if not thresholds:
+        return
+    row = db.execute(
+        select(
+            BudgetMonthTotal.id, BudgetMonthTotal.spent, BudgetMonthTotal.alerted_percent,
+            BudgetCategory.name, BudgetCategory.monthly_budget, BudgetCategory.is_active
+        )
+        .join(BudgetCategory, BudgetCategory.id == BudgetMonthTotal.category_id)
+        .where(*_total_filter(category_id, period))
+    ).one()
+    if not row.is_active or row.monthly_budget <= 0:
+        return
+    reached = [
+        threshold for threshold in thresholds
+        if threshold > row.alerted_percent and row.spent * 100 >= row.monthly_budget * threshold
+    ]
+    if not reached:
+        return
+    
+    threshold = reached[-1]
+    # Le seuil n'est signalé que par l'écriture qui le fait passer en premier
+    claimed = db.execute(
+        update(BudgetMonthTotal)
+        .where(BudgetMonthTotal.id == row.id, BudgetMonthTotal.alerted_percent < threshold)
+        .values(alerted_percent=threshold),
+        execution_options={"synchronize_session": False}
+    ).rowcount
+    if claimed:
+        db.info.setdefault("budget_alerts", []).append(BudgetAlert(
+            user_id, category_id, row.name, period, threshold, row.spent, row.monthly_budget
+        ))
+
+
+def record_change(
+    db: Session,
+    user_id: int,
+    old: Optional[Contribution],
+    new: Optional[Contribution]
+) -> None:
+    """
+    Reporter l'écriture d'une transaction sur les totaux mensuels et évaluer les seuils.
+    
+    À appeler dans la transaction de l'écriture, une fois celle-ci envoyée à la base
+    (flush) ; les alertes sont envoyées après le commit.
+    """
+    deltas: Dict[Tuple[int, date], Decimal] = {}
+    if old is not None:
+        deltas[old.category_id, old.period] = -old.amount
+    if new is not None:
+        key = (new.category_id, new.period)
+        deltas[key] = deltas.get(key, Decimal(0)) + new.amount
+    
+    for (category_id, period), delta in deltas.items():
+        if delta == 0:
+            continue
+        if not _add(db, category_id, period, delta):
+            _seed(db, user_id, category_id, period, delta)
+        if delta > 0:
+            _check_thresholds(db, user_id, category_id, period)
+
+
+def forget_category(db: Session, user_id: int, category_id: int) -> None:
+    """Supprimer les totaux d'une catégorie supprimée"""
+    db.execute(
+        delete(BudgetMonthTotal).where(
+            BudgetMonthTotal.category_id == category_id, BudgetMonthTotal.user_id == user_id
+        ),
+        execution_options={"synchronize_session": False}
+    )
+
+
+# === ENVOI APRÈS COMMIT ===
+
+@event.listens_for(Session, "after_commit")
+def send_budget_alerts(session):
+    """Envoyer les alertes une fois les totaux validés"""
+    if session.in_nested_transaction():
+        return
+    for alert in session.info.pop("budget_alerts", ()):
+        try:
+            notifier.send(alert)
+        except Exception:
+            logger.exception("Échec de l'envoi de l'alerte de budget %s", alert)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_budget_alerts(session):
+    # Un point de sauvegarde annulé ne concerne pas les alertes de la transaction
+    if session.in_nested_transaction():
+        return
+    session.info.pop("budget_alerts", None)
\ No newline at end of file
@@ -0,0 +1,74 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..models.budget import BudgetCategory, BudgetTransaction, TransactionType
+from ..schemas.budget import BudgetOverview
+
+
+def month_bounds(year: int, month: int) -> Tuple[datetime, datetime]:
+    """Début du mois et début du mois suivant"""
+    start = datetime(year, month, 1)
+    end = datetime(year + month // 12, month % 12 + 1, 1)
+    return start, end
+
+
+def monthly_spending(
+    db: Session,
+    user_id: int,
+    year: int,
+    month: int,
+    category_ids: Optional[Iterable[int]] = None
+) -> Dict[int, Decimal]:
+    """
+    Dépenses du mois par catégorie, en une requête groupée.
+    
+    Les montants sont sommés en centimes par la base : le total est exact. Le filtre
+    porte sur un intervalle de dates plutôt que sur EXTRACT(MONTH/YEAR), qui empêche
+    l'utilisation d'un index.
+    """
+    start, end = month_bounds(year, month)
+    query = db.query(
+        BudgetTransaction.category_id,
+        func.sum(BudgetTransaction.amount)
+    ).filter(
+        BudgetTransaction.user_id == user_id,
+        BudgetTransaction.transaction_type == TransactionType.EXPENSE,
+        BudgetTransaction.category_id.isnot(None),
+        BudgetTransaction.transaction_date >= start,
+        BudgetTransaction.transaction_date < end
+    )
+    if category_ids is not None:
+        query = query.filter(BudgetTransaction.category_id.in_(list(category_ids)))
+    return {category_id: spent for category_id, spent in query.group_by(BudgetTransaction.category_id)}
+
+
+def attach_spending(db: Session, user_id: int, categories: Iterable[BudgetCategory], year: int, month: int) -> None:
+    """Renseigner spent_this_month sur des catégories déjà chargées"""
+    categories = list(categories)
+    if not categories:
+        return
+    spending = monthly_spending(db, user_id, year, month, [category.id for category in categories])
+    for category in categories:
+        category.spent_this_month = spending.get(category.id, Decimal(0))
+
+
+def budget_overview(db: Session, user_id: int, year: int, month: int) -> BudgetOverview:
+    """Catégories actives, dépenses du mois et totaux exacts (deux requêtes)"""
+    categories = db.query(BudgetCategory).filter(
+        BudgetCategory.user_id == user_id,
+        BudgetCategory.is_active == True  # noqa: E712
+    ).all()
+    
+    # Dépenses du mois de toutes les catégories en une requête ; totaux exacts (Decimal)
+    attach_spending(db, user_id, categories, year, month)
+    total_budget = sum((category.monthly_budget for category in categories), Decimal(0))
+    total_spent = sum((category.spent_this_month for category in categories), Decimal(0))
+    
+    return BudgetOverview(
+        total_budget=total_budget,
+        total_spent=total_spent,
+        remaining_budget=total_budget - total_spent,
+        categories=categories
+    )
\ No newline at end of file
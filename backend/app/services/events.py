@@ -0,0 +1,285 @@
+import asyncio
+import json
+import logging
+from typing import Dict, List, Optional, Set
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ..config import settings
+from .sync import SYNC_MODELS
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "lifehub:events:"
+
+
+class Subscriber:
+    """
+    Connexion temps réel d'un client.
+    
+    Les changements en attente sont fusionnés par (entité, id) : une rafale de
+    modifications sur la même ligne ne produit qu'un seul événement. Le tampon est
+    borné ; s'il déborde, il est vidé et le client reçoit un unique signal de
+    resynchronisation (à traiter via /api/sync).
+    """
+    
+    __slots__ = ("user_id", "_pending", "_overflow", "_wakeup")
+    
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self._pending: Dict[tuple, dict] = {}
+        self._overflow = False
+        self._wakeup = asyncio.Event()
+    
+    def push(self, change: dict) -> None:
+        """Ajouter un changement au tampon (appelé dans la boucle d'événements)"""
+        if not self._overflow:
+            key = (change["entity"], change["id"])
+            previous = self._pending.pop(key, None)
+            if previous is not None and previous["action"] == "created":
+                if change["action"] == "deleted":
+                    # Créée puis supprimée dans la même fenêtre : rien à transmettre
+                    change = None
+                else:
+                    change = dict(change, action="created")
+            if change is not None:
+                self._pending[key] = change
+    
+            if len(self._pending) > settings.events_max_pending:
+                self._pending.clear()
+                self._overflow = True
+        self._wakeup.set()
+    
+    async def next_batch(self, timeout: float) -> Optional[dict]:
+        """
+        Attendre le prochain lot de changements fusionnés.
+    
+        Retourne None si rien n'est arrivé avant le délai (battement de cœur).
+        """
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+    
+        # Laisser la rafale se terminer avant d'envoyer
+        await asyncio.sleep(settings.events_coalesce_ms / 1000)
+        self._wakeup.clear()
+    
+        if self._overflow:
+            self._overflow = False
+            return {"type": "resync"}
+    
+        changes = list(self._pending.values())
+        self._pending.clear()
+        if not changes:
+            return None
+        return {"type": "changes", "changes": changes}
+
+
+class ConnectionHub:
+    """Connexions temps réel du worker, indexées par utilisateur"""
+    
+    def __init__(self):
+        self._subscribers: Dict[int, Set[Subscriber]] = {}
+        self._count = 0
+    
+    @property
+    def connection_count(self) -> int:
+        return self._count
+    
+    def add(self, subscriber: Subscriber) -> bool:
+        """Enregistrer une connexion ; retourne True si c'est la première de l'utilisateur"""
+        subscribers = self._subscribers.setdefault(subscriber.user_id, set())
+        subscribers.add(subscriber)
+        self._count += 1
+        return len(subscribers) == 1
+    
+    def remove(self, subscriber: Subscriber) -> bool:
+        """Retirer une connexion ; retourne True si c'était la dernière de l'utilisateur"""
+        subscribers = self._subscribers.get(subscriber.user_id)
+        if not subscribers or subscriber not in subscribers:
+            return False
+        subscribers.discard(subscriber)
+        self._count -= 1
+        if not subscribers:
+            del self._subscribers[subscriber.user_id]
+            return True
+        return False
+    
+    def dispatch(self, user_id: int, changes: List[dict]) -> None:
+        """Distribuer des changements aux connexions locales d'un utilisateur"""
+        for subscriber in self._subscribers.get(user_id, ()):
+            for change in changes:
+                subscriber.push(change)
+
+
+class InMemoryBroker:
+    """Diffusion limitée au processus courant (un seul worker, tests)"""
+    
+    def __init__(self):
+        self.hub = ConnectionHub()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+    
+    async def stop(self) -> None:
+        self._loop = None
+    
+    def publish(self, user_id: int, changes: List[dict]) -> None:
+        """Publier des changements (utilisable depuis n'importe quel thread)"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self.hub.dispatch, user_id, changes)
+    
+    async def subscribe(self, subscriber: Subscriber) -> None:
+        self.hub.add(subscriber)
+    
+    async def unsubscribe(self, subscriber: Subscriber) -> None:
+        self.hub.remove(subscriber)
+
+
+class RedisBroker(InMemoryBroker):
+    """
+    Diffusion entre workers via Redis pub/sub.
+    
+    Chaque worker ne s'abonne qu'aux canaux des utilisateurs qui ont une connexion
+    locale : un worker ne reçoit pas le trafic des autres utilisateurs.
+    
+    La publication est appelée depuis le hook after_commit, souvent dans la boucle
+    d'événements : elle ne fait que déposer le lot dans une file bornée, vidée par
+    une tâche qui publie avec le client asynchrone.
+    """
+    
+    def __init__(self, url: str):
+        super().__init__()
+        self._url = url
+        self._publisher = None
+        self._pubsub = None
+        self._outbox: Optional[asyncio.Queue] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._sender: Optional[asyncio.Task] = None
+    
+    async def start(self) -> None:
+        import redis.asyncio as aioredis
+    
+        await super().start()
+        self._publisher = aioredis.Redis.from_url(self._url)
+        self._pubsub = self._publisher.pubsub(ignore_subscribe_messages=True)
+        self._outbox = asyncio.Queue(settings.events_publish_queue)
+        # Canal de contrôle : garde la connexion pub/sub ouverte sans abonné local
+        await self._pubsub.subscribe(f"{CHANNEL_PREFIX}control")
+        self._listener = asyncio.create_task(self._listen())
+        self._sender = asyncio.create_task(self._send())
+    
+    async def stop(self) -> None:
+        for task in (self._listener, self._sender):
+            if task is not None:
+                task.cancel()
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+        if self._publisher is not None:
+            await self._publisher.aclose()
+        await super().stop()
+    
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    channel = message["channel"].decode()
+                    user_id = int(channel.rsplit(":", 1)[1])
+                    self.hub.dispatch(user_id, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Erreur de lecture du canal Redis des événements")
+                await asyncio.sleep(1)
+    
+    def publish(self, user_id: int, changes: List[dict]) -> None:
+        """Mettre des changements en file de publication (sans attendre Redis)"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._enqueue, user_id, changes)
+    
+    def _enqueue(self, user_id: int, changes: List[dict]) -> None:
+        try:
+            self._outbox.put_nowait((user_id, changes))
+        except asyncio.QueueFull:
+            # La diffusion est best-effort : les clients se rattrapent via /api/sync
+            logger.warning("File de publication pleine, événements de l'utilisateur %s perdus", user_id)
+    
+    async def _send(self) -> None:
+        while True:
+            user_id, changes = await self._outbox.get()
+            try:
+                await self._publisher.publish(f"{CHANNEL_PREFIX}{user_id}", json.dumps(changes))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Impossible de publier les événements de l'utilisateur %s", user_id)
+    
+    async def subscribe(self, subscriber: Subscriber) -> None:
+        if self.hub.add(subscriber):
+            await self._pubsub.subscribe(f"{CHANNEL_PREFIX}{subscriber.user_id}")
+    
+    async def unsubscribe(self, subscriber: Subscriber) -> None:
+        if self.hub.remove(subscriber):
+            await self._pubsub.unsubscribe(f"{CHANNEL_PREFIX}{subscriber.user_id}")
+
+
+def create_broker():
+    """Instancier le broker configuré"""
+    if settings.events_backend == "redis":
+        return RedisBroker(settings.redis_url)
+    return InMemoryBroker()
+
+
+broker = create_broker()
+
+
+# === ÉMISSION DEPUIS LES ÉCRITURES ===
+
+def queue_change_event(session, user_id: int, entity: str, entity_id: int, action: str) -> None:
+    """Mémoriser un changement à publier au prochain commit de la session"""
+    session.info.setdefault("change_events", []).append(
+        (user_id, {"entity": entity, "id": entity_id, "action": action})
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def collect_change_events(session, flush_context):
+    """Mémoriser les lignes synchronisées écrites par le flush"""
+    for action, objects in (
+        ("created", session.new),
+        ("updated", session.dirty),
+        ("deleted", session.deleted),
+    ):
+        for obj in objects:
+            if not isinstance(obj, SYNC_MODELS):
+                continue
+            if action == "updated" and not session.is_modified(obj, include_collections=False):
+                continue
+            queue_change_event(session, obj.user_id, obj.__tablename__, obj.id, action)
+
+
+@event.listens_for(Session, "after_commit")
+def publish_change_events(session):
+    """Publier les changements une fois la transaction validée"""
+    # Libérer un point de sauvegarde (begin_nested) ne valide rien
+    if session.in_nested_transaction():
+        return
+    pending = session.info.pop("change_events", None)
+    if not pending:
+        return
+    
+    by_user: Dict[int, List[dict]] = {}
+    for user_id, change in pending:
+        by_user.setdefault(user_id, []).append(change)
+    for user_id, changes in by_user.items():
+        broker.publish(user_id, changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_change_events(session):
+    if session.in_nested_transaction():
+        return
+    session.info.pop("change_events", None)
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""
+Stockage des clés d'idempotence (en-tête Idempotency-Key).
+
+Une clé passe par deux états : « en cours » (verrou posé par la première requête,
+expirant après lock_seconds si le worker disparaît) puis « terminée » (réponse
+enregistrée, conservée ttl secondes). Chaque entrée porte l'empreinte de la
+requête d'origine : une clé réutilisée pour une autre requête est refusée.
+"""
+import base64
+import time
+from collections import OrderedDict
+from typing import Optional
+import orjson
+from ..config import settings
+
+KEY_PREFIX = "lifehub:idempotency:"
+
+PENDING = "pending"
+DONE = "done"
+
+
+class InMemoryIdempotencyStore:
+    """
+    Clés du processus courant (un seul worker, tests).
+    
+    Les entrées sont gardées dans l'ordre d'insertion : les expirées sont retirées
+    en tête, et les plus anciennes au-delà de max_entries.
+    """
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+    
+    async def start(self) -> None:
+        pass
+    
+    async def stop(self) -> None:
+        self._entries.clear()
+    
+    def _evict(self, now: float) -> None:
+        while self._entries:
+            key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[key]
+    
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+    
+    async def acquire(self, key: str, fingerprint: str, lock_seconds: int) -> bool:
+        """Poser le verrou de la clé ; False si elle est déjà prise (en cours ou terminée)"""
+        now = time.monotonic()
+        self._evict(now)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            return False
+        self._entries.pop(key, None)
+        self._entries[key] = (now + lock_seconds, {"state": PENDING, "fingerprint": fingerprint})
+        return True
+    
+    async def complete(self, key: str, record: dict, ttl: int) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + ttl, dict(record, state=DONE))
+    
+    async def release(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+
+class RedisIdempotencyStore:
+    """
+    Clés partagées entre workers via Redis.
+    
+    Le verrou est un SET NX avec expiration : deux workers recevant la même clé
+    en même temps ne traitent la requête qu'une fois. Une panne de Redis est
+    propagée à l'appelant, qui traite alors la requête sans idempotence.
+    """
+    
+    def __init__(self, url: str):
+        self._url = url
+        self._redis = None
+    
+    async def start(self) -> None:
+        import redis.asyncio as aioredis
+    
+        self._redis = aioredis.Redis.from_url(self._url, socket_timeout=0.1)
+    
+    async def stop(self) -> None:
+        if self._redis is not None:
+            await self._redis.close()
+    
+    @staticmethod
+    def _encode(record: dict) -> bytes:
+        if "body" in record:
+            record = dict(record, body=base64.b64encode(record["body"]).decode("ascii"))
+        return orjson.dumps(record)
+    
+    @staticmethod
+    def _decode(data: bytes) -> dict:
+        record = orjson.loads(data)
+        if "body" in record:
+            record["body"] = base64.b64decode(record["body"])
+        return record
+    
+    async def get(self, key: str) -> Optional[dict]:
+        data = await self._redis.get(KEY_PREFIX + key)
+        return None if data is None else self._decode(data)
+    
+    async def acquire(self, key: str, fingerprint: str, lock_seconds: int) -> bool:
+        record = {"state": PENDING, "fingerprint": fingerprint}
+        return bool(await self._redis.set(KEY_PREFIX + key, self._encode(record), nx=True, ex=lock_seconds))
+    
+    async def complete(self, key: str, record: dict, ttl: int) -> None:
+        await self._redis.set(KEY_PREFIX + key, self._encode(dict(record, state=DONE)), ex=ttl)
+    
+    async def release(self, key: str) -> None:
+        await self._redis.delete(KEY_PREFIX + key)
+
+
+def create_idempotency_store():
+    """Instancier le stockage configuré"""
+    if settings.idempotency_backend == "redis":
+        return RedisIdempotencyStore(settings.redis_url)
+    return InMemoryIdempotencyStore(settings.idempotency_max_entries)
+
+
+idempotency_store = create_idempotency_store()
\ No newline at end of file
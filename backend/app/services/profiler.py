@@ -0,0 +1,257 @@
+import asyncio
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from ..config import settings
+
+# Racine du code applicatif : les threads du pool ne sont échantillonnés que s'ils l'exécutent
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_ROOT = os.path.dirname(APP_ROOT)
+STDLIB_ROOT = os.path.dirname(os.__file__)
+MAX_DEPTH = 128
+MAX_STATEMENT_LENGTH = 500
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+# Tâche en cours de chaque boucle asyncio, lisible depuis un autre thread
+_current_tasks = getattr(asyncio.tasks, "_current_tasks", None)
+
+
+def _location(code) -> str:
+    filename = code.co_filename
+    if "site-packages" in filename:
+        return filename.rsplit("site-packages" + os.sep, 1)[-1]
+    for root in (SOURCE_ROOT, STDLIB_ROOT):
+        if filename.startswith(root):
+            return os.path.relpath(filename, root)
+    return filename
+
+
+def fold(frame) -> str:
+    """Pile d'appels au format « replié » des flame graphs (racine d'abord, séparée par ;)"""
+    names = []
+    while frame is not None and len(names) < MAX_DEPTH:
+        names.append(f"{frame.f_code.co_name} ({_location(frame.f_code)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _runs_app_code(frame) -> bool:
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(APP_ROOT):
+            return True
+        frame = frame.f_back
+    return False
+
+
+class RequestProfile:
+    """Échantillons de pile et chronologie SQL d'une requête"""
+    
+    def __init__(self, profile_id: int, method: str, path: str, reason: Optional[str], max_samples: int, max_queries: int):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.reason = reason
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.status_code: Optional[int] = None
+        self.loop = asyncio.get_running_loop()
+        self.task = asyncio.current_task()
+        self.thread_id = threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.dropped_samples = 0
+        self.queries: List[tuple] = []
+        self.dropped_queries = 0
+        self.sql_ms = 0.0
+        self.sql_count = 0
+        self._max_samples = max_samples
+        self._max_queries = max_queries
+    
+    def add_sample(self, stack: str) -> None:
+        if self.samples >= self._max_samples:
+            self.dropped_samples += 1
+            return
+        self.samples += 1
+        self.stacks[stack] += 1
+    
+    def add_query(self, started: float, duration: float, statement: str) -> None:
+        self.sql_count += 1
+        self.sql_ms += duration * 1000
+        if len(self.queries) >= self._max_queries:
+            self.dropped_queries += 1
+            return
+        self.queries.append((
+            round((started - self.started) * 1000, 3),
+            round(duration * 1000, 3),
+            " ".join(statement.split())[:MAX_STATEMENT_LENGTH]
+        ))
+    
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status_code": self.status_code,
+            "reason": self.reason,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "samples": self.samples,
+            "sql_count": self.sql_count,
+            "sql_ms": round(self.sql_ms, 3),
+        }
+    
+    def detail(self, interval_ms: float) -> dict:
+        return dict(
+            self.summary(),
+            interval_ms=interval_ms,
+            dropped_samples=self.dropped_samples,
+            dropped_queries=self.dropped_queries,
+            stacks=[{"stack": stack, "samples": count} for stack, count in self.stacks.most_common()],
+            sql=[
+                {"start_ms": start, "duration_ms": duration, "statement": statement}
+                for start, duration, statement in self.queries
+            ],
+        )
+    
+    def folded(self) -> str:
+        """Piles repliées, une par ligne (« pile nombre »), pour flamegraph.pl / speedscope"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.items())
+
+
+class Profiler:
+    """
+    Profileur par échantillonnage des requêtes, pour le diagnostic en production.
+    
+    Un thread unique relève périodiquement les piles (sys._current_frames) tant
+    qu'au moins une requête est profilée ; il dort sinon. Le thread de la boucle
+    asyncio n'est attribué à une requête que lorsque la tâche de cette requête est
+    celle en cours d'exécution. Les threads du pool (dépendances synchrones) sont
+    attribués à toutes les requêtes profilées en cours, seulement s'ils exécutent
+    du code de l'application. Les requêtes SQL sont chronométrées via les
+    événements de l'engine. Les N derniers profils sont gardés en mémoire.
+    """
+    
+    def __init__(self, interval_ms: float, buffer_size: int, max_samples: int, max_queries: int):
+        self.interval_ms = interval_ms
+        self.max_samples = max_samples
+        self.max_queries = max_queries
+        self.profiles: "deque[RequestProfile]" = deque(maxlen=buffer_size)
+        self._ids = itertools.count(1)
+        self._active: Dict[int, RequestProfile] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._installed = False
+    
+    def install(self) -> None:
+        """Chronométrer les requêtes SQL de tous les engines"""
+        if self._installed:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        self._installed = True
+    
+    def begin(self, method: str, path: str, reason: Optional[str]) -> RequestProfile:
+        """Commencer à profiler la requête en cours (à appeler depuis sa tâche)"""
+        profile = RequestProfile(next(self._ids), method, path, reason, self.max_samples, self.max_queries)
+        with self._lock:
+            self._active[profile.id] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return profile
+    
+    def end(self, profile: RequestProfile) -> None:
+        """Arrêter l'échantillonnage d'un profil"""
+        profile.duration_ms = round((time.perf_counter() - profile.started) * 1000, 3)
+        with self._lock:
+            self._active.pop(profile.id, None)
+            if not self._active:
+                self._wakeup.clear()
+    
+    def keep(self, profile: RequestProfile) -> None:
+        """Conserver un profil terminé (les plus anciens sont évincés)"""
+        with self._lock:
+            self.profiles.append(profile)
+    
+    def recent(self) -> List[RequestProfile]:
+        """Profils conservés, du plus récent au plus ancien"""
+        with self._lock:
+            return list(reversed(self.profiles))
+    
+    def get(self, profile_id: int) -> Optional[RequestProfile]:
+        for profile in self.recent():
+            if profile.id == profile_id:
+                return profile
+        return None
+    
+    def _sample(self) -> None:
+        with self._lock:
+            active = list(self._active.values())
+        if not active:
+            return
+        own = threading.get_ident()
+        frames = sys._current_frames()
+        loop_threads = {profile.thread_id for profile in active}
+    
+        # Threads du pool exécutant du code applicatif
+        pool_stacks = [
+            fold(frame) for thread_id, frame in frames.items()
+            if thread_id != own and thread_id not in loop_threads and _runs_app_code(frame)
+        ]
+        for profile in active:
+            frame = frames.get(profile.thread_id)
+            if frame is not None:
+                running = _current_tasks.get(profile.loop) if _current_tasks is not None else profile.task
+                if running is profile.task:
+                    profile.add_sample(fold(frame))
+            for stack in pool_stacks:
+                profile.add_sample(stack)
+    
+    def _run(self) -> None:
+        interval = self.interval_ms / 1000
+        while True:
+            self._wakeup.wait()
+            time.sleep(interval)
+            self._sample()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("profiler_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    starts = conn.info.get("profiler_query_start")
+    if profile is None or not starts:
+        return
+    started = starts.pop()
+    profile.add_query(started, time.perf_counter() - started, statement)
+
+
+def activate(profile: Optional[RequestProfile]):
+    """Associer le profil au contexte courant (hérité par les threads du pool)"""
+    return _current.set(profile)
+
+
+def deactivate(token) -> None:
+    _current.reset(token)
+
+
+profiler = Profiler(
+    settings.profiling_interval_ms,
+    settings.profiling_buffer_size,
+    settings.profiling_max_samples,
+    settings.profiling_max_queries
+)
\ No newline at end of file
@@ -0,0 +1,328 @@
+"""
+Stockage des justificatifs de transactions.
+
+Les fichiers sont adressés par leur contenu (SHA-256) : deux envois identiques
+ne sont stockés qu'une fois, et l'URL d'un justificatif ne change jamais de
+contenu (cache immuable). Le corps de la requête est écrit sur disque par
+morceaux pendant sa réception, sans être conservé en mémoire ; la taille et le
+type sont vérifiés au fil de l'eau. Les miniatures des images sont générées par
+un pool de threads, après la réponse.
+
+Les fichiers qui ne sont plus référencés (justificatif remplacé, transaction ou
+compte supprimés) sont supprimés par le balayage périodique :
+
+    python -m app.services.receipts
+"""
+import argparse
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Optional, Set
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+from ..config import settings
+from ..models.budget import BudgetTransaction
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow est optionnel : pas de miniatures sinon
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+URL_PREFIX = "/api/budget/receipts/"
+THUMBNAIL_EXTENSION = "jpg"
+
+# Extension stockée pour chaque type de contenu accepté
+CONTENT_TYPES = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "application/pdf": "pdf",
+    "application/msword": "doc",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+}
+MEDIA_TYPES = {extension: content_type for content_type, extension in CONTENT_TYPES.items()}
+IMAGE_EXTENSIONS = {"jpg", "png", "gif"}
+
+# Signature des premiers octets : le type annoncé doit correspondre au contenu
+MAGIC_NUMBERS = {
+    "jpg": (b"\xff\xd8\xff",),
+    "png": (b"\x89PNG\r\n\x1a\n",),
+    "gif": (b"GIF87a", b"GIF89a"),
+    "pdf": (b"%PDF-",),
+    "doc": (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",),
+    "docx": (b"PK\x03\x04",),
+}
+MAGIC_LENGTH = 8
+
+_NAME = re.compile(r"^([0-9a-f]{64})\.([a-z0-9]{1,8})$")
+
+
+def receipts_dir() -> str:
+    return os.path.join(settings.upload_dir, "receipts")
+
+
+def thumbnails_dir() -> str:
+    return os.path.join(settings.upload_dir, "thumbnails")
+
+
+def receipt_path(digest: str, extension: str) -> str:
+    """Chemin d'un fichier, réparti en sous-répertoires par préfixe d'empreinte"""
+    return os.path.join(receipts_dir(), digest[:2], f"{digest}.{extension}")
+
+
+def thumbnail_path(digest: str) -> str:
+    return os.path.join(thumbnails_dir(), digest[:2], f"{digest}.{THUMBNAIL_EXTENSION}")
+
+
+def receipt_url(digest: str, extension: str) -> str:
+    return f"{URL_PREFIX}{digest}.{extension}"
+
+
+def parse_name(name: str):
+    """(empreinte, extension) d'un nom de fichier servi, ou 404"""
+    match = _NAME.match(name)
+    if match is None or match.group(2) not in MEDIA_TYPES:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Justificatif non trouvé")
+    return match.group(1), match.group(2)
+
+
+def upload_extension(content_type: Optional[str], filename: Optional[str]) -> str:
+    """Extension du fichier envoyé (nom de fichier prioritaire, sinon Content-Type)"""
+    if filename and "." in filename:
+        extension = filename.rsplit(".", 1)[1].lower()
+    else:
+        extension = CONTENT_TYPES.get((content_type or "").split(";")[0].strip().lower())
+    if extension == "jpeg":
+        extension = "jpg"
+    allowed = {"jpg" if value == "jpeg" else value for value in settings.allowed_extensions_list}
+    if extension not in MEDIA_TYPES or extension not in allowed:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Type de fichier non autorisé (extensions : {', '.join(sorted(allowed & set(MEDIA_TYPES)))})"
+        )
+    return extension
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Fichier trop volumineux (maximum {settings.max_upload_size})"
+    )
+
+
+def check_declared_size(content_length: Optional[str]) -> None:
+    """Refuser dès les en-têtes un corps annoncé trop volumineux"""
+    if content_length is not None and content_length.isdigit() and int(content_length) > settings.max_upload_bytes:
+        raise _too_large()
+
+
+def owns_receipt(db, user_id: int, url: str) -> bool:
+    """Le justificatif est-il celui d'une transaction de l'utilisateur ?"""
+    return db.execute(
+        select(BudgetTransaction.id)
+        .where(BudgetTransaction.user_id == user_id, BudgetTransaction.receipt_url == url)
+        .limit(1)
+    ).first() is not None
+
+
+def _open_temporary() -> tuple:
+    directory = os.path.join(settings.upload_dir, "tmp")
+    os.makedirs(directory, exist_ok=True)
+    descriptor, path = tempfile.mkstemp(dir=directory, suffix=".part")
+    return os.fdopen(descriptor, "wb"), path
+
+
+def _write(file, hasher, data: bytes) -> None:
+    # hashlib libère le GIL au-delà de 2 Ko : empreinte et écriture hors de la boucle
+    hasher.update(data)
+    file.write(data)
+
+
+def _finish(file, temporary: str, digest: str, extension: str) -> bool:
+    """Placer le fichier à son adresse ; False s'il y était déjà (doublon)"""
+    file.close()
+    path = receipt_path(digest, extension)
+    if os.path.exists(path):
+        os.unlink(temporary)
+        # Rafraîchir la date : le balayage ne supprime que les fichiers anciens
+        os.utime(path)
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(temporary, path)
+    return True
+
+
+def _discard(file, temporary: str) -> None:
+    file.close()
+    try:
+        os.unlink(temporary)
+    except FileNotFoundError:
+        pass
+
+
+async def store_stream(chunks: AsyncIterator[bytes], extension: str) -> str:
+    """
+    Écrire un flux sur disque et retourner l'empreinte SHA-256 de son contenu.
+    
+    Les morceaux reçus sont regroupés en blocs de upload_chunk_size, écrits dans un
+    fichier temporaire depuis le pool de threads. Le flux est interrompu (413) dès
+    que la taille maximale est dépassée, et refusé (415) si ses premiers octets ne
+    correspondent pas au type annoncé.
+    """
+    max_size = settings.max_upload_bytes
+    chunk_size = settings.upload_chunk_size
+    hasher = hashlib.sha256()
+    file, temporary = await run_in_threadpool(_open_temporary)
+    size = 0
+    buffer = bytearray()
+    checked = False
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_size:
+                raise _too_large()
+            buffer += chunk
+            if not checked and len(buffer) >= MAGIC_LENGTH:
+                _check_magic(bytes(buffer[:MAGIC_LENGTH]), extension)
+                checked = True
+            if len(buffer) >= chunk_size:
+                await run_in_threadpool(_write, file, hasher, bytes(buffer))
+                buffer.clear()
+        if not checked:
+            _check_magic(bytes(buffer), extension)
+        if buffer:
+            await run_in_threadpool(_write, file, hasher, bytes(buffer))
+        digest = hasher.hexdigest()
+        await run_in_threadpool(_finish, file, temporary, digest, extension)
+    except BaseException:
+        # Synchrone : la tâche peut avoir été annulée (client déconnecté)
+        _discard(file, temporary)
+        raise
+    return digest
+
+
+def _check_magic(head: bytes, extension: str) -> None:
+    if not any(head.startswith(magic) for magic in MAGIC_NUMBERS[extension]):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Le contenu du fichier ne correspond pas à son type"
+        )
+
+
+# === MINIATURES ===
+
+class ThumbnailPool:
+    """Génération des miniatures dans un pool de threads (Pillow libère le GIL)"""
+    
+    def __init__(self, workers: int, size: int):
+        self.workers = workers
+        self.size = size
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+    
+    @property
+    def available(self) -> bool:
+        return Image is not None
+    
+    def submit(self, digest: str, extension: str):
+        """Planifier la miniature d'une image (sans effet si elle existe ou est en cours)"""
+        if not self.available or extension not in IMAGE_EXTENSIONS:
+            return None
+        if os.path.exists(thumbnail_path(digest)):
+            return None
+        with self._lock:
+            if digest in self._pending:
+                return None
+            self._pending.add(digest)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="receipt-thumbnail")
+        return self._executor.submit(self._generate, digest, extension)
+    
+    def _generate(self, digest: str, extension: str) -> None:
+        target = thumbnail_path(digest)
+        try:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with Image.open(receipt_path(digest, extension)) as image:
+                # Décodage JPEG réduit directement à l'échelle utile
+                image.draft("RGB", (self.size, self.size))
+                image.thumbnail((self.size, self.size))
+                temporary = f"{target}.{threading.get_ident()}.part"
+                image.convert("RGB").save(temporary, "JPEG", quality=80, optimize=True)
+            os.replace(temporary, target)
+        except Exception:
+            logger.exception("Miniature impossible pour le justificatif %s", digest)
+        finally:
+            with self._lock:
+                self._pending.discard(digest)
+    
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+thumbnails = ThumbnailPool(settings.receipt_thumbnail_workers, settings.receipt_thumbnail_size)
+
+
+# === BALAYAGE DES FICHIERS ORPHELINS ===
+
+def collect_orphans(db, grace_seconds: int = None, batch_size: int = 1000) -> int:
+    """
+    Supprimer les justificatifs (et miniatures) qu'aucune transaction ne référence.
+    
+    Les fichiers modifiés depuis moins de grace_seconds sont conservés : un envoi
+    en cours a pu écrire le fichier sans avoir encore enregistré sa transaction.
+    """
+    grace_seconds = settings.receipt_orphan_grace_seconds if grace_seconds is None else grace_seconds
+    limit = time.time() - grace_seconds
+    candidates = {}
+    for root, _, files in os.walk(receipts_dir()):
+        for name in files:
+            match = _NAME.match(name)
+            path = os.path.join(root, name)
+            if match is not None and os.stat(path).st_mtime < limit:
+                candidates[receipt_url(*match.groups())] = (path, match.group(1))
+    
+    removed = 0
+    urls = list(candidates)
+    for start in range(0, len(urls), batch_size):
+        batch = urls[start:start + batch_size]
+        referenced = set(db.execute(
+            select(BudgetTransaction.receipt_url).where(BudgetTransaction.receipt_url.in_(batch)).distinct()
+        ).scalars())
+        for url in batch:
+            if url in referenced:
+                continue
+            path, digest = candidates[url]
+            for orphan in (path, thumbnail_path(digest)):
+                try:
+                    os.unlink(orphan)
+                except FileNotFoundError:
+                    pass
+            removed += 1
+    return removed
+
+
+def main():
+    from ..database import SessionLocal
+    
+    parser = argparse.ArgumentParser(description="Suppression des justificatifs orphelins")
+    parser.add_argument("--grace-seconds", type=int, default=settings.receipt_orphan_grace_seconds)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=settings.log_level)
+    with SessionLocal() as db:
+        removed = collect_orphans(db, args.grace_seconds)
+    logger.info("%s justificatif(s) orphelin(s) supprimé(s)", removed)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,315 @@
+"""
+Dispatcher des rappels d'échéance.
+
+Chaque dispatcher traite un shard d'utilisateurs (user_id % shard_count) :
+
+    python -m app.services.reminders --shard-index 0 --shard-count 4
+
+Les tâches dont le rappel tombe dans l'horizon sont lues par une plage de l'index
+ix_tasks_completed_due puis placées dans une file de priorité en mémoire, triée par
+heure de rappel. Seule la fenêtre proche est balayée : le coût ne dépend pas du
+nombre total de tâches. L'état de livraison est enregistré dans task_reminders,
+unique par (tâche, échéance) : un rappel n'est jamais envoyé deux fois, même après
+un redémarrage, et une échéance reportée ouvre un nouveau rappel.
+"""
+import argparse
+import heapq
+import logging
+import signal
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+from uuid import uuid4
+from sqlalchemy import and_, exists, insert, literal, or_, select, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models.task import Task, TaskStatus
+from ..models.reminder import ReminderStatus, TaskReminder
+
+logger = logging.getLogger(__name__)
+
+
+class Reminder(NamedTuple):
+    """Rappel en file d'attente"""
+    remind_at: datetime
+    task_id: int
+    user_id: int
+    title: str
+    due_date: datetime
+
+
+class LogNotifier:
+    """Notificateur par défaut : journalise les rappels"""
+    
+    def send(self, user_id: int, reminders: List[Reminder]) -> None:
+        titles = ", ".join(reminder.title for reminder in reminders)
+        logger.info("Rappel pour l'utilisateur %s (%d tâches) : %s", user_id, len(reminders), titles)
+
+
+class StubNotifier:
+    """Notificateur local qui compte les envois (tests de débit)"""
+    
+    def __init__(self):
+        self.notifications = 0
+        self.reminders = 0
+        self.delivered: Set[Tuple[int, datetime]] = set()
+    
+    def send(self, user_id: int, reminders: List[Reminder]) -> None:
+        self.notifications += 1
+        self.reminders += len(reminders)
+        self.delivered.update((reminder.task_id, reminder.due_date) for reminder in reminders)
+
+
+def create_notifier():
+    """Instancier le notificateur configuré"""
+    if settings.reminder_notifier == "stub":
+        return StubNotifier()
+    return LogNotifier()
+
+
+def _utcnow() -> datetime:
+    """Les échéances sont stockées en UTC sans fuseau"""
+    return datetime.utcnow()
+
+
+class ReminderDispatcher:
+    """Envoi des rappels d'un shard, par lots regroupés par utilisateur"""
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        notifier=None,
+        shard_index: Optional[int] = None,
+        shard_count: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.notifier = notifier or create_notifier()
+        self.shard_index = settings.reminder_shard_index if shard_index is None else shard_index
+        self.shard_count = settings.reminder_shard_count if shard_count is None else shard_count
+        if not 0 <= self.shard_index < self.shard_count:
+            raise ValueError("Index de shard hors limites")
+    
+        self.lead = timedelta(minutes=settings.reminder_lead_minutes)
+        self.horizon = timedelta(seconds=settings.reminder_horizon_seconds)
+        self.grace = timedelta(minutes=settings.reminder_grace_minutes)
+        self.claim_timeout = timedelta(seconds=settings.reminder_claim_timeout)
+    
+        self._queue: List[Reminder] = []
+        self._queued: Set[Tuple[int, datetime]] = set()
+        self._next_refill: Optional[datetime] = None
+    
+    # === FILE D'ATTENTE ===
+    
+    def refill(self, now: Optional[datetime] = None) -> int:
+        """
+        Charger les rappels dont l'heure tombe entre now - grace et now + horizon.
+    
+        La fenêtre est rebalayée à chaque rechargement pour prendre en compte les
+        tâches créées ou reprogrammées depuis ; les rappels déjà en file ou déjà
+        envoyés sont ignorés.
+        """
+        now = now or _utcnow()
+        db = self.session_factory()
+        try:
+            query = db.query(Task.id, Task.user_id, Task.title, Task.due_date).filter(
+                Task.completed == False,  # noqa: E712
+                Task.due_date >= now - self.grace + self.lead,
+                Task.due_date < now + self.horizon + self.lead,
+                Task.status != TaskStatus.CANCELLED,
+                ~exists().where(and_(
+                    TaskReminder.task_id == Task.id,
+                    TaskReminder.due_date == Task.due_date,
+                    TaskReminder.status == ReminderStatus.SENT
+                ))
+            )
+            if self.shard_count > 1:
+                query = query.filter(Task.user_id % self.shard_count == self.shard_index)
+            rows = query.order_by(Task.due_date).all()
+        finally:
+            db.close()
+    
+        added = 0
+        for task_id, user_id, title, due_date in rows:
+            key = (task_id, due_date)
+            if key in self._queued:
+                continue
+            self._queued.add(key)
+            heapq.heappush(self._queue, Reminder(due_date - self.lead, task_id, user_id, title, due_date))
+            added += 1
+    
+        self._next_refill = now + self.horizon / 2
+        return added
+    
+    def _pop_due(self, now: datetime) -> List[Reminder]:
+        due = []
+        while self._queue and self._queue[0].remind_at <= now and len(due) < settings.reminder_batch_size:
+            reminder = heapq.heappop(self._queue)
+            self._queued.discard((reminder.task_id, reminder.due_date))
+            due.append(reminder)
+        return due
+    
+    # === LIVRAISON ===
+    
+    def _claim(self, db: Session, reminders: List[Reminder], now: datetime) -> Tuple[List[Reminder], str]:
+        """
+        Réserver les rappels à envoyer dans task_reminders.
+    
+        La réservation relit la tâche dans la même requête (INSERT ... SELECT depuis
+        tasks, UPDATE ... WHERE EXISTS) : une tâche supprimée, terminée, annulée ou
+        reprogrammée depuis sa mise en file n'est pas réservée. Sont aussi écartés les
+        rappels déjà envoyés, réservés récemment par un autre dispatcher ou qui ont
+        épuisé leurs tentatives. Chaque ligne réservée porte le jeton de l'appel :
+        seuls les rappels effectivement réservés sont retournés, une ligne écartée
+        n'annule pas le reste du lot.
+        """
+        token = uuid4().hex
+        keys = [(reminder.task_id, reminder.due_date) for reminder in reminders]
+        stale = now - self.claim_timeout
+        task_pending = and_(Task.completed == False, Task.status != TaskStatus.CANCELLED)  # noqa: E712
+    
+        # Nouveaux rappels : une ligne par tâche encore due, sans rappel pour cette échéance
+        candidates = select(
+            Task.id, Task.user_id, Task.due_date,
+            literal(ReminderStatus.CLAIMED, TaskReminder.status.type),
+            literal(1), literal(now, TaskReminder.claimed_at.type), literal(token)
+        ).where(
+            tuple_(Task.id, Task.due_date).in_(keys),
+            task_pending,
+            ~exists().where(and_(TaskReminder.task_id == Task.id, TaskReminder.due_date == Task.due_date))
+        )
+        columns = ["task_id", "user_id", "due_date", "status", "attempts", "claimed_at", "claim_token"]
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            statement = postgresql.insert(TaskReminder).from_select(columns, candidates).on_conflict_do_nothing()
+        else:
+            # Réservation concurrente de la même échéance : la ligne est ignorée, pas le lot
+            statement = (
+                insert(TaskReminder).from_select(columns, candidates)
+                .prefix_with("IGNORE", dialect="mysql")
+                .prefix_with("OR IGNORE", dialect="sqlite")
+            )
+        db.execute(statement)
+    
+        # Nouvelles tentatives : échecs et réservations abandonnées
+        db.query(TaskReminder).filter(
+            tuple_(TaskReminder.task_id, TaskReminder.due_date).in_(keys),
+            TaskReminder.attempts < settings.reminder_max_attempts,
+            or_(
+                TaskReminder.status == ReminderStatus.FAILED,
+                and_(TaskReminder.status == ReminderStatus.CLAIMED, TaskReminder.claimed_at <= stale)
+            ),
+            exists().where(
+                Task.id == TaskReminder.task_id, Task.due_date == TaskReminder.due_date, task_pending
+            )
+        ).update({
+            TaskReminder.status: ReminderStatus.CLAIMED,
+            TaskReminder.claimed_at: now,
+            TaskReminder.attempts: TaskReminder.attempts + 1,
+            TaskReminder.claim_token: token,
+        }, synchronize_session=False)
+        db.commit()
+    
+        claimed = set(db.query(TaskReminder.task_id, TaskReminder.due_date).filter(
+            tuple_(TaskReminder.task_id, TaskReminder.due_date).in_(keys),
+            TaskReminder.claim_token == token
+        ).all())
+        db.commit()
+        return [reminder for reminder in reminders if (reminder.task_id, reminder.due_date) in claimed], token
+    
+    def _mark(self, db: Session, reminders: List[Reminder], token: str, status: ReminderStatus, now: datetime) -> None:
+        """Enregistrer l'issue de l'envoi en une seule requête"""
+        values = {TaskReminder.status: status}
+        if status == ReminderStatus.SENT:
+            values[TaskReminder.sent_at] = now
+        db.query(TaskReminder).filter(
+            tuple_(TaskReminder.task_id, TaskReminder.due_date).in_(
+                [(reminder.task_id, reminder.due_date) for reminder in reminders]
+            ),
+            TaskReminder.status == ReminderStatus.CLAIMED,
+            TaskReminder.claim_token == token
+        ).update(values, synchronize_session=False)
+        db.commit()
+    
+    def deliver(self, reminders: List[Reminder], now: Optional[datetime] = None) -> int:
+        """Réserver puis envoyer un lot de rappels, une notification par utilisateur"""
+        now = now or _utcnow()
+        db = self.session_factory()
+        try:
+            claimed, token = self._claim(db, reminders, now)
+    
+            by_user: Dict[int, List[Reminder]] = {}
+            for reminder in claimed:
+                by_user.setdefault(reminder.user_id, []).append(reminder)
+    
+            sent, failed = [], []
+            for user_id, user_reminders in by_user.items():
+                try:
+                    self.notifier.send(user_id, user_reminders)
+                    sent.extend(user_reminders)
+                except Exception:
+                    logger.exception("Échec de l'envoi des rappels de l'utilisateur %s", user_id)
+                    failed.extend(user_reminders)
+    
+            if sent:
+                self._mark(db, sent, token, ReminderStatus.SENT, now)
+            if failed:
+                self._mark(db, failed, token, ReminderStatus.FAILED, now)
+            return len(sent)
+        finally:
+            db.close()
+    
+    # === BOUCLE ===
+    
+    def run_once(self, now: Optional[datetime] = None) -> int:
+        """Recharger la file si nécessaire puis envoyer tous les rappels échus"""
+        now = now or _utcnow()
+        if self._next_refill is None or now >= self._next_refill:
+            self.refill(now)
+    
+        sent = 0
+        while True:
+            due = self._pop_due(now)
+            if not due:
+                return sent
+            sent += self.deliver(due, now)
+    
+    def _sleep_seconds(self, now: datetime) -> float:
+        wake = self._next_refill or now
+        if self._queue:
+            wake = min(wake, self._queue[0].remind_at)
+        return max(0.0, min((wake - now).total_seconds(), self.horizon.total_seconds()))
+    
+    def run_forever(self, stop: threading.Event) -> None:
+        """Dormir jusqu'au prochain rappel ou rechargement, jusqu'à l'arrêt demandé"""
+        logger.info("Dispatcher de rappels démarré (shard %s/%s)", self.shard_index, self.shard_count)
+        while not stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Erreur du dispatcher de rappels")
+                self._next_refill = None
+                stop.wait(5)
+                continue
+            stop.wait(self._sleep_seconds(_utcnow()))
+        logger.info("Dispatcher de rappels arrêté")
+
+
+def main():
+    from ..database import SessionLocal
+    
+    parser = argparse.ArgumentParser(description="Dispatcher des rappels d'échéance")
+    parser.add_argument("--shard-index", type=int, default=settings.reminder_shard_index)
+    parser.add_argument("--shard-count", type=int, default=settings.reminder_shard_count)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=settings.log_level)
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    
+    ReminderDispatcher(SessionLocal, shard_index=args.shard_index, shard_count=args.shard_count).run_forever(stop)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,127 @@
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+from ..models.shopping import ShoppingItem
+from .archive import with_archive
+from ..money import money, to_decimal
+from ..schemas.shopping import (
+    PriceHistory, PricePoint, ShoppingCategorySummary, ShoppingSummary
+)
+
+_COMPLETED = ShoppingItem.completed == True  # noqa: E712
+# Articles achetés dont les prix estimé et réel sont connus : base de l'écart de prix
+_COMPARED = and_(
+    _COMPLETED,
+    ShoppingItem.estimated_price.isnot(None),
+    ShoppingItem.actual_price.isnot(None)
+)
+
+
+def _cost(price_column, condition=None):
+    """Quantité × prix (en centimes), 0 si le prix est inconnu (ou si la condition n'est pas remplie)"""
+    condition = price_column.isnot(None) if condition is None else and_(condition, price_column.isnot(None))
+    return money(case((condition, ShoppingItem.quantity * price_column), else_=0))
+
+
+def _count(condition):
+    return func.sum(case((condition, 1), else_=0))
+
+
+def _money(value) -> Decimal:
+    return to_decimal(value or 0)
+
+
+def shopping_summary(db: Session, user_id: int) -> ShoppingSummary:
+    """
+    Résumé des courses d'un utilisateur en une seule requête.
+    
+    Une agrégation conditionnelle groupée par catégorie calcule à la fois les
+    compteurs, les totaux estimés et réels et l'écart de prix ; les totaux globaux
+    sont la somme des quelques lignes de catégories. Les montants sont sommés en
+    centimes : les totaux sont exacts.
+    """
+    rows = db.query(
+        ShoppingItem.category,
+        func.count(ShoppingItem.id),
+        _count(_COMPLETED),
+        func.sum(_cost(ShoppingItem.estimated_price)),
+        func.sum(_cost(ShoppingItem.estimated_price, _COMPLETED)),
+        func.sum(_cost(ShoppingItem.actual_price)),
+        _count(_COMPARED),
+        func.sum(_cost(ShoppingItem.estimated_price, _COMPARED)),
+        func.sum(_cost(ShoppingItem.actual_price, _COMPARED)),
+    ).filter(
+        ShoppingItem.user_id == user_id
+    ).group_by(ShoppingItem.category).all()
+    
+    categories = []
+    total_items = completed_items = compared_items = 0
+    estimated_total = completed_estimated = actual_total = Decimal(0)
+    compared_estimated = compared_actual = Decimal(0)
+    for category, items, completed, estimated, estimated_done, actual, compared, compared_est, compared_act in rows:
+        categories.append(ShoppingCategorySummary(
+            category=category,
+            total_items=items,
+            completed_items=completed or 0,
+            estimated_total=_money(estimated),
+            actual_total=_money(actual)
+        ))
+        total_items += items
+        completed_items += completed or 0
+        compared_items += compared or 0
+        estimated_total += estimated or 0
+        completed_estimated += estimated_done or 0
+        actual_total += actual or 0
+        compared_estimated += compared_est or 0
+        compared_actual += compared_act or 0
+    
+    categories.sort(key=lambda summary: summary.estimated_total, reverse=True)
+    price_variance = compared_actual - compared_estimated
+    return ShoppingSummary(
+        total_items=total_items,
+        completed_items=completed_items,
+        pending_items=total_items - completed_items,
+        completion_rate=(completed_items / total_items * 100) if total_items > 0 else 0,
+        estimated_total=_money(estimated_total),
+        pending_estimated_total=_money(estimated_total - completed_estimated),
+        actual_total=_money(actual_total),
+        compared_items=compared_items,
+        price_variance=_money(price_variance),
+        price_variance_rate=round(float(price_variance / compared_estimated * 100), 2) if compared_estimated else None,
+        categories=categories
+    )
+
+
+def price_history(db: Session, user_id: int, name: str, limit: int = 50) -> PriceHistory:
+    """
+    Prix payés pour un article lors de ses `limit` derniers achats, du plus ancien
+    au plus récent, achats archivés compris (index *_user_name_purchased).
+    """
+    query = db.query(
+        ShoppingItem.purchased_at,
+        ShoppingItem.actual_price,
+        ShoppingItem.quantity,
+        ShoppingItem.unit
+    ).filter(
+        ShoppingItem.user_id == user_id,
+        ShoppingItem.name == name,
+        ShoppingItem.purchased_at.isnot(None),
+        ShoppingItem.actual_price.isnot(None)
+    ).order_by(ShoppingItem.purchased_at.desc()).limit(limit)
+    rows = db.execute(with_archive(query, ShoppingItem, user_id)).all()
+    
+    points = [
+        PricePoint(purchased_at=purchased_at, actual_price=price, quantity=quantity, unit=unit)
+        for purchased_at, price, quantity, unit in reversed(rows)
+    ]
+    prices = [point.actual_price for point in points]
+    average: Optional[Decimal] = to_decimal(sum(prices) / len(prices)) if prices else None
+    return PriceHistory(
+        name=name,
+        purchases=len(points),
+        min_price=min(prices) if prices else None,
+        max_price=max(prices) if prices else None,
+        average_price=average,
+        points=points
+    )
\ No newline at end of file
@@ -0,0 +1,196 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, NamedTuple, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models.user import User
+from ..models.task import Task
+from ..models.shopping import ShoppingItem
+from ..models.budget import BudgetCategory, BudgetTransaction
+from ..models.sync import SyncTombstone
+
+# Modèles synchronisés : le nom de table sert de nom de section dans la réponse
+SYNC_MODELS = (Task, ShoppingItem, BudgetCategory, BudgetTransaction)
+_MODELS_BY_NAME = {model.__tablename__: model for model in SYNC_MODELS}
+
+
+class SnapshotCursor(NamedTuple):
+    """Position dans un instantané complet : watermark de la première page, table et dernier id envoyé"""
+    watermark: datetime
+    entity: str
+    last_id: int
+    
+    def encode(self) -> str:
+        payload = json.dumps([self.watermark.isoformat(), self.entity, self.last_id])
+        return base64.urlsafe_b64encode(payload.encode()).decode("ascii")
+    
+    @classmethod
+    def decode(cls, value: str) -> "SnapshotCursor":
+        """Lire un curseur renvoyé par le client (400 s'il est invalide)"""
+        try:
+            watermark, entity, last_id = json.loads(base64.urlsafe_b64decode(value.encode("ascii")))
+            cursor = cls(datetime.fromisoformat(watermark), entity, int(last_id))
+        except (TypeError, ValueError, UnicodeError):
+            cursor = None
+        if cursor is None or cursor.entity not in _MODELS_BY_NAME:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Curseur de synchronisation invalide")
+        return cursor
+
+
+@event.listens_for(Session, "before_flush")
+def record_tombstones(session, flush_context, instances):
+    """Tracer chaque suppression d'une ligne synchronisée, y compris les suppressions en cascade"""
+    deleted_users = {obj.id for obj in session.deleted if isinstance(obj, User)}
+    for obj in list(session.deleted):
+        if isinstance(obj, SYNC_MODELS) and obj.user_id not in deleted_users:
+            session.add(SyncTombstone(
+                user_id=obj.user_id,
+                entity=obj.__tablename__,
+                entity_id=obj.id
+            ))
+
+
+def record_deletions(session: Session, model, user_id: int, ids: Iterable[int]) -> None:
+    """Tracer des suppressions faites par un DELETE direct (hors unité de travail)"""
+    session.add_all(
+        SyncTombstone(user_id=user_id, entity=model.__tablename__, entity_id=entity_id)
+        for entity_id in ids
+    )
+
+
+def _snapshot_page(
+    db: Session,
+    user_id: int,
+    cursor: SnapshotCursor,
+    limit: int
+) -> Tuple[dict, Optional[SnapshotCursor]]:
+    """
+    Lire au plus `limit` lignes de l'instantané à partir du curseur.
+    
+    Les tables sont parcourues dans l'ordre de SYNC_MODELS, chacune par id croissant
+    (index de clé primaire) : une page coûte `limit` lignes quelle que soit sa position.
+    """
+    rows = {}
+    remaining = limit
+    models = SYNC_MODELS[SYNC_MODELS.index(_MODELS_BY_NAME[cursor.entity]):]
+    last_id = cursor.last_id
+    for model in models:
+        if remaining == 0:
+            # Page pleine : un curseur seulement s'il reste des lignes (pas de dernière page vide)
+            if db.query(model.id).filter(model.user_id == user_id).first() is None:
+                continue
+            return rows, cursor._replace(entity=model.__tablename__, last_id=0)
+        page = db.query(model).filter(
+            model.user_id == user_id, model.id > last_id
+        ).order_by(model.id).limit(remaining + 1).all()
+        if len(page) > remaining:
+            rows[model.__tablename__] = page[:remaining]
+            return rows, cursor._replace(entity=model.__tablename__, last_id=page[remaining - 1].id)
+        rows[model.__tablename__] = page
+        remaining -= len(page)
+        last_id = 0
+    return rows, None
+
+
+def collect_changes(
+    db: Session,
+    user_id: int,
+    since: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None
+) -> dict:
+    """
+    Collecter les créations, modifications et suppressions depuis un watermark.
+    
+    Le watermark retourné est l'horloge de la base au moment de la lecture. Le filtre
+    est inclusif (updated_at >= since) car updated_at n'a qu'une précision à la seconde :
+    une ligne peut être renvoyée deux fois, les clients appliquent les changements
+    de manière idempotente. updated_at est horodaté par l'API et le watermark par la
+    base : le filtre recule de SYNC_CLOCK_SKEW_SECONDS pour absorber l'écart entre
+    les deux horloges. Sans watermark, ou si le watermark est plus ancien que
+    la rétention des suppressions, un instantané complet est renvoyé (full=True).
+    
+    Avec `limit`, l'instantané complet est découpé en pages : `cursor` désigne la
+    page suivante (None sur la dernière) et toutes les pages portent le watermark
+    de la première. Les lignes modifiées ou supprimées entre deux pages sont
+    rattrapées par la synchronisation suivante depuis ce watermark.
+    """
+    watermark = db.execute(select(func.now())).scalar()
+    retention = timedelta(days=settings.sync_tombstone_retention_days)
+    
+    if cursor is not None:
+        position = SnapshotCursor.decode(cursor)
+        if position.watermark < watermark - retention:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Curseur de synchronisation expiré : recommencer sans curseur"
+            )
+        return _snapshot_response(db, user_id, position, limit or settings.default_page_size)
+    
+    if since is not None and since.tzinfo is not None and watermark.tzinfo is None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    
+    full = since is None or since < watermark - retention
+    if full and limit is not None:
+        first = SnapshotCursor(watermark, SYNC_MODELS[0].__tablename__, 0)
+        return _snapshot_response(db, user_id, first, limit)
+    
+    deleted = {}
+    if not full:
+        tombstones = db.query(SyncTombstone.entity, SyncTombstone.entity_id).filter(
+            SyncTombstone.user_id == user_id,
+            SyncTombstone.deleted_at >= since
+        )
+        for entity, entity_id in tombstones:
+            deleted.setdefault(entity, []).append(entity_id)
+    
+    if not full:
+        since = since - timedelta(seconds=settings.sync_clock_skew_seconds)
+    
+    changes = {"watermark": watermark, "full": full, "cursor": None}
+    for model in SYNC_MODELS:
+        query = db.query(model).filter(model.user_id == user_id)
+        if not full:
+            query = query.filter(model.updated_at >= since)
+    
+        created, updated = [], []
+        for obj in query.order_by(model.updated_at, model.id):
+            if full or obj.created_at >= since:
+                created.append(obj)
+            else:
+                updated.append(obj)
+    
+        changes[model.__tablename__] = {
+            "created": created,
+            "updated": updated,
+            "deleted": deleted.get(model.__tablename__, [])
+        }
+    
+    return changes
+
+
+def _snapshot_response(db: Session, user_id: int, position: SnapshotCursor, limit: int) -> dict:
+    rows, following = _snapshot_page(db, user_id, position, limit)
+    changes = {
+        "watermark": position.watermark,
+        "full": True,
+        "cursor": following.encode() if following is not None else None,
+    }
+    for model in SYNC_MODELS:
+        changes[model.__tablename__] = {"created": rows.get(model.__tablename__, []), "updated": [], "deleted": []}
+    return changes
+
+
+def purge_tombstones(db: Session) -> int:
+    """Supprimer les traces plus anciennes que la rétention configurée"""
+    cutoff = db.execute(select(func.now())).scalar() - timedelta(
+        days=settings.sync_tombstone_retention_days
+    )
+    purged = db.query(SyncTombstone).filter(
+        SyncTombstone.deleted_at < cutoff
+    ).delete(synchronize_session=False)
+    db.commit()
+    return purged
\ No newline at end of file
@@ -0,0 +1,415 @@
+"""
+Traces distribuées légères (spans) compatibles W3C Trace Context et OTLP.
+
+Le span courant est porté par une ContextVar : il suit la requête dans ses
+dépendances asynchrones et dans le pool de threads. Les spans terminés sont
+remis à un processeur (export immédiat ou par lots dans un thread dédié) puis
+à un exporteur : OTLP/HTTP JSON, fichier JSON lines ou mémoire (tests).
+"""
+import json
+import logging
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, NamedTuple, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Types de span (valeurs OTLP)
+INTERNAL, SERVER, CLIENT = 1, 2, 3
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+MAX_STATEMENT_LENGTH = 1000
+
+_TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class SpanContext(NamedTuple):
+    """Identité d'un span propagée entre services"""
+    trace_id: str
+    span_id: str
+    sampled: bool = True
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[SpanContext]:
+    """Lire un en-tête traceparent (W3C) ; None s'il est absent ou invalide"""
+    if not header:
+        return None
+    match = _TRACEPARENT.match(header.strip().lower())
+    if match is None:
+        return None
+    version, trace_id, span_id, flags = match.groups()
+    if version == "ff" or trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return SpanContext(trace_id, span_id, bool(int(flags, 16) & 1))
+
+
+def describe_error(exc: BaseException) -> str:
+    return f"{type(exc).__name__}: {getattr(exc, 'detail', None) or exc}"
+
+
+def format_traceparent(context: SpanContext) -> str:
+    return f"00-{context.trace_id}-{context.span_id}-{'01' if context.sampled else '00'}"
+
+
+class Span:
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status", "status_message")
+    
+    def __init__(self, name: str, kind: int, trace_id: str, parent_id: Optional[str], attributes: Optional[dict]):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes) if attributes else {}
+        self.status = STATUS_UNSET
+        self.status_message: Optional[str] = None
+    
+    @property
+    def context(self) -> SpanContext:
+        return SpanContext(self.trace_id, self.span_id)
+    
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+    
+    def set_error(self, message: str) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = message
+    
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1_000_000
+    
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "attributes": self.attributes,
+            "status": self.status,
+            "status_message": self.status_message,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+# === EXPORTEURS ===
+
+class InMemoryExporter:
+    """Conserve les spans exportés (tests)"""
+    
+    def __init__(self):
+        self.spans: List[Span] = []
+    
+    def export(self, spans: List[Span]) -> None:
+        self.spans.extend(spans)
+    
+    def clear(self) -> None:
+        self.spans.clear()
+    
+    def shutdown(self) -> None:
+        pass
+
+
+class FileExporter:
+    """Un span JSON par ligne"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+    
+    def export(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+    
+    def shutdown(self) -> None:
+        pass
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> List[dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+class OTLPExporter:
+    """Envoi OTLP/HTTP (encodage JSON) vers un collecteur OpenTelemetry"""
+    
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.resource = {"attributes": _otlp_attributes({"service.name": service_name})}
+    
+    def payload(self, spans: List[Span]) -> dict:
+        otlp_spans = []
+        for span in spans:
+            otlp_span = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": span.kind,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": _otlp_attributes(span.attributes),
+                "status": {"code": span.status},
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            if span.status_message:
+                otlp_span["status"]["message"] = span.status_message
+            otlp_spans.append(otlp_span)
+        return {"resourceSpans": [{
+            "resource": self.resource,
+            "scopeSpans": [{"scope": {"name": "lifehub"}, "spans": otlp_spans}],
+        }]}
+    
+    def export(self, spans: List[Span]) -> None:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(self.payload(spans)).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+    
+    def shutdown(self) -> None:
+        pass
+
+
+# === PROCESSEURS ===
+
+class SimpleSpanProcessor:
+    """Export immédiat, dans le thread qui termine le span (tests, exporteur mémoire)"""
+    
+    def __init__(self, exporter):
+        self.exporter = exporter
+    
+    def on_end(self, span: Span) -> None:
+        self.exporter.export([span])
+    
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
+
+class BatchSpanProcessor:
+    """
+    Export par lots dans un thread dédié.
+    
+    Terminer un span ne fait que le déposer dans une file bornée : quand elle est
+    pleine, les spans sont ignorés et comptés plutôt que de ralentir la requête.
+    """
+    
+    def __init__(self, exporter, batch_size: int = 512, queue_size: int = 4096, interval_ms: int = 2000):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.interval = interval_ms / 1000
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+    
+    def on_end(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+    
+    def _export(self, batch: List[Span]) -> None:
+        try:
+            self.exporter.export(batch)
+        except Exception:
+            logger.exception("Échec de l'export de %d spans", len(batch))
+    
+    def _run(self) -> None:
+        batch: List[Span] = []
+        deadline = time.monotonic() + self.interval
+        while True:
+            try:
+                span = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                span = False
+            if span is None:
+                break
+            if span:
+                batch.append(span)
+            if len(batch) >= self.batch_size or (batch and time.monotonic() >= deadline):
+                self._export(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.interval
+        if batch:
+            self._export(batch)
+    
+    def shutdown(self) -> None:
+        """Exporter les spans en attente puis arrêter le thread"""
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+        self.exporter.shutdown()
+
+
+# === TRACEUR ===
+
+class Tracer:
+    """
+    Création des spans et propagation du contexte.
+    
+    Les spans racine sont échantillonnés au taux sample_rate ; un contexte
+    entrant impose sa décision (échantillonnage basé sur le parent). Sans
+    processeur, ou hors d'une trace échantillonnée, span() ne crée rien.
+    """
+    
+    def __init__(self, processor=None, sample_rate: float = 1.0):
+        self.processor = processor
+        self.sample_rate = sample_rate
+        self._installed = False
+    
+    @property
+    def enabled(self) -> bool:
+        return self.processor is not None
+    
+    def start_span(
+        self,
+        name: str,
+        kind: int = INTERNAL,
+        attributes: Optional[dict] = None,
+        remote_parent: Optional[SpanContext] = None
+    ) -> Optional[Span]:
+        """Démarrer un span enfant du span courant (ou du contexte distant pour une racine)"""
+        if self.processor is None:
+            return None
+        parent = _current_span.get()
+        if parent is not None:
+            return Span(name, kind, parent.trace_id, parent.span_id, attributes)
+        if remote_parent is not None:
+            if not remote_parent.sampled:
+                return None
+            return Span(name, kind, remote_parent.trace_id, remote_parent.span_id, attributes)
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return None
+        return Span(name, kind, f"{random.getrandbits(128):032x}", None, attributes)
+    
+    def end_span(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        self.processor.on_end(span)
+    
+    @contextmanager
+    def span(self, name: str, attributes: Optional[dict] = None, kind: int = INTERNAL) -> Iterator[Optional[Span]]:
+        """Span enfant du span courant, actif pendant le bloc (rien hors d'une trace)"""
+        if self.processor is None or _current_span.get() is None:
+            yield None
+            return
+        span = self.start_span(name, kind, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.set_error(describe_error(exc))
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+    
+    def activate(self, span: Span):
+        return _current_span.set(span)
+    
+    def deactivate(self, token) -> None:
+        _current_span.reset(token)
+    
+    def install(self) -> None:
+        """Tracer les requêtes SQL de tous les engines"""
+        if self._installed or self.processor is None:
+            return
+        event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(Engine, "handle_error", self._handle_error)
+        self._installed = True
+    
+    def shutdown(self) -> None:
+        if self.processor is not None:
+            self.processor.shutdown()
+    
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if _current_span.get() is None:
+            return
+        span = self.start_span(
+            statement.split(None, 1)[0].upper() if statement else "SQL",
+            CLIENT,
+            {
+                "db.system": conn.dialect.name,
+                "db.statement": " ".join(statement.split())[:MAX_STATEMENT_LENGTH],
+            },
+        )
+        conn.info.setdefault("tracing_spans", []).append(span)
+    
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("tracing_spans")
+        if spans:
+            span = spans.pop()
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                span.set_attribute("db.rows", cursor.rowcount)
+            self.end_span(span)
+    
+    def _handle_error(self, exception_context):
+        connection = exception_context.connection
+        spans = connection.info.get("tracing_spans") if connection is not None else None
+        if spans:
+            span = spans.pop()
+            span.set_error(describe_error(exception_context.original_exception))
+            self.end_span(span)
+
+
+def create_exporter():
+    """Instancier l'exporteur configuré"""
+    if settings.tracing_exporter == "memory":
+        return InMemoryExporter()
+    if settings.tracing_exporter == "file":
+        return FileExporter(settings.tracing_file)
+    return OTLPExporter(settings.tracing_otlp_endpoint, settings.tracing_service_name)
+
+
+def create_tracer() -> Tracer:
+    """Instancier le traceur configuré (sans effet si les traces sont désactivées)"""
+    if not settings.tracing_enabled:
+        return Tracer()
+    exporter = create_exporter()
+    if isinstance(exporter, InMemoryExporter):
+        processor = SimpleSpanProcessor(exporter)
+    else:
+        processor = BatchSpanProcessor(
+            exporter,
+            settings.tracing_batch_size,
+            settings.tracing_queue_size,
+            settings.tracing_export_interval_ms,
+        )
+    return Tracer(processor, settings.tracing_sample_rate)
+
+
+tracer = create_tracer()
\ No newline at end of file
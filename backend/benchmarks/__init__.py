@@ -0,0 +1 @@
+# Benchmarks de l'API LifeHub (python -m benchmarks.<nom> depuis backend/)
\ No newline at end of file
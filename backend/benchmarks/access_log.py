@@ -0,0 +1,171 @@
+"""
+Journal d'accès : surcoût par requête de la journalisation synchrone et par file.
+
+Une application ASGI minimale (réponse JSON fixe) est appelée directement, sans
+serveur, pour isoler le coût du middleware et de l'écriture des logs :
+
+- sans journal ;
+- handler synchrone : formatage JSON et écriture du fichier dans la requête ;
+- file asynchrone (configure_logging) ;
+- file asynchrone avec échantillonnage des requêtes réussies.
+
+La phase cadencée envoie `--rate` requêtes par seconde (par paquets d'une
+milliseconde) et mesure la latence et le débit tenu.
+
+    python -m benchmarks.access_log [--requests 20000] [--rate 5000] [--seconds 2]
+"""
+import argparse
+import asyncio
+import logging
+import logging.handlers
+import os
+import tempfile
+import time
+
+from .common import print_table
+
+from app.config import Settings  # noqa: E402
+from app.logging_config import AsyncQueueHandler, JsonFormatter, configure_logging  # noqa: E402
+from app.middleware.access_log import AccessLogMiddleware  # noqa: E402
+
+BODY = b'{"status":"healthy","version":"1.0.0","service":"api"}'
+
+
+async def endpoint(scope, receive, send):
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(BODY)).encode())],
+    })
+    await send({"type": "http.response.body", "body": BODY})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+SCOPE = {
+    "type": "http",
+    "method": "GET",
+    "path": "/health",
+    "headers": [(b"host", b"localhost"), (b"user-agent", b"benchmark")],
+    "client": ("127.0.0.1", 50000),
+}
+
+
+def reset_root():
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(logging.INFO)
+
+
+def synchronous(log_file: str):
+    reset_root()
+    handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=50 * 1024 ** 2, backupCount=2)
+    handler.setFormatter(JsonFormatter())
+    logging.getLogger().addHandler(handler)
+    return None
+
+
+def asynchronous(log_file: str):
+    reset_root()
+    return configure_logging(Settings(log_file=log_file, log_console=False, log_level="INFO"))
+
+
+async def closed_loop(app, requests: int) -> float:
+    """Durée moyenne d'une requête (µs), appels enchaînés"""
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(SCOPE), receive, send)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+async def paced(app, rate: int, seconds: float):
+    """Latences (µs) et débit tenu à `rate` requêtes par seconde"""
+    per_tick = max(1, rate // 1000)
+    latencies = []
+    start = time.perf_counter()
+    deadline = start + seconds
+    tick = start
+    while tick < deadline:
+        for _ in range(per_tick):
+            request_start = time.perf_counter()
+            await app(dict(SCOPE), receive, send)
+            latencies.append((time.perf_counter() - request_start) * 1_000_000)
+        tick += 0.001
+        delay = tick - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return latencies, len(latencies) / elapsed
+
+
+def percentile(values, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--rate", type=int, default=5000)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    
+    directory = tempfile.mkdtemp(prefix="lifehub-access-log-")
+    variants = [
+        ("sans journal", None, None),
+        ("handler synchrone", synchronous, 1.0),
+        ("file asynchrone", asynchronous, 1.0),
+        ("file asynchrone, 10 %", asynchronous, 0.1),
+    ]
+    
+    rows = []
+    baseline_us = None
+    for label, setup, sample_rate in variants:
+        log_file = os.path.join(directory, f"{len(rows)}.log")
+        listener = setup(log_file) if setup else None
+        app = endpoint if setup is None else AccessLogMiddleware(endpoint, sample_rate=sample_rate, slow_ms=1000)
+        if setup is None:
+            reset_root()
+    
+        asyncio.run(closed_loop(app, 1000))  # échauffement
+        mean_us = asyncio.run(closed_loop(app, args.requests))
+        latencies, throughput = asyncio.run(paced(app, args.rate, args.seconds))
+    
+        if listener is not None:
+            listener.stop()
+        dropped = sum(
+            handler.dropped for handler in logging.getLogger().handlers if isinstance(handler, AsyncQueueHandler)
+        )
+        if baseline_us is None:
+            baseline_us = mean_us
+        overhead_us = mean_us - baseline_us
+        rows.append((
+            label,
+            f"{mean_us:.1f}",
+            f"{overhead_us:.1f}",
+            # Fraction d'un cœur consommée par le surcoût à --rate requêtes/s
+            f"{overhead_us * args.rate / 10_000:.1f} %",
+            f"{percentile(latencies, 0.5):.1f}",
+            f"{percentile(latencies, 0.99):.1f}",
+            f"{throughput:.0f}",
+            dropped,
+        ))
+    reset_root()
+    
+    print_table(
+        f"Journal d'accès ({args.requests} requêtes enchaînées, puis {args.rate} req/s pendant {args.seconds} s)",
+        rows,
+        ["variante", "µs/req", "surcoût µs", f"cœur à {args.rate}/s", "p50 µs", "p99 µs", "req/s tenues", "ignorés"],
+    )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
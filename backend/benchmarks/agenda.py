@@ -0,0 +1,112 @@
+"""
+Agenda des tâches sur un utilisateur de 100k tâches : requêtes indexées contre
+chargement complet trié côté client.
+
+    python -m benchmarks.agenda [--tasks 100000]
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from .common import create_session_factory, measure, print_table
+
+from sqlalchemy import insert, text  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.task import Task, TaskPriority, TaskStatus  # noqa: E402
+from app.services.agenda import AgendaWindow, agenda_query  # noqa: E402
+from app.serialization import TASK_PROJECTION  # noqa: E402
+
+AGENDA_INDEXES = ("ix_tasks_user_completed_due", "ix_tasks_user_status_priority")
+
+
+def seed(session, user_id: int, count: int):
+    """Tâches réparties sur deux ans, 70 % terminées, 20 % sans échéance"""
+    rng = random.Random(count)
+    now = datetime.utcnow()
+    priorities = list(TaskPriority)
+    batch = []
+    for i in range(count):
+        completed = rng.random() < 0.7
+        due_date = None if rng.random() < 0.2 else now + timedelta(minutes=rng.randint(-525600, 525600))
+        batch.append({
+            "title": f"Tâche {i}",
+            "priority": rng.choice(priorities),
+            "status": TaskStatus.COMPLETED if completed else TaskStatus.PENDING,
+            "completed": completed,
+            "due_date": due_date,
+            "user_id": user_id,
+        })
+        if len(batch) == 10000:
+            session.execute(insert(Task), batch)
+            batch = []
+    if batch:
+        session.execute(insert(Task), batch)
+    session.commit()
+
+
+def client_side_agenda(session, user_id: int, window: AgendaWindow) -> list:
+    """Comportement actuel des clients : tout charger puis filtrer et trier localement"""
+    now = datetime.utcnow()
+    rank = {TaskPriority.HIGH: 0, TaskPriority.MEDIUM: 1, TaskPriority.LOW: 2}
+    rows = TASK_PROJECTION.select(session.query(Task).filter(Task.user_id == user_id)).all()
+    items = TASK_PROJECTION.serialize(rows)
+    if window == AgendaWindow.OVERDUE:
+        selected = [t for t in items if not t["completed"] and t["due_date"] and t["due_date"] < now]
+    else:
+        end = now + timedelta(days=7)
+        selected = [t for t in items if not t["completed"] and t["due_date"] and now <= t["due_date"] < end]
+    return sorted(selected, key=lambda t: (rank[t["priority"]], t["due_date"]))[:100]
+
+
+def server_side_agenda(session, user_id: int, window: AgendaWindow) -> list:
+    query = agenda_query(session, user_id, window, "UTC").limit(100)
+    return TASK_PROJECTION.serialize(TASK_PROJECTION.select(query).all())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    engine, SessionFactory = create_session_factory()
+    session = SessionFactory()
+    user = User(email="agenda@lifehub.local", username="agenda", hashed_password="x")
+    noise = User(email="noise@lifehub.local", username="noise", hashed_password="x")
+    session.add_all([user, noise])
+    session.commit()
+    seed(session, user.id, args.tasks)
+    seed(session, noise.id, args.tasks // 2)
+    
+    windows = (AgendaWindow.OVERDUE, AgendaWindow.UPCOMING)
+    rows = []
+    for window in windows:
+        result = measure(lambda: client_side_agenda(session, user.id, window), args.repeat)
+        rows.append((window.value, "chargement complet + tri client", f"{result['median_ms']:.1f}"))
+        result = measure(lambda: server_side_agenda(session, user.id, window), args.repeat)
+        rows.append((window.value, "agenda indexé", f"{result['median_ms']:.1f}"))
+    
+    if engine.dialect.name == "sqlite":
+        plan = session.execute(text("EXPLAIN QUERY PLAN " + str(
+            agenda_query(session, user.id, AgendaWindow.UPCOMING, "UTC").statement.compile(
+                engine, compile_kwargs={"literal_binds": True}
+            )
+        ))).all()
+        print("Plan :", "; ".join(row[-1] for row in plan))
+    
+    for index in AGENDA_INDEXES:
+        session.execute(text(f"DROP INDEX {index}" + (" ON tasks" if engine.dialect.name == "mysql" else "")))
+    session.commit()
+    for window in windows:
+        result = measure(lambda: server_side_agenda(session, user.id, window), args.repeat)
+        rows.append((window.value, "agenda sans index composite", f"{result['median_ms']:.1f}"))
+    
+    print_table(
+        f"Agenda sur {args.tasks} tâches (médiane, 100 premières)",
+        rows,
+        ["fenêtre", "méthode", "ms"],
+    )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
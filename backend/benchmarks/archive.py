@@ -0,0 +1,102 @@
+"""
+Archivage : taille des tables vivantes et durée des listes avant et après.
+
+Le jeu de données est archivé avec --days (les données générées couvrent un
+an) ; les listes courantes (tâches à faire par urgence, articles à acheter) sont
+mesurées avant et après, ainsi que la liste complète avec include_archived.
+
+    python -m benchmarks.archive [--users 20] [--scale 5] [--days 30]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from .common import QueryCounter, create_session_factory, print_table
+from .dataset import seed_users
+
+import httpx  # noqa: E402
+from app import database  # noqa: E402
+from app.auth import create_access_token  # noqa: E402
+from app.models.task import Task  # noqa: E402
+from app.models.shopping import ShoppingItem  # noqa: E402
+from app.services.archive import run_archive  # noqa: E402
+
+LISTS = [
+    ("tâches à faire", "/api/tasks/?completed=false&sort=urgency"),
+    ("articles à acheter", "/api/shopping/?completed=false"),
+    ("tâches + archives", "/api/tasks/?include_archived=true&sort=urgency"),
+]
+
+
+async def timed_lists(client, tokens, requests: int, queries: QueryCounter) -> list:
+    rng = random.Random(requests)
+    screens = [rng.choice(tokens) for _ in range(requests)]
+    results = []
+    for label, path in LISTS:
+        queries.reset()
+        start = time.perf_counter()
+        for headers in screens:
+            response = await client.get(path, headers=headers)
+            if response.status_code != 200:
+                raise SystemExit(f"{path} : {response.status_code} {response.text}")
+        elapsed = time.perf_counter() - start
+        results.append((label, f"{elapsed / requests * 1000:.2f}", f"{queries.reset() / requests:.1f}"))
+    return results
+
+
+def live_rows(SessionFactory) -> str:
+    with SessionFactory() as session:
+        return f"{session.query(Task).count()} / {session.query(ShoppingItem).count()}"
+
+
+async def run(args) -> list:
+    engine, SessionFactory = create_session_factory()
+    with SessionFactory() as session:
+        seeded = seed_users(session, args.users, args.scale, prefix="archive")
+    database.engine = engine
+    database.SessionLocal.configure(bind=engine)
+    queries = QueryCounter(engine)
+    tokens = [
+        {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+        for user in seeded
+    ]
+    
+    from app.main import app
+    rows = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+        size = live_rows(SessionFactory)
+        for label, ms, sql in await timed_lists(client, tokens, args.requests, queries):
+            rows.append(("avant", size, label, ms, sql))
+    
+        start = time.perf_counter()
+        counts = run_archive(SessionFactory, days=args.days, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+        archived = sum(counts.values())
+        print(f"{archived} lignes archivées en {elapsed:.2f} s ({archived / max(elapsed, 1e-9):.0f} lignes/s)")
+    
+        size = live_rows(SessionFactory)
+        for label, ms, sql in await timed_lists(client, tokens, args.requests, queries):
+            rows.append(("après", size, label, ms, sql))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--scale", type=float, default=5.0)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    
+    rows = asyncio.run(run(args))
+    print_table(
+        f"Listes avant et après archivage ({args.users} utilisateurs, plus de {args.days} jours)",
+        rows,
+        ["", "tâches / articles", "liste", "ms/req", "requêtes SQL"]
+    )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
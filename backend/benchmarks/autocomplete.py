@@ -0,0 +1,109 @@
+"""
+Autocomplétion des articles sur un historique de 50k articles : index de préfixes
+en mémoire contre requête LIKE à chaque frappe.
+
+    python -m benchmarks.autocomplete [--items 50000] [--names 5000]
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from .common import create_session_factory, measure, print_table
+
+from sqlalchemy import func, insert  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.shopping import ShoppingItem, ShoppingCategory  # noqa: E402
+from app.services.autocomplete import SuggestionCache, build_index  # noqa: E402
+
+WORDS = [
+    "lait", "pain", "beurre", "fromage", "yaourt", "pomme", "poire", "tomate", "carotte",
+    "riz", "pâtes", "café", "thé", "sucre", "farine", "œufs", "jambon", "poulet", "savon",
+    "shampooing", "éponge", "lessive", "confiture", "chocolat", "biscuits", "jus", "eau",
+]
+
+
+def seed(session, user_id: int, items: int, names: int):
+    rng = random.Random(items)
+    vocabulary = [f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}" for i in range(names)]
+    categories = list(ShoppingCategory)
+    now = datetime.utcnow()
+    batch = []
+    for i in range(items):
+        completed = rng.random() < 0.7
+        batch.append({
+            # Quelques articles très fréquents, une longue traîne d'articles rares
+            "name": vocabulary[min(int(rng.paretovariate(1.2)) - 1, names - 1)] if rng.random() < 0.5
+            else rng.choice(vocabulary),
+            "quantity": rng.randint(1, 4),
+            "category": rng.choice(categories),
+            "completed": completed,
+            "actual_price": round(rng.uniform(0.5, 20), 2) if completed else None,
+            "purchased_at": now - timedelta(days=rng.randint(0, 700)) if completed else None,
+            "user_id": user_id,
+        })
+        if len(batch) == 10000:
+            session.execute(insert(ShoppingItem), batch)
+            batch = []
+    if batch:
+        session.execute(insert(ShoppingItem), batch)
+    session.commit()
+
+
+def like_query(session, user_id: int, prefix: str, limit: int = 10):
+    """Sans index : filtre LIKE et agrégation à chaque frappe"""
+    return session.query(
+        ShoppingItem.name, func.count(ShoppingItem.id), func.avg(ShoppingItem.actual_price)
+    ).filter(
+        ShoppingItem.user_id == user_id,
+        ShoppingItem.name.like(f"%{prefix}%")
+    ).group_by(ShoppingItem.name).order_by(func.count(ShoppingItem.id).desc()).limit(limit).all()
+
+
+def percentiles(func, prefixes):
+    durations = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        func(prefix)
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return statistics.median(durations), durations[int(len(durations) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=50000)
+    parser.add_argument("--names", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+    
+    engine, SessionFactory = create_session_factory()
+    session = SessionFactory()
+    user = User(email="autocomplete@lifehub.local", username="autocomplete", hashed_password="x")
+    session.add(user)
+    session.commit()
+    seed(session, user.id, args.items, args.names)
+    
+    rng = random.Random(0)
+    prefixes = [rng.choice(WORDS)[:rng.randint(1, 4)] for _ in range(args.queries)]
+    cache = SuggestionCache(max_users=10, ttl=3600)
+    
+    build = measure(lambda: build_index(session, user.id), 3)
+    index = cache.get(session, user.id)
+    
+    rows = [("construction de l'index", f"{build['median_ms']:.1f}", "-")]
+    median, p99 = percentiles(lambda prefix: cache.get(session, user.id).search(prefix), prefixes)
+    rows.append(("index en mémoire", f"{median:.3f}", f"{p99:.3f}"))
+    median, p99 = percentiles(lambda prefix: like_query(session, user.id, prefix), prefixes[:50])
+    rows.append(("requête LIKE", f"{median:.1f}", f"{p99:.1f}"))
+    
+    print_table(
+        f"Autocomplétion sur {args.items} articles ({len(index)} noms distincts)",
+        rows,
+        ["méthode", "médiane ms", "p99 ms"],
+    )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
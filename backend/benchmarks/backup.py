@@ -0,0 +1,142 @@
+"""
+Sauvegarde complète, incrémentale puis restauration d'un jeu de données synthétique.
+
+La base source est un fichier SQLite temporaire (ou BENCHMARK_DATABASE_URL), la
+restauration se fait dans un second fichier SQLite ; le contenu restauré est
+comparé table par table à la source (nombre de lignes et empreinte).
+
+    python -m benchmarks.backup [--users 200] [--scale 1.0] [--changes 0.05]
+
+Environ 10 Go de données : --users 20000 --scale 25 sur MySQL (BENCHMARK_DATABASE_URL).
+"""
+import argparse
+import hashlib
+import os
+import random
+import resource
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from .common import create_session_factory, print_table
+from .dataset import seed_users
+
+from sqlalchemy import create_engine, delete, select, update  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.models.budget import BudgetTransaction  # noqa: E402
+from app.models.task import Task  # noqa: E402
+from app.services.backup import create_backup, raw_table, restore_backup  # noqa: E402
+
+
+def table_digests(engine) -> dict:
+    """(lignes, empreinte du contenu) par table, dans l'ordre des identifiants"""
+    digests = {}
+    with engine.connect() as connection:
+        for table in Base.metadata.sorted_tables:
+            raw = raw_table(table)
+            sha256 = hashlib.sha256()
+            count = 0
+            for row in connection.execute(select(raw).order_by(raw.c.id)):
+                sha256.update(repr(tuple(row)).encode())
+                count += 1
+            digests[table.name] = (count, sha256.hexdigest())
+    return digests
+
+
+def modify(session, ratio: float, seed: int) -> int:
+    """Modifier et supprimer une fraction des tâches et des transactions"""
+    rng = random.Random(seed)
+    now = datetime.utcnow() + timedelta(seconds=5)
+    touched = 0
+    for model in (Task, BudgetTransaction):
+        ids = session.execute(select(model.id)).scalars().all()
+        changed = rng.sample(ids, int(len(ids) * ratio))
+        half = len(changed) // 2
+        for start in range(0, half, 5000):
+            session.execute(
+                update(model).where(model.id.in_(changed[start:min(start + 5000, half)])).values(updated_at=now)
+            )
+        for start in range(half, len(changed), 5000):
+            session.execute(delete(model).where(model.id.in_(changed[start:start + 5000])))
+        touched += len(changed)
+    session.commit()
+    return touched
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def directory_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path) for name in files
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--changes", type=float, default=0.05)
+    parser.add_argument("--keep", action="store_true", help="Conserver les fichiers produits")
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix="lifehub-backup-")
+    backup_dir = os.path.join(workdir, "backups")
+    engine, SessionFactory = create_session_factory(f"sqlite:///{workdir}/source.db")
+    with SessionFactory() as session:
+        seed_users(session, args.users, args.scale, prefix="backup")
+    
+    rows = []
+    full, elapsed = timed(lambda: create_backup(engine, backup_dir, full=True))
+    rows.append(_report("complète", full, elapsed, os.path.join(backup_dir, full["id"])))
+    
+    with SessionFactory() as session:
+        modify(session, args.changes, seed=args.users)
+    incremental, elapsed = timed(lambda: create_backup(engine, backup_dir))
+    rows.append(_report("incrémentale", incremental, elapsed, os.path.join(backup_dir, incremental["id"])))
+    
+    target = create_engine(f"sqlite:///{workdir}/restored.db")
+    counts, elapsed = timed(lambda: restore_backup(target, incremental["id"], backup_dir))
+    restored_rows = sum(counts.values())
+    rows.append(("restauration", restored_rows, f"{elapsed:.1f}", f"{restored_rows / elapsed:.0f}", "-", "-", "-"))
+    
+    print_table(
+        f"Sauvegardes de {args.users} utilisateurs (échelle {args.scale}, {args.changes:.0%} modifiés)",
+        rows,
+        ["étape", "lignes", "durée s", "lignes/s", "Mo/s (JSON)", "compression", "fichiers"]
+    )
+    source, restored = table_digests(engine), table_digests(target)
+    mismatches = [name for name in source if source[name] != restored[name]]
+    print(f"Pic mémoire : {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} Mo")
+    print("Restauration identique à la source" if not mismatches else f"Tables différentes : {mismatches}")
+    
+    if not args.keep:
+        shutil.rmtree(workdir)
+    else:
+        print(f"Fichiers conservés dans {workdir}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+def _report(label: str, manifest: dict, elapsed: float, directory: str) -> tuple:
+    tables = manifest["tables"].values()
+    count = sum(entry["rows"] for entry in tables)
+    raw_bytes = sum(entry["raw_bytes"] for entry in tables)
+    stored = directory_size(directory)
+    return (
+        label,
+        count,
+        f"{elapsed:.1f}",
+        f"{count / elapsed:.0f}",
+        f"{raw_bytes / elapsed / 1e6:.1f}",
+        f"{raw_bytes / stored:.1f}x" if stored else "-",
+        sum(len(entry["chunks"]) + len(entry.get("ids", [])) for entry in tables),
+    )
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
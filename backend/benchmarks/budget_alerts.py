@@ -0,0 +1,102 @@
+"""
+Alertes de budget : coût d'une écriture de dépense selon le volume du mois.
+
+« re-somme » recalcule les dépenses du mois de la catégorie (monthly_spending) à
+chaque écriture ; « incrémental » reporte la variation sur budget_month_totals
+(services.budget_alerts.record_change). Le mois contient --sizes dépenses avant
+les écritures mesurées.
+
+    python -m benchmarks.budget_alerts [--sizes 100,1000,10000] [--writes 300]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from .common import QueryCounter, create_session_factory, print_table
+
+from sqlalchemy import insert  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.budget import BudgetCategory, BudgetCategoryType, BudgetTransaction, TransactionType  # noqa: E402
+from app.services import budget_alerts  # noqa: E402
+from app.services.budget_stats import monthly_spending  # noqa: E402
+
+
+def seed_month(session, size: int, now: datetime):
+    user = User(email=f"alerts{size}@example.com", username=f"alerts{size}", hashed_password="x")
+    session.add(user)
+    session.flush()
+    category = BudgetCategory(
+        name="Courses", category_type=BudgetCategoryType.ALIMENTATION,
+        monthly_budget=Decimal(size * 10), user_id=user.id
+    )
+    session.add(category)
+    session.flush()
+    start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    session.execute(insert(BudgetTransaction), [
+        {
+            "title": "Achat", "amount": Decimal("4.20"), "transaction_type": TransactionType.EXPENSE,
+            "transaction_date": start + timedelta(minutes=index % 10000), "user_id": user.id,
+            "category_id": category.id,
+        }
+        for index in range(size)
+    ])
+    session.commit()
+    return user.id, category.id
+
+
+def timed_writes(SessionFactory, user_id: int, category_id: int, writes: int, now: datetime, evaluate) -> float:
+    start = time.perf_counter()
+    for _ in range(writes):
+        with SessionFactory() as session:
+            transaction = BudgetTransaction(
+                title="Achat", amount=Decimal("1.10"), transaction_type=TransactionType.EXPENSE,
+                transaction_date=now, user_id=user_id, category_id=category_id
+            )
+            session.add(transaction)
+            session.flush()
+            evaluate(session, transaction)
+            session.commit()
+    return (time.perf_counter() - start) / writes * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--writes", type=int, default=300)
+    args = parser.parse_args()
+    
+    engine, SessionFactory = create_session_factory()
+    counter = QueryCounter(engine)
+    budget_alerts.notifier = budget_alerts.StubNotifier()
+    now = datetime.utcnow().replace(microsecond=0)
+    
+    def resum(session, transaction):
+        monthly_spending(session, transaction.user_id, now.year, now.month, [transaction.category_id])
+    
+    def incremental(session, transaction):
+        budget_alerts.record_change(
+            session, transaction.user_id, None, budget_alerts.transaction_contribution(transaction)
+        )
+    
+    rows = []
+    for size in (int(value) for value in args.sizes.split(",")):
+        with SessionFactory() as session:
+            user_id, category_id = seed_month(session, size, now)
+        # Premier total du mois : seule écriture qui somme le mois
+        timed_writes(SessionFactory, user_id, category_id, 1, now, incremental)
+        for label, evaluate in (("re-somme", resum), ("incrémental", incremental)):
+            counter.reset()
+            mean_us = timed_writes(SessionFactory, user_id, category_id, args.writes, now, evaluate)
+            rows.append((size, label, f"{mean_us:.0f}", f"{counter.reset() / args.writes:.1f}"))
+    
+    print_table(
+        f"Écriture d'une dépense ({args.writes} écritures par variante)",
+        rows,
+        ["dépenses du mois", "variante", "µs/écriture", "requêtes SQL"]
+    )
+    print(f"alertes envoyées : {len(budget_alerts.notifier.alerts)}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,69 @@
+import os
+import statistics
+import time
+from typing import Callable, Dict
+
+# La configuration est validée à l'import : valeurs locales pour les benchmarks
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-" + "x" * 32)
+os.environ.setdefault("LOG_FILE", "/tmp/lifehub-benchmarks/logs/lifehub.log")
+os.environ.setdefault("UPLOAD_DIR", "/tmp/lifehub-benchmarks/uploads")
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+from app.database import Base, use_utc_sessions  # noqa: E402
+from app import models  # noqa: E402,F401
+
+
+def create_session_factory(url: str = "sqlite://"):
+    """Base de benchmark (SQLite en mémoire par défaut, ou BENCHMARK_DATABASE_URL)"""
+    url = os.environ.get("BENCHMARK_DATABASE_URL", url)
+    if url.startswith("sqlite"):
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+    else:
+        engine = use_utc_sessions(create_engine(url, pool_pre_ping=True))
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+
+class QueryCounter:
+    """Compter les requêtes SQL émises sur un engine"""
+    
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+    
+    def _on_execute(self, *args):
+        self.count += 1
+    
+    def reset(self) -> int:
+        count, self.count = self.count, 0
+        return count
+
+
+def measure(func: Callable[[], object], repeat: int = 5) -> Dict[str, float]:
+    """Exécuter une fonction plusieurs fois et retourner les durées en millisecondes"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return {
+        "min_ms": min(durations),
+        "median_ms": statistics.median(durations),
+        "max_ms": max(durations),
+    }
+
+
+def print_table(title: str, rows, columns):
+    """Afficher un tableau de résultats aligné"""
+    print(f"\n{title}")
+    print("-" * len(title))
+    widths = [max(len(str(column)), *(len(f"{row[i]}") for row in rows)) for i, column in enumerate(columns)]
+    print("  ".join(str(column).ljust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(f"{value}".ljust(width) for value, width in zip(row, widths)))
\ No newline at end of file
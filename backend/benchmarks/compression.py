@@ -0,0 +1,88 @@
+"""
+Compression des réponses : coût CPU contre octets économisés.
+
+    python -m benchmarks.compression [--sizes 100 1000]
+"""
+import argparse
+import time
+
+from .common import create_session_factory, print_table
+from .serialization import seed
+
+from app.middleware.compression import _BrotliCompressor, _GzipCompressor, brotli  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.task import Task  # noqa: E402
+from app.models.shopping import ShoppingItem  # noqa: E402
+from app.models.budget import BudgetTransaction  # noqa: E402
+from app.serialization import (  # noqa: E402
+    TASK_PROJECTION, SHOPPING_ITEM_PROJECTION, BUDGET_TRANSACTION_PROJECTION
+)
+
+
+def compressors():
+    """Configurations comparées : (nom, fabrique)"""
+    configs = [(f"gzip-{level}", lambda level=level: _GzipCompressor(level)) for level in (1, 6, 9)]
+    if brotli is not None:
+        configs += [(f"br-{quality}", lambda quality=quality: _BrotliCompressor(quality)) for quality in (1, 4, 11)]
+    return configs
+
+
+def compress_cost(factory, payload: bytes, repeat: int):
+    """Taille compressée et durée médiane de compression en millisecondes"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        compressed = factory().compress(payload, finish=True)
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return len(compressed), durations[len(durations) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--bandwidth-mbps", type=float, default=10.0,
+        help="Débit client supposé pour estimer le temps de transfert économisé"
+    )
+    args = parser.parse_args()
+    
+    cases = [
+        ("tasks", Task, TASK_PROJECTION),
+        ("shopping_items", ShoppingItem, SHOPPING_ITEM_PROJECTION),
+        ("budget_transactions", BudgetTransaction, BUDGET_TRANSACTION_PROJECTION),
+    ]
+    bytes_per_ms = args.bandwidth_mbps * 1_000_000 / 8 / 1000
+    
+    rows = []
+    for size in args.sizes:
+        _, SessionFactory = create_session_factory()
+        session = SessionFactory()
+        user = User(email=f"bench{size}@lifehub.local", username=f"bench{size}", hashed_password="x")
+        session.add(user)
+        session.commit()
+        seed(session, user.id, size)
+    
+        for name, model, projection in cases:
+            query = session.query(model).filter(model.user_id == user.id).limit(size)
+            payload = projection.response(projection.select(query).all()).body
+            for label, factory in compressors():
+                compressed, cpu_ms = compress_cost(factory, payload, args.repeat)
+                saved = len(payload) - compressed
+                rows.append((
+                    name, size, label, len(payload), compressed,
+                    f"{len(payload) / compressed:.1f}", f"{cpu_ms:.2f}",
+                    f"{saved / bytes_per_ms:.1f}",
+                ))
+        session.close()
+    
+    print_table(
+        f"Compression des listes JSON (transfert estimé à {args.bandwidth_mbps:g} Mbit/s)",
+        rows,
+        ["collection", "lignes", "algo", "octets", "compressé", "ratio", "cpu ms", "transfert économisé ms"],
+    )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""
+Écran d'accueil : quatre appels séparés contre /api/dashboard.
+
+« 4 appels » enchaîne /api/users/me, /api/tasks/, /api/shopping/stats/summary et
+/api/budget/overview ; « 4 appels concurrents » les lance ensemble, comme le
+front. « dashboard » fait un seul appel ; « dashboard 304 » le revalide avec
+If-None-Match. Pour chaque variante : durée par écran, requêtes SQL et
+connexions empruntées au pool.
+
+    python -m benchmarks.dashboard [--users 20] [--screens 200]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from .common import QueryCounter, create_session_factory, print_table
+from .dataset import seed_users
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from app import database  # noqa: E402
+from app.auth import create_access_token  # noqa: E402
+
+SEPARATE = ["/api/users/me", "/api/tasks/", "/api/shopping/stats/summary", "/api/budget/overview"]
+
+
+async def separate(client, headers) -> int:
+    size = 0
+    for path in SEPARATE:
+        size += len((await client.get(path, headers=headers)).content)
+    return size
+
+
+async def concurrent(client, headers) -> int:
+    responses = await asyncio.gather(*(client.get(path, headers=headers) for path in SEPARATE))
+    return sum(len(response.content) for response in responses)
+
+
+async def dashboard(client, headers) -> int:
+    return len((await client.get("/api/dashboard/", headers=headers)).content)
+
+
+async def run(args) -> list:
+    engine, SessionFactory = create_session_factory()
+    with SessionFactory() as session:
+        seeded = seed_users(session, args.users, args.scale, prefix="dashboard")
+    database.engine = engine
+    database.SessionLocal.configure(bind=engine)
+    queries = QueryCounter(engine)
+    checkouts = [0]
+    
+    @event.listens_for(engine, "checkout")
+    def count_checkout(*_):
+        checkouts[0] += 1
+    
+    tokens = [
+        {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+        for user in seeded
+    ]
+    # Les validateurs ne sont cachables qu'une seconde après la dernière écriture
+    await asyncio.sleep(2)
+    
+    from app.main import app
+    rng = random.Random(args.screens)
+    screens = [rng.choice(tokens) for _ in range(args.screens)]
+    rows = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+        etags = {}
+        for headers in tokens:
+            etags[id(headers)] = (await client.get("/api/dashboard/", headers=headers)).headers["etag"]
+    
+        async def revalidated(client, headers) -> int:
+            response = await client.get("/api/dashboard/", headers={**headers, "If-None-Match": etags[id(headers)]})
+            return len(response.content)
+    
+        for label, screen in (
+            ("4 appels", separate),
+            ("4 appels concurrents", concurrent),
+            ("dashboard", dashboard),
+            ("dashboard 304", revalidated),
+        ):
+            queries.reset()
+            checkouts[0] = 0
+            size = 0
+            start = time.perf_counter()
+            for headers in screens:
+                size += await screen(client, headers)
+            elapsed = time.perf_counter() - start
+            rows.append((
+                label,
+                f"{elapsed / args.screens * 1000:.2f}",
+                f"{queries.reset() / args.screens:.1f}",
+                f"{checkouts[0] / args.screens:.1f}",
+                f"{size / args.screens / 1024:.1f}",
+            ))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--screens", type=int, default=200)
+    args = parser.parse_args()
+    
+    rows = asyncio.run(run(args))
+    print_table(
+        f"Écran d'accueil ({args.users} utilisateurs, {args.screens} affichages)",
+        rows,
+        ["variante", "ms/écran", "requêtes SQL", "connexions", "Ko"]
+    )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,228 @@
+"""
+Jeu de données synthétique réaliste pour les benchmarks et tests de charge.
+
+Les volumes par utilisateur suivent une loi log-normale : la plupart des comptes
+sont modestes, quelques-uns sont très volumineux. Les noms d'articles suivent une
+loi de Zipf, les montants une loi log-normale et les dates sont concentrées sur
+les semaines récentes. Les insertions sont faites par lots (INSERT multi-lignes).
+
+    python -m benchmarks.dataset --users 100 --scale 1
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List, NamedTuple
+
+from .common import create_session_factory
+
+from sqlalchemy import insert, select  # noqa: E402
+from app.auth import get_password_hash  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.task import Task, TaskPriority, TaskStatus  # noqa: E402
+from app.models.shopping import ShoppingItem, ShoppingCategory  # noqa: E402
+from app.models.budget import BudgetCategory, BudgetCategoryType, BudgetTransaction, TransactionType  # noqa: E402
+
+PASSWORD = "loadtest-password"
+
+# Volumes médians par utilisateur (multipliés par un facteur log-normal et par --scale)
+MEDIAN_TASKS = 200
+MEDIAN_SHOPPING_ITEMS = 150
+MEDIAN_TRANSACTIONS = 600
+
+ITEM_NAMES = [
+    "Lait", "Pain", "Œufs", "Beurre", "Pommes", "Bananes", "Café", "Thé", "Riz", "Pâtes",
+    "Tomates", "Carottes", "Oignons", "Pommes de terre", "Poulet", "Jambon", "Fromage râpé",
+    "Yaourts", "Crème fraîche", "Farine", "Sucre", "Sel", "Huile d'olive", "Vinaigre",
+    "Lessive", "Liquide vaisselle", "Papier toilette", "Dentifrice", "Shampooing", "Savon",
+    "Saumon", "Cabillaud", "Steak haché", "Baguette", "Croissants", "Chocolat", "Biscuits",
+    "Céréales", "Confiture", "Miel", "Eau gazeuse", "Jus d'orange", "Salade", "Courgettes",
+    "Poivrons", "Citrons", "Ail", "Moutarde", "Mayonnaise", "Sopalin",
+]
+# Poids de Zipf : quelques articles reviennent dans presque toutes les listes
+ITEM_WEIGHTS = [1 / rank for rank in range(1, len(ITEM_NAMES) + 1)]
+
+TASK_TITLES = [
+    "Appeler", "Payer", "Réserver", "Préparer", "Envoyer", "Relire", "Ranger", "Acheter",
+    "Réparer", "Planifier", "Répondre à", "Renouveler",
+]
+TASK_OBJECTS = [
+    "le dentiste", "la facture d'électricité", "les billets de train", "la réunion", "le dossier",
+    "le rapport", "le garage", "un cadeau", "le vélo", "les vacances", "l'assurance", "le passeport",
+]
+TAGS = ["courses", "restaurant", "carburant", "loyer", "abonnement", "santé", "sorties", "cadeaux"]
+
+
+class SeededUser(NamedTuple):
+    """Compte généré et identifiants de ses lignes"""
+    id: int
+    email: str
+    task_ids: List[int]
+    shopping_item_ids: List[int]
+    category_ids: List[int]
+    transaction_ids: List[int]
+
+
+def _volume(rng: random.Random, median: int, scale: float) -> int:
+    return max(1, int(median * scale * rng.lognormvariate(0, 1)))
+
+
+def _recent(rng: random.Random, now: datetime, mean_days: float, max_days: int) -> datetime:
+    """Date passée, plus dense près d'aujourd'hui (loi exponentielle tronquée)"""
+    days = min(rng.expovariate(1 / mean_days), max_days)
+    return now - timedelta(days=days, seconds=rng.randint(0, 86399))
+
+
+def _insert(session, model, rows: List[dict], batch_size: int = 5000) -> None:
+    for start in range(0, len(rows), batch_size):
+        session.execute(insert(model), rows[start:start + batch_size])
+
+
+def _tasks(rng: random.Random, user_id: int, count: int, now: datetime) -> List[dict]:
+    rows = []
+    for _ in range(count):
+        status = rng.choices(list(TaskStatus), weights=[55, 15, 25, 5])[0]
+        completed = status == TaskStatus.COMPLETED
+        created_at = _recent(rng, now, 60, 365)
+        due_date = None
+        if rng.random() < 0.7:
+            due_date = now + timedelta(days=rng.triangular(-30, 60, 2), hours=rng.randint(0, 23))
+        rows.append({
+            "title": f"{rng.choice(TASK_TITLES)} {rng.choice(TASK_OBJECTS)}",
+            "description": "Détails de la tâche" if rng.random() < 0.3 else None,
+            "priority": rng.choices(list(TaskPriority), weights=[30, 50, 20])[0],
+            "status": status,
+            "completed": completed,
+            "due_date": due_date,
+            "completed_at": created_at + timedelta(days=rng.uniform(0, 10)) if completed else None,
+            "created_at": created_at,
+            "updated_at": created_at,
+            "user_id": user_id,
+        })
+    return rows
+
+
+def _shopping_items(rng: random.Random, user_id: int, count: int, now: datetime) -> List[dict]:
+    categories = list(ShoppingCategory)
+    rows = []
+    for _ in range(count):
+        name = rng.choices(ITEM_NAMES, weights=ITEM_WEIGHTS)[0]
+        estimated = Decimal(str(round(rng.lognormvariate(1.2, 0.6), 2))) if rng.random() < 0.85 else None
+        completed = rng.random() < 0.65
+        created_at = _recent(rng, now, 45, 365)
+        actual = None
+        if completed and rng.random() < 0.8:
+            actual = Decimal(str(round(float(estimated or 3) * rng.uniform(0.8, 1.25), 2)))
+        rows.append({
+            "name": name,
+            "quantity": rng.choices([1, 2, 3, 4, 6], weights=[60, 20, 10, 5, 5])[0],
+            "unit": "unité",
+            "estimated_price": estimated,
+            "actual_price": actual,
+            "category": rng.choice(categories),
+            "completed": completed,
+            "purchased_at": created_at + timedelta(days=rng.uniform(0, 7)) if completed else None,
+            "created_at": created_at,
+            "updated_at": created_at,
+            "user_id": user_id,
+        })
+    return rows
+
+
+def _transactions(rng: random.Random, user_id: int, category_ids: List[int], count: int, now: datetime) -> List[dict]:
+    rows = []
+    for _ in range(count):
+        transaction_type = rng.choices(list(TransactionType), weights=[10, 85, 5])[0]
+        median = 1800 if transaction_type == TransactionType.INCOME else 25
+        date = _recent(rng, now, 90, 730)
+        rows.append({
+            "title": rng.choice(TAGS).capitalize(),
+            "amount": Decimal(str(round(median * rng.lognormvariate(0, 0.8), 2))),
+            "transaction_type": transaction_type,
+            "transaction_date": date,
+            "tags": ", ".join(rng.sample(TAGS, rng.randint(0, 2))) or None,
+            "is_recurring": rng.random() < 0.05,
+            "category_id": rng.choice(category_ids) if rng.random() < 0.9 else None,
+            "created_at": date,
+            "updated_at": date,
+            "user_id": user_id,
+        })
+    return rows
+
+
+def _ids(session, model, user_id: int) -> List[int]:
+    return session.execute(select(model.id).where(model.user_id == user_id).order_by(model.id)).scalars().all()
+
+
+def seed_users(session, users: int, scale: float = 1.0, seed: int = 41, prefix: str = "load") -> List[SeededUser]:
+    """
+    Créer `users` comptes et leurs données.
+    
+    Tous les comptes partagent le mot de passe PASSWORD (haché une seule fois).
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    hashed_password = get_password_hash(PASSWORD)
+    category_types = list(BudgetCategoryType)
+    
+    seeded = []
+    for index in range(users):
+        user = User(
+            email=f"{prefix}{index}@example.com",
+            username=f"{prefix}{index}",
+            hashed_password=hashed_password,
+            first_name="Charge",
+            last_name=str(index),
+        )
+        session.add(user)
+        session.flush()
+    
+        categories = [
+            BudgetCategory(
+                name=category_type.value.capitalize(),
+                category_type=category_type,
+                monthly_budget=Decimal(rng.choice([50, 100, 200, 300, 500, 800])),
+                user_id=user.id,
+            )
+            for category_type in rng.sample(category_types, rng.randint(4, len(category_types)))
+        ]
+        session.add_all(categories)
+        session.flush()
+        category_ids = [category.id for category in categories]
+    
+        _insert(session, Task, _tasks(rng, user.id, _volume(rng, MEDIAN_TASKS, scale), now))
+        _insert(session, ShoppingItem, _shopping_items(rng, user.id, _volume(rng, MEDIAN_SHOPPING_ITEMS, scale), now))
+        _insert(session, BudgetTransaction, _transactions(
+            rng, user.id, category_ids, _volume(rng, MEDIAN_TRANSACTIONS, scale), now
+        ))
+        session.commit()
+    
+        seeded.append(SeededUser(
+            id=user.id,
+            email=user.email,
+            task_ids=_ids(session, Task, user.id),
+            shopping_item_ids=_ids(session, ShoppingItem, user.id),
+            category_ids=category_ids,
+            transaction_ids=_ids(session, BudgetTransaction, user.id),
+        ))
+    return seeded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=41)
+    args = parser.parse_args()
+    
+    engine, SessionFactory = create_session_factory()
+    with SessionFactory() as session:
+        seeded = seed_users(session, args.users, args.scale, args.seed)
+    
+    volumes = sorted(len(user.task_ids) + len(user.shopping_item_ids) + len(user.transaction_ids) for user in seeded)
+    print(f"{len(seeded)} utilisateurs, {sum(volumes)} lignes")
+    print(f"lignes par utilisateur : médiane {volumes[len(volumes) // 2]}, max {volumes[-1]}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
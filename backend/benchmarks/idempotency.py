@@ -0,0 +1,84 @@
+"""
+Créations avec Idempotency-Key : coût de la première requête et d'une nouvelle
+tentative (réponse rejouée) pour les trois routes de création.
+
+« sans clé » est la création d'origine ; « première » ajoute l'empreinte, le
+verrou et l'enregistrement de la réponse ; « rejeu » renvoie la réponse
+enregistrée sans authentification en base ni écriture.
+
+    python -m benchmarks.idempotency [--requests 500]
+"""
+import argparse
+import asyncio
+import time
+
+from .common import QueryCounter, create_session_factory, print_table
+
+import httpx  # noqa: E402
+from app import database  # noqa: E402
+from app.auth import create_access_token  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+ROUTES = [
+    ("tâche", "/api/tasks/", lambda i: {"title": f"Tâche {i}", "priority": "medium"}),
+    ("article", "/api/shopping/", lambda i: {"name": f"Article {i}", "quantity": 2, "unit": "kg"}),
+    ("transaction", "/api/budget/transactions", lambda i: {
+        "title": f"Achat {i}", "amount": "12.50", "transaction_type": "expense",
+        "transaction_date": "2026-10-01T12:00:00",
+    }),
+]
+
+
+async def timed_posts(client, path: str, bodies, headers) -> float:
+    start = time.perf_counter()
+    for index, body in enumerate(bodies):
+        response = await client.post(path, json=body, headers=headers(index))
+        if response.status_code >= 400:
+            raise SystemExit(f"{path} : {response.status_code} {response.text}")
+    return (time.perf_counter() - start) / len(bodies) * 1e6
+
+
+async def run(args) -> list:
+    engine, SessionFactory = create_session_factory()
+    database.engine = engine
+    database.SessionLocal.configure(bind=engine)
+    with SessionFactory() as session:
+        user = User(email="idempotency@example.com", username="idempotency", hashed_password="x")
+        session.add(user)
+        session.commit()
+        user_id = user.id
+    counter = QueryCounter(engine)
+    authorization = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+    
+    from app.main import app
+    rows = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark") as client:
+        for label, path, make_body in ROUTES:
+            bodies = [make_body(i) for i in range(args.requests)]
+            keyed = lambda index, path=path: {**authorization, "Idempotency-Key": f"{path}-{index}"}
+            for variant, headers in (
+                ("sans clé", lambda index: authorization),
+                ("première", keyed),
+                ("rejeu", keyed),
+            ):
+                counter.reset()
+                mean_us = await timed_posts(client, path, bodies, headers)
+                rows.append((label, variant, f"{mean_us:.0f}", f"{counter.reset() / args.requests:.1f}"))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    
+    rows = asyncio.run(run(args))
+    print_table(
+        f"Créations idempotentes ({args.requests} requêtes par variante)",
+        rows,
+        ["route", "variante", "µs/req", "requêtes SQL"]
+    )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,441 @@
+"""
+Test de charge de bout en bout de l'API.
+
+Des comptes synthétiques (benchmarks.dataset) sont créés, puis des clients
+concurrents exécutent pendant --duration secondes un mélange pondéré de requêtes
+couvrant tous les routeurs. Pour chaque opération sont mesurés le débit, les
+latences p50/p95/p99, le taux d'erreur et le nombre de requêtes SQL par requête
+HTTP. Le rapport JSON peut servir de référence : avec --baseline, toute régression
+au-delà des seuils fait échouer la commande (code de sortie 1).
+
+Par défaut l'application tourne dans le processus (ASGI, SQLite en mémoire ou
+BENCHMARK_DATABASE_URL). Avec --base-url, les requêtes visent un serveur lancé
+séparément : BENCHMARK_DATABASE_URL et SECRET_KEY doivent être ceux du serveur, et
+les requêtes SQL ne sont pas comptées.
+
+    python -m benchmarks.loadtest --users 20 --concurrency 8 --duration 15 --report loadtest.json
+    python -m benchmarks.loadtest --baseline loadtest.json
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from .common import create_session_factory, print_table
+from .dataset import PASSWORD, SeededUser, seed_users
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from app import database  # noqa: E402
+from app.auth import create_access_token  # noqa: E402
+
+# Compteur de requêtes SQL de la requête HTTP en cours (hérité par les threads du pool)
+_queries: contextvars.ContextVar = contextvars.ContextVar("loadtest_queries", default=None)
+
+
+class Call(NamedTuple):
+    """Requête HTTP à envoyer"""
+    method: str
+    path: str
+    params: Optional[dict] = None
+    json: Optional[dict] = None
+    data: Optional[dict] = None
+    authenticated: bool = True
+    # Flux SSE : seul le premier message est lu
+    stream: bool = False
+    # Appelé avec le corps JSON d'une réponse réussie (identifiants créés)
+    on_success: Optional[Callable[[dict], None]] = None
+
+
+class Account:
+    """Compte utilisé par les clients virtuels, avec les lignes qu'ils ont créées"""
+    
+    def __init__(self, seeded: SeededUser):
+        self.seeded = seeded
+        self.headers = {"Authorization": f"Bearer {create_access_token({'sub': str(seeded.id)})}"}
+        self.tasks: List[int] = []
+        self.shopping_items: List[int] = []
+        self.categories: List[int] = []
+        self.transactions: List[int] = []
+
+
+def _created(ids: List[int]) -> Callable[[dict], None]:
+    return lambda body: ids.append(body["id"])
+
+
+def _pop(ids: List[int]) -> Optional[int]:
+    return ids.pop() if ids else None
+
+
+def _delete(path: str, ids: List[int]) -> Optional[Call]:
+    """Supprimer une ligne créée pendant le test (jamais une ligne du jeu de données)"""
+    row_id = _pop(ids)
+    return Call("DELETE", path.format(id=row_id)) if row_id is not None else None
+
+
+def _since(minutes: int) -> str:
+    return (datetime.utcnow() - timedelta(minutes=minutes)).isoformat()
+
+
+# (nom, poids, construction de la requête) ; None = opération impossible pour l'instant
+OPERATIONS = [
+    # Authentification et profil (une connexion pour plusieurs centaines de requêtes)
+    ("POST /api/auth/login", 0.2, lambda a, rng: Call(
+        "POST", "/api/auth/login", data={"username": a.seeded.email, "password": PASSWORD}, authenticated=False
+    )),
+    ("GET /api/users/me", 4, lambda a, rng: Call("GET", "/api/users/me")),
+    ("PUT /api/users/me", 1, lambda a, rng: Call(
+        "PUT", "/api/users/me", json={"first_name": rng.choice(["Alex", "Camille", "Sacha"])}
+    )),
+    # Tâches
+    ("GET /api/tasks/", 10, lambda a, rng: Call("GET", "/api/tasks/", params={"limit": 50})),
+    ("GET /api/tasks/agenda/{window}", 6, lambda a, rng: Call(
+        "GET", f"/api/tasks/agenda/{rng.choice(['overdue', 'today', 'upcoming'])}"
+    )),
+    ("GET /api/tasks/{id}", 6, lambda a, rng: Call("GET", f"/api/tasks/{rng.choice(a.seeded.task_ids)}")),
+    ("POST /api/tasks/", 3, lambda a, rng: Call(
+        "POST", "/api/tasks/",
+        json={"title": "Tâche de charge", "priority": "high", "due_date": _since(-rng.randint(60, 10080))},
+        on_success=_created(a.tasks)
+    )),
+    ("PUT /api/tasks/{id}", 2, lambda a, rng: Call(
+        "PUT", f"/api/tasks/{rng.choice(a.seeded.task_ids)}", json={"description": f"Révision {rng.randint(1, 999)}"}
+    )),
+    ("PATCH /api/tasks/{id}/toggle", 4, lambda a, rng: Call(
+        "PATCH", f"/api/tasks/{rng.choice(a.seeded.task_ids)}/toggle"
+    )),
+    ("DELETE /api/tasks/{id}", 2, lambda a, rng: _delete("/api/tasks/{id}", a.tasks)),
+    # Courses
+    ("GET /api/shopping/", 8, lambda a, rng: Call("GET", "/api/shopping/", params={"completed": "false"})),
+    ("GET /api/shopping/{id}", 3, lambda a, rng: Call(
+        "GET", f"/api/shopping/{rng.choice(a.seeded.shopping_item_ids)}"
+    )),
+    ("GET /api/shopping/suggestions", 6, lambda a, rng: Call(
+        "GET", "/api/shopping/suggestions", params={"q": rng.choice(["la", "po", "pa", "ca", "s", "fro"])}
+    )),
+    ("POST /api/shopping/", 3, lambda a, rng: Call(
+        "POST", "/api/shopping/", json={"name": rng.choice(["Lait", "Pain", "Café"]), "estimated_price": 2.5},
+        on_success=_created(a.shopping_items)
+    )),
+    ("PUT /api/shopping/{id}", 1, lambda a, rng: Call(
+        "PUT", f"/api/shopping/{rng.choice(a.seeded.shopping_item_ids)}", json={"quantity": rng.randint(1, 4)}
+    )),
+    ("PATCH /api/shopping/{id}/toggle", 3, lambda a, rng: Call(
+        "PATCH", f"/api/shopping/{rng.choice(a.seeded.shopping_item_ids)}/toggle"
+    )),
+    ("DELETE /api/shopping/{id}", 2, lambda a, rng: _delete("/api/shopping/{id}", a.shopping_items)),
+    ("GET /api/shopping/stats/summary", 3, lambda a, rng: Call("GET", "/api/shopping/stats/summary")),
+    ("GET /api/shopping/stats/prices", 2, lambda a, rng: Call(
+        "GET", "/api/shopping/stats/prices", params={"name": rng.choice(["Lait", "Pain", "Œufs"])}
+    )),
+    # Budget
+    ("GET /api/budget/categories", 4, lambda a, rng: Call("GET", "/api/budget/categories")),
+    ("GET /api/budget/categories/{id}", 2, lambda a, rng: Call(
+        "GET", f"/api/budget/categories/{rng.choice(a.seeded.category_ids)}"
+    )),
+    ("POST /api/budget/categories", 1, lambda a, rng: Call(
+        "POST", "/api/budget/categories",
+        json={"name": "Temporaire", "category_type": "autre", "monthly_budget": 100},
+        on_success=_created(a.categories)
+    )),
+    ("PUT /api/budget/categories/{id}", 1, lambda a, rng: Call(
+        "PUT", f"/api/budget/categories/{rng.choice(a.seeded.category_ids)}", json={"color": "#10B981"}
+    )),
+    ("DELETE /api/budget/categories/{id}", 1, lambda a, rng: _delete("/api/budget/categories/{id}", a.categories)),
+    ("GET /api/budget/transactions", 6, lambda a, rng: Call("GET", "/api/budget/transactions", params={"limit": 50})),
+    ("POST /api/budget/transactions", 3, lambda a, rng: Call(
+        "POST", "/api/budget/transactions",
+        json={
+            "title": "Dépense de charge", "amount": round(rng.uniform(1, 80), 2), "transaction_type": "expense",
+            "category_id": rng.choice(a.seeded.category_ids),
+        },
+        on_success=_created(a.transactions)
+    )),
+    ("PUT /api/budget/transactions/{id}", 1, lambda a, rng: Call(
+        "PUT", f"/api/budget/transactions/{rng.choice(a.seeded.transaction_ids)}", json={"tags": "charge"}
+    )),
+    ("DELETE /api/budget/transactions/{id}", 2, lambda a, rng: _delete(
+        "/api/budget/transactions/{id}", a.transactions
+    )),
+    ("GET /api/budget/overview", 4, lambda a, rng: Call("GET", "/api/budget/overview")),
+    # Synchronisation et temps réel
+    ("GET /api/sync/", 4, lambda a, rng: Call("GET", "/api/sync/", params={"since": _since(rng.randint(1, 120))})),
+    ("GET /api/events/stream", 1, lambda a, rng: Call("GET", "/api/events/stream", stream=True)),
+]
+
+
+async def _first_event(app, call: Call, headers: Dict[str, str]) -> int:
+    """
+    Ouvrir un flux SSE dans le processus et se déconnecter après le premier message
+    (le transport ASGI de httpx attend la fin de la réponse, infinie pour un flux).
+    """
+    status_code = 0
+    received = asyncio.Event()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": call.method,
+        "scheme": "http", "path": call.path, "raw_path": call.path.encode(), "query_string": b"",
+        "root_path": "", "client": ("127.0.0.1", 0), "server": ("loadtest", 80),
+        "headers": [(b"host", b"loadtest")] + [
+            (name.lower().encode(), value.encode()) for name, value in headers.items()
+        ],
+    }
+    
+    async def receive():
+        await received.wait()
+        return {"type": "http.disconnect"}
+    
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            received.set()
+    
+    task = asyncio.ensure_future(app(scope, receive, send))
+    waiter = asyncio.ensure_future(received.wait())
+    await asyncio.wait({task, waiter}, return_when=asyncio.FIRST_COMPLETED)
+    received.set()
+    await task
+    return status_code
+
+
+async def _send(client: httpx.AsyncClient, app, call: Call, account: Account) -> int:
+    headers = account.headers if call.authenticated else {}
+    if call.stream:
+        if app is not None:
+            return await _first_event(app, call, headers)
+        async with client.stream(call.method, call.path, headers=headers) as response:
+            async for _ in response.aiter_raw():
+                break
+            return response.status_code
+    
+    response = await client.request(
+        call.method, call.path, params=call.params, json=call.json, data=call.data, headers=headers
+    )
+    if response.status_code < 400 and call.on_success is not None:
+        call.on_success(response.json())
+    return response.status_code
+
+
+async def _client_loop(
+    client: httpx.AsyncClient,
+    app,
+    accounts: List[Account],
+    rng: random.Random,
+    warmup_until: float,
+    deadline: float,
+    samples: Dict[str, list]
+) -> None:
+    names = [name for name, _, _ in OPERATIONS]
+    weights = [weight for _, weight, _ in OPERATIONS]
+    builders = dict((name, build) for name, _, build in OPERATIONS)
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            return
+        account = rng.choice(accounts)
+        name = rng.choices(names, weights=weights)[0]
+        call = builders[name](account, rng)
+        if call is None:
+            continue
+    
+        counter = [0]
+        token = _queries.set(counter)
+        start = time.perf_counter()
+        try:
+            status_code = await _send(client, app, call, account)
+        except Exception:
+            status_code = 0
+        finally:
+            _queries.reset(token)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if start >= warmup_until:
+            samples.setdefault(name, []).append((elapsed_ms, status_code, counter[0]))
+
+
+def _percentile(values: List[float], quantile: float) -> float:
+    """Percentile par rang (valeurs triées)"""
+    rank = max(1, math.ceil(quantile * len(values)))
+    return values[rank - 1]
+
+
+def _summarize(entries: list, elapsed: float, count_queries: bool) -> dict:
+    latencies = sorted(entry[0] for entry in entries)
+    errors = sum(1 for _, status_code, _ in entries if status_code == 0 or status_code >= 400)
+    return {
+        "requests": len(entries),
+        "throughput_rps": round(len(entries) / elapsed, 2),
+        "p50_ms": round(_percentile(latencies, 0.50), 2),
+        "p95_ms": round(_percentile(latencies, 0.95), 2),
+        "p99_ms": round(_percentile(latencies, 0.99), 2),
+        "error_rate": round(errors / len(entries), 4),
+        "queries_per_request": (
+            round(sum(entry[2] for entry in entries) / len(entries), 2) if count_queries else None
+        ),
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: dict, baseline: dict, args) -> List[str]:
+    """Régressions par rapport à un rapport de référence"""
+    regressions = []
+    current_operations = dict(report["operations"], total=report["total"])
+    baseline_operations = dict(baseline["operations"], total=baseline["total"])
+    for name, current in current_operations.items():
+        previous = baseline_operations.get(name)
+        if previous is None:
+            continue
+        if current["error_rate"] > args.max_error_rate:
+            regressions.append(f"{name} : taux d'erreur {current['error_rate']:.2%}")
+        if min(current["requests"], previous["requests"]) < args.min_samples:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + args.max_latency_regression):
+            regressions.append(f"{name} : p95 {previous['p95_ms']} → {current['p95_ms']} ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - args.max_throughput_drop):
+            regressions.append(f"{name} : débit {previous['throughput_rps']} → {current['throughput_rps']} req/s")
+        if (
+            current["queries_per_request"] is not None
+            and previous.get("queries_per_request") is not None
+            and current["queries_per_request"] > previous["queries_per_request"] + args.max_query_increase
+        ):
+            regressions.append(
+                f"{name} : requêtes SQL {previous['queries_per_request']} → {current['queries_per_request']}"
+            )
+    return regressions
+
+
+async def run(args) -> dict:
+    engine, SessionFactory = create_session_factory()
+    with SessionFactory() as session:
+        seeded = seed_users(session, args.users, args.scale, args.seed)
+    accounts = [Account(user) for user in seeded]
+    
+    in_process = args.base_url is None
+    if in_process:
+        # L'application utilise la base du benchmark
+        database.engine = engine
+        database.SessionLocal.configure(bind=engine)
+    
+        @event.listens_for(engine, "before_cursor_execute")
+        def count_query(*_):
+            counter = _queries.get()
+            if counter is not None:
+                counter[0] += 1
+    
+        from app.main import app
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://loadtest"
+    else:
+        app = None
+        transport = None
+        base_url = args.base_url
+    
+    samples: Dict[str, list] = {}
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=30) as client:
+        lifespan = app.router.lifespan_context(app) if in_process else None
+        if lifespan is not None:
+            await lifespan.__aenter__()
+        try:
+            start = time.perf_counter()
+            warmup_until = start + args.warmup
+            deadline = warmup_until + args.duration
+            await asyncio.gather(*(
+                _client_loop(client, app, accounts, random.Random(args.seed * 1000 + index), warmup_until, deadline, samples)
+                for index in range(args.concurrency)
+            ))
+        finally:
+            if lifespan is not None:
+                await lifespan.__aexit__(None, None, None)
+    
+    all_entries = [entry for entries in samples.values() for entry in entries]
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "mode": "asgi" if in_process else "http",
+            "database": engine.dialect.name,
+            "users": args.users,
+            "rows": sum(
+                len(user.task_ids) + len(user.shopping_item_ids) + len(user.transaction_ids) for user in seeded
+            ),
+            "scale": args.scale,
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+        },
+        "operations": {
+            name: _summarize(samples[name], args.duration, in_process)
+            for name, _, _ in OPERATIONS if name in samples
+        },
+        "total": _summarize(all_entries, args.duration, in_process),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplicateur des volumes par utilisateur")
+    parser.add_argument("--seed", type=int, default=41)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=15, help="Durée mesurée (s)")
+    parser.add_argument("--warmup", type=float, default=2, help="Durée de chauffe non mesurée (s)")
+    parser.add_argument("--base-url", default=None, help="Serveur à tester (sinon application dans le processus)")
+    parser.add_argument("--report", default=None, help="Fichier JSON du rapport")
+    parser.add_argument("--baseline", default=None, help="Rapport de référence à comparer")
+    parser.add_argument("--max-latency-regression", type=float, default=0.25, help="Hausse de p95 tolérée (ratio)")
+    parser.add_argument("--max-throughput-drop", type=float, default=0.20, help="Baisse de débit tolérée (ratio)")
+    parser.add_argument("--max-query-increase", type=float, default=0.5, help="Requêtes SQL en plus tolérées")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--min-samples", type=int, default=30, help="Échantillons minimum pour comparer une opération")
+    args = parser.parse_args()
+    
+    report = asyncio.run(run(args))
+    
+    rows = [
+        (
+            name, result["requests"], result["throughput_rps"], result["p50_ms"], result["p95_ms"],
+            result["p99_ms"], result["queries_per_request"] if result["queries_per_request"] is not None else "-",
+            f"{result['error_rate']:.1%}"
+        )
+        for name, result in list(report["operations"].items()) + [("total", report["total"])]
+    ]
+    print_table(
+        f"Test de charge ({report['meta']['users']} utilisateurs, {args.concurrency} clients, {args.duration:g} s)",
+        rows, ["opération", "requêtes", "req/s", "p50 ms", "p95 ms", "p99 ms", "SQL/req", "erreurs"]
+    )
+    
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2, ensure_ascii=False)
+        print(f"\nRapport écrit dans {args.report}")
+    
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            regressions = compare(report, json.load(baseline_file), args)
+        if regressions:
+            print("\nRégressions :")
+            for regression in regressions:
+                print(f"- {regression}")
+            sys.exit(1)
+        print("\nAucune régression par rapport à la référence")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
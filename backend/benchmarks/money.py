@@ -0,0 +1,111 @@
+"""
+Montants en centimes entiers : exactitude des sommes SQL contre une colonne FLOAT.
+
+Mesure la durée de l'agrégat et l'erreur accumulée par SUM selon le stockage.
+Les propriétés des montants (arrondi, aller-retour, totaux exacts) sont vérifiées
+par tests/test_money.py.
+
+    python -m benchmarks.money [--sizes 10000 100000 1000000]
+"""
+import argparse
+import random
+from datetime import datetime
+from decimal import Decimal
+
+from .common import create_session_factory, measure, print_table
+
+from sqlalchemy import Column, Float, Integer, MetaData, Table, func, insert, select  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.budget import BudgetCategory, BudgetCategoryType, BudgetTransaction, TransactionType  # noqa: E402
+
+# Ancienne représentation, pour comparaison
+float_metadata = MetaData()
+float_amounts = Table(
+    "benchmark_float_amounts", float_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, nullable=False, index=True),
+    Column("amount", Float, nullable=False),
+)
+
+
+def seed(session, user_id: int, category_ids, size: int, max_cents: int, rng: random.Random) -> Decimal:
+    """Insérer `size` dépenses du mois courant ; retourne leur somme exacte"""
+    now = datetime.now()
+    total = 0
+    batch, float_batch = [], []
+    for _ in range(size):
+        cents = rng.randint(1, max_cents)
+        total += cents
+        amount = Decimal(cents).scaleb(-2)
+        batch.append({
+            "title": "Dépense",
+            "amount": amount,
+            "transaction_type": TransactionType.EXPENSE,
+            "transaction_date": now,
+            "category_id": rng.choice(category_ids),
+            "user_id": user_id,
+        })
+        float_batch.append({"user_id": user_id, "amount": float(amount)})
+        if len(batch) == 10000:
+            session.execute(insert(BudgetTransaction), batch)
+            session.execute(insert(float_amounts), float_batch)
+            batch, float_batch = [], []
+    if batch:
+        session.execute(insert(BudgetTransaction), batch)
+        session.execute(insert(float_amounts), float_batch)
+    session.commit()
+    return Decimal(total).scaleb(-2)
+
+
+def create_user(session, name: str):
+    user = User(email=f"{name}@lifehub.local", username=name, hashed_password="x")
+    session.add(user)
+    session.flush()
+    categories = [
+        BudgetCategory(name=category.value, category_type=category, monthly_budget=1000, user_id=user.id)
+        for category in BudgetCategoryType
+    ]
+    session.add_all(categories)
+    session.commit()
+    return user.id, [category.id for category in categories]
+
+
+def money_sum(session, user_id: int) -> Decimal:
+    return session.execute(
+        select(func.sum(BudgetTransaction.amount)).where(BudgetTransaction.user_id == user_id)
+    ).scalar()
+
+
+def float_sum(session, user_id: int) -> float:
+    return session.execute(
+        select(func.sum(float_amounts.c.amount)).where(float_amounts.c.user_id == user_id)
+    ).scalar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    engine, SessionFactory = create_session_factory()
+    float_metadata.create_all(engine)
+    session = SessionFactory()
+    
+    rows = []
+    for size in args.sizes:
+        user_id, category_ids = create_user(session, f"money{size}")
+        expected = seed(session, user_id, category_ids, size, 10 ** 6, random.Random(size))
+        for label, func in (
+            ("SUM FLOAT", lambda: float_sum(session, user_id)),
+            ("SUM centimes", lambda: money_sum(session, user_id)),
+        ):
+            error = abs(Decimal(str(func())) - expected)
+            result = measure(func, args.repeat)
+            rows.append((size, label, f"{error:.2E}" if error else "0", f"{result['median_ms']:.1f}"))
+    
+    print_table("Somme des montants (médiane)", rows, ["lignes", "stockage", "erreur absolue", "ms"])
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""
+Débit du dispatcher de rappels avec le notificateur local : tâches réparties sur un
+an, dont une rafale échue dans la fenêtre courante, traitées par plusieurs shards.
+
+    python -m benchmarks.reminders [--tasks 200000] [--due 20000] [--users 2000] [--shards 4]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from .common import QueryCounter, create_session_factory, print_table
+
+from sqlalchemy import insert  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.task import Task, TaskStatus  # noqa: E402
+from app.services.reminders import ReminderDispatcher, StubNotifier  # noqa: E402
+
+
+def seed(session, users: int, tasks: int, due: int, now: datetime):
+    """`tasks` échéances sur ±1 an et `due` rappels échus dans les 5 dernières minutes"""
+    rng = random.Random(tasks)
+    session.execute(insert(User), [
+        {"email": f"user{i}@lifehub.local", "username": f"user{i}", "hashed_password": "x"}
+        for i in range(users)
+    ])
+    user_ids = [user_id for (user_id,) in session.query(User.id)]
+    
+    batch = []
+    for i in range(tasks + due):
+        if i < due:
+            # Échéance dans ~15 min : rappel dû maintenant (avance par défaut de 15 min)
+            due_date = now + timedelta(minutes=15, seconds=-rng.randint(0, 300))
+        else:
+            due_date = now + timedelta(minutes=rng.randint(-525600, 525600))
+        batch.append({
+            "title": f"Tâche {i}",
+            "status": TaskStatus.PENDING,
+            "completed": False,
+            "due_date": due_date,
+            "user_id": rng.choice(user_ids),
+        })
+        if len(batch) == 10000:
+            session.execute(insert(Task), batch)
+            batch = []
+    if batch:
+        session.execute(insert(Task), batch)
+    session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=200000)
+    parser.add_argument("--due", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--shards", type=int, default=4)
+    args = parser.parse_args()
+    
+    engine, SessionFactory = create_session_factory()
+    now = datetime.utcnow()
+    session = SessionFactory()
+    seed(session, args.users, args.tasks, args.due, now)
+    session.close()
+    counter = QueryCounter(engine)
+    
+    notifier = StubNotifier()
+    dispatchers = [
+        ReminderDispatcher(SessionFactory, notifier, shard_index=i, shard_count=args.shards)
+        for i in range(args.shards)
+    ]
+    
+    rows = []
+    for index, dispatcher in enumerate(dispatchers):
+        counter.reset()
+        start = time.perf_counter()
+        queued = dispatcher.refill(now)
+        refill_ms = (time.perf_counter() - start) * 1000
+    
+        start = time.perf_counter()
+        sent = dispatcher.run_once(now)
+        elapsed = time.perf_counter() - start
+        rows.append((
+            f"{index}/{args.shards}", queued, f"{refill_ms:.1f}", sent,
+            f"{sent / elapsed:.0f}" if elapsed else "-", counter.reset()
+        ))
+    
+    print_table(
+        f"Rappels sur {args.tasks + args.due} tâches, {args.users} utilisateurs",
+        rows,
+        ["shard", "en file", "balayage ms", "envoyés", "rappels/s", "requêtes"],
+    )
+    print(f"Notifications : {notifier.notifications} pour {notifier.reminders} rappels")
+    
+    # Idempotence : un nouveau passage (ou un redémarrage) n'envoie rien de plus
+    restarted = [
+        ReminderDispatcher(SessionFactory, notifier, shard_index=i, shard_count=args.shards)
+        for i in range(args.shards)
+    ]
+    resent = sum(dispatcher.run_once(now) for dispatcher in restarted)
+    print(f"Rappels dus : {args.due}, livrés : {len(notifier.delivered)}, renvoyés après redémarrage : {resent}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""
+Sérialisation des listes : chemin ORM + Pydantic contre projection + orjson.
+
+    python -m benchmarks.serialization [--sizes 100 1000 10000]
+"""
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+from typing import List
+
+from .common import create_session_factory, measure, print_table
+
+from pydantic import TypeAdapter  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.task import Task, TaskPriority  # noqa: E402
+from app.models.shopping import ShoppingItem, ShoppingCategory  # noqa: E402
+from app.models.budget import BudgetTransaction, TransactionType  # noqa: E402
+from app.schemas.task import TaskResponse  # noqa: E402
+from app.schemas.shopping import ShoppingItemResponse  # noqa: E402
+from app.schemas.budget import BudgetTransactionResponse  # noqa: E402
+from app.serialization import (  # noqa: E402
+    TASK_PROJECTION, SHOPPING_ITEM_PROJECTION, BUDGET_TRANSACTION_PROJECTION
+)
+
+
+def seed(session, user_id: int, size: int):
+    """Créer `size` lignes de chaque type pour un utilisateur"""
+    now = datetime.utcnow()
+    rng = random.Random(size)
+    session.add_all(
+        Task(
+            title=f"Tâche {i}",
+            description="Description détaillée " * rng.randint(1, 20),
+            priority=rng.choice(list(TaskPriority)),
+            due_date=now + timedelta(days=rng.randint(-30, 30)),
+            user_id=user_id,
+        )
+        for i in range(size)
+    )
+    session.add_all(
+        ShoppingItem(
+            name=f"Article {i}",
+            quantity=rng.randint(1, 5),
+            estimated_price=round(rng.uniform(0.5, 30), 2),
+            category=rng.choice(list(ShoppingCategory)),
+            user_id=user_id,
+        )
+        for i in range(size)
+    )
+    session.add_all(
+        BudgetTransaction(
+            title=f"Transaction {i}",
+            amount=round(rng.uniform(1, 200), 2),
+            transaction_type=TransactionType.EXPENSE,
+            transaction_date=now - timedelta(days=rng.randint(0, 90)),
+            tags="courses, maison",
+            user_id=user_id,
+        )
+        for i in range(size)
+    )
+    session.commit()
+
+
+def orm_path(session, model, schema, user_id: int, size: int) -> bytes:
+    """Chemin historique : objets ORM validés par Pydantic (from_attributes)"""
+    adapter = TypeAdapter(List[schema])
+    objects = session.query(model).filter(model.user_id == user_id).limit(size).all()
+    validated = adapter.validate_python(objects, from_attributes=True)
+    session.expunge_all()
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode()
+
+
+def fast_path(session, model, projection, user_id: int, size: int) -> bytes:
+    """Projection de colonnes encodée par orjson"""
+    query = session.query(model).filter(model.user_id == user_id).limit(size)
+    return projection.response(projection.select(query).all()).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    cases = [
+        ("tasks", Task, TaskResponse, TASK_PROJECTION),
+        ("shopping_items", ShoppingItem, ShoppingItemResponse, SHOPPING_ITEM_PROJECTION),
+        ("budget_transactions", BudgetTransaction, BudgetTransactionResponse, BUDGET_TRANSACTION_PROJECTION),
+    ]
+    
+    rows = []
+    for size in args.sizes:
+        _, SessionFactory = create_session_factory()
+        session = SessionFactory()
+        user = User(email=f"bench{size}@lifehub.local", username=f"bench{size}", hashed_password="x")
+        session.add(user)
+        session.commit()
+        seed(session, user.id, size)
+    
+        for name, model, schema, projection in cases:
+            orm = measure(lambda: orm_path(session, model, schema, user.id, size), args.repeat)
+            fast = measure(lambda: fast_path(session, model, projection, user.id, size), args.repeat)
+            rows.append((
+                name, size,
+                f"{orm['median_ms']:.1f}", f"{fast['median_ms']:.1f}",
+                f"x{orm['median_ms'] / fast['median_ms']:.1f}",
+            ))
+        session.close()
+    
+    print_table(
+        "Sérialisation des listes (médiane)",
+        rows,
+        ["collection", "lignes", "orm+pydantic ms", "projection+orjson ms", "gain"],
+    )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,113 @@
+"""
+Résumé des courses : agrégation conditionnelle en une requête contre chargement
+de tous les articles et calcul en Python.
+
+    python -m benchmarks.shopping_summary [--sizes 1000 10000 100000]
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from .common import QueryCounter, create_session_factory, measure, print_table
+
+from sqlalchemy import insert  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.shopping import ShoppingItem, ShoppingCategory  # noqa: E402
+from app.services.shopping_stats import shopping_summary  # noqa: E402
+
+NAMES = ["Lait", "Pain", "Œufs", "Beurre", "Pommes", "Café", "Riz", "Pâtes", "Savon", "Tomates"]
+
+
+def seed(session, user_id: int, size: int):
+    """Articles dont 60 % achetés, avec un prix réel proche de l'estimation"""
+    rng = random.Random(size)
+    now = datetime.utcnow()
+    categories = list(ShoppingCategory)
+    batch = []
+    for i in range(size):
+        estimated = round(rng.uniform(0.5, 30), 2) if rng.random() < 0.9 else None
+        completed = rng.random() < 0.6
+        batch.append({
+            "name": rng.choice(NAMES),
+            "quantity": rng.randint(1, 5),
+            "estimated_price": estimated,
+            "actual_price": round((estimated or 5) * rng.uniform(0.8, 1.3), 2) if completed else None,
+            "category": rng.choice(categories),
+            "completed": completed,
+            "purchased_at": now - timedelta(days=rng.randint(0, 365)) if completed else None,
+            "user_id": user_id,
+        })
+        if len(batch) == 10000:
+            session.execute(insert(ShoppingItem), batch)
+            batch = []
+    if batch:
+        session.execute(insert(ShoppingItem), batch)
+    session.commit()
+
+
+def python_summary(session, user_id: int) -> dict:
+    """Calcul côté application : tous les articles sont chargés en objets ORM"""
+    items = session.query(ShoppingItem).filter(ShoppingItem.user_id == user_id).all()
+    completed = [item for item in items if item.completed]
+    compared = [item for item in completed if item.estimated_price is not None and item.actual_price is not None]
+    by_category = {}
+    for item in items:
+        summary = by_category.setdefault(item.category, [0, 0, Decimal(0), Decimal(0)])
+        summary[0] += 1
+        summary[1] += 1 if item.completed else 0
+        summary[2] += item.total_estimated_cost
+        summary[3] += item.total_actual_cost
+    session.expunge_all()
+    return {
+        "total_items": len(items),
+        "completed_items": len(completed),
+        "estimated_total": sum((item.total_estimated_cost for item in items), Decimal(0)),
+        "actual_total": sum((item.total_actual_cost for item in items), Decimal(0)),
+        "price_variance": sum(
+            (item.quantity * (item.actual_price - item.estimated_price) for item in compared), Decimal(0)
+        ),
+        "categories": by_category,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    engine, SessionFactory = create_session_factory()
+    counter = QueryCounter(engine)
+    session = SessionFactory()
+    
+    rows = []
+    for size in args.sizes:
+        user = User(email=f"shop{size}@lifehub.local", username=f"shop{size}", hashed_password="x")
+        session.add(user)
+        session.commit()
+        seed(session, user.id, size)
+    
+        expected = python_summary(session, user.id)
+        actual = shopping_summary(session, user.id)
+        assert (expected["total_items"], expected["completed_items"]) == (actual.total_items, actual.completed_items)
+        # Montants en centimes : les totaux SQL et Python sont égaux au centime près
+        assert expected["estimated_total"] == actual.estimated_total
+        assert expected["actual_total"] == actual.actual_total
+        assert expected["price_variance"] == actual.price_variance
+    
+        for label, func in (
+            ("chargement complet + Python", lambda: python_summary(session, user.id)),
+            ("agrégation SQL", lambda: shopping_summary(session, user.id)),
+        ):
+            counter.reset()
+            func()
+            queries = counter.reset()
+            result = measure(func, args.repeat)
+            rows.append((size, label, queries, f"{result['median_ms']:.1f}"))
+    
+    print_table("Résumé des courses (médiane)", rows, ["articles", "méthode", "requêtes", "ms"])
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Bascule d'une tâche (PATCH /api/tasks/{id}/toggle) : allers-retours SQL et débit.
+
+« func.now + refresh » reproduit le gestionnaire d'origine : horodatage SQL,
+expiration des objets au commit puis db.refresh() pour relire la ligne.
+« SELECT puis UPDATE » charge la ligne, la modifie et la valide sans la relire.
+Le gestionnaire actuel émet un seul UPDATE filtré sur (id, user_id) ; sans
+RETURNING (MySQL), la ligne est relue par clé primaire.
+
+    python -m benchmarks.toggle [--toggles 2000]
+"""
+import argparse
+import asyncio
+import time
+
+from .common import QueryCounter, create_session_factory, print_table
+
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.sql import func  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.task import Task, TaskStatus  # noqa: E402
+from app.routers.tasks import toggle_task_completion  # noqa: E402
+from app.schemas.task import TaskResponse  # noqa: E402
+
+
+def legacy_toggle(db, task_id: int, user: User) -> dict:
+    task = db.query(Task).filter(Task.id == task_id, Task.user_id == user.id).first()
+    if task.completed:
+        task.completed = False
+        task.status = TaskStatus.PENDING
+        task.completed_at = None
+    else:
+        task.completed = True
+        task.status = TaskStatus.COMPLETED
+        task.completed_at = func.now()
+    db.commit()
+    db.refresh(task)
+    return TaskResponse.model_validate(task).model_dump()
+
+
+LOOP = asyncio.new_event_loop()
+
+
+def select_then_update_toggle(db, task_id: int, user: User) -> dict:
+    task = db.query(Task).filter(Task.id == task_id, Task.user_id == user.id).first()
+    if task.completed:
+        task.mark_uncompleted()
+    else:
+        task.mark_completed()
+    db.commit()
+    return TaskResponse.model_validate(task).model_dump()
+
+
+def current_toggle(db, task_id: int, user: User) -> dict:
+    task = LOOP.run_until_complete(toggle_task_completion(task_id, current_user=user, db=db))
+    return TaskResponse.model_validate(task).model_dump()
+
+
+def run(SessionFactory, counter, user_id: int, task_ids, toggle) -> tuple:
+    """Une session par requête, comme get_db ; l'utilisateur est chargé par l'authentification"""
+    counter.reset()
+    start = time.perf_counter()
+    for task_id in task_ids:
+        db = SessionFactory()
+        user = db.get(User, user_id)
+        toggle(db, task_id, user)
+        db.close()
+    elapsed = time.perf_counter() - start
+    return counter.reset() / len(task_ids), len(task_ids) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--toggles", type=int, default=2000)
+    args = parser.parse_args()
+    
+    engine, SessionFactory = create_session_factory()
+    LegacySession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    counter = QueryCounter(engine)
+    
+    session = SessionFactory()
+    user = User(email="toggle@lifehub.local", username="toggle", hashed_password="x")
+    session.add(user)
+    session.commit()
+    tasks = [Task(title=f"Tâche {i}", user_id=user.id) for i in range(100)]
+    session.add_all(tasks)
+    session.commit()
+    task_ids = [tasks[i % len(tasks)].id for i in range(args.toggles)]
+    user_id = user.id
+    session.close()
+    
+    rows = []
+    for label, factory, toggle in (
+        ("func.now + refresh", LegacySession, legacy_toggle),
+        ("SELECT puis UPDATE", SessionFactory, select_then_update_toggle),
+        ("UPDATE filtré (dépôt)", SessionFactory, current_toggle),
+    ):
+        queries, throughput = run(factory, counter, user_id, task_ids, toggle)
+        rows.append((label, f"{queries:.1f}", f"{throughput:.0f}"))
+    
+    print_table(
+        f"Bascule de tâche ({args.toggles} requêtes, utilisateur inclus)",
+        rows,
+        ["gestionnaire", "requêtes SQL / bascule", "bascules/s"],
+    )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
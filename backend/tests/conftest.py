@@ -0,0 +1,79 @@
+"""
+Fixtures des tests : base SQLite en mémoire par défaut (TEST_DATABASE_URL pour une
+base MySQL de test, vidée à chaque test) et client HTTP sur l'application, sans
+serveur.
+"""
+import os
+
+# La configuration est validée à l'import : valeurs locales pour les tests
+os.environ.setdefault("SECRET_KEY", "test-secret-key-" + "x" * 32)
+os.environ.setdefault("LOG_FILE", "/tmp/lifehub-tests/logs/lifehub.log")
+os.environ.setdefault("UPLOAD_DIR", "/tmp/lifehub-tests/uploads")
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+import pytest_asyncio  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+from app import database, limits  # noqa: E402
+from app import models  # noqa: E402,F401
+from app.auth import create_access_token  # noqa: E402
+from app.database import Base, use_utc_sessions  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+@pytest.fixture
+def engine():
+    url = os.environ.get("TEST_DATABASE_URL", "sqlite://")
+    if url.startswith("sqlite"):
+        engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        engine = use_utc_sessions(create_engine(url, pool_pre_ping=True))
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="test@example.com", username="test", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def auth_headers(user):
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+
+@pytest.fixture
+def app(engine, monkeypatch):
+    """Application branchée sur la base de test"""
+    original = database.engine
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(limits, "engine", engine)
+    database.SessionLocal.configure(bind=engine)
+    from app.main import app
+    yield app
+    database.SessionLocal.configure(bind=original)
+
+
+@pytest_asyncio.fixture
+async def client(app):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""
+Suggestions d'articles : l'index gardé en mémoire reste égal à un index
+reconstruit depuis la base après chaque écriture.
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+
+from app.routers import shopping
+from app.services.archive import run_archive
+from app.services.autocomplete import SuggestionCache
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    cache = SuggestionCache(max_users=10, ttl=3600)
+    monkeypatch.setattr(shopping, "suggestions", cache)
+    return cache
+
+
+@pytest_asyncio.fixture
+async def item(client, auth_headers):
+    response = await client.post("/api/shopping/", json={"name": "Café moulu"}, headers=auth_headers)
+    return response.json()
+
+
+async def suggest(client, auth_headers, prefix="caf"):
+    response = await client.get("/api/shopping/suggestions", params={"q": prefix}, headers=auth_headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def price(suggestion):
+    return None if suggestion["average_price"] is None else Decimal(str(suggestion["average_price"]))
+
+
+@pytest.mark.asyncio
+async def test_purchase_toggled_twice_counts_the_price_once(client, auth_headers, item):
+    await suggest(client, auth_headers)
+    toggle = f"/api/shopping/{item['id']}/toggle"
+    await client.patch(toggle, params={"actual_price": "4.00"}, headers=auth_headers)
+    await client.patch(toggle, headers=auth_headers)
+    assert price((await suggest(client, auth_headers))[0]) is None
+    
+    await client.patch(toggle, params={"actual_price": "6.00"}, headers=auth_headers)
+    assert price((await suggest(client, auth_headers))[0]) == Decimal("6.00")
+
+
+@pytest.mark.asyncio
+async def test_price_change_of_a_purchased_item_replaces_the_old_price(client, auth_headers, item):
+    url = f"/api/shopping/{item['id']}"
+    await client.put(url, json={"completed": True, "actual_price": "4.00"}, headers=auth_headers)
+    assert price((await suggest(client, auth_headers))[0]) == Decimal("4.00")
+    
+    await client.put(url, json={"actual_price": "5.00"}, headers=auth_headers)
+    assert price((await suggest(client, auth_headers))[0]) == Decimal("5.00")
+
+
+@pytest.mark.asyncio
+async def test_deleted_and_renamed_items_leave_the_index(client, auth_headers, item):
+    other = (await client.post("/api/shopping/", json={"name": "Café en grains"}, headers=auth_headers)).json()
+    assert len(await suggest(client, auth_headers)) == 2
+    
+    await client.delete(f"/api/shopping/{other['id']}", headers=auth_headers)
+    await client.put(f"/api/shopping/{item['id']}", json={"name": "Thé vert"}, headers=auth_headers)
+    assert await suggest(client, auth_headers) == []
+    assert [suggestion["name"] for suggestion in await suggest(client, auth_headers, "th")] == ["Thé vert"]
+
+
+@pytest.mark.asyncio
+async def test_archived_purchases_stay_in_the_index(client, auth_headers, session_factory, cache, user, item):
+    await client.put(f"/api/shopping/{item['id']}", json={"completed": True, "actual_price": "4.00"}, headers=auth_headers)
+    run_archive(session_factory, days=0, now=datetime.utcnow() + timedelta(days=1))
+    cache.invalidate(user.id)
+    
+    suggestion, = await suggest(client, auth_headers)
+    assert suggestion["times_added"] == 1
+    assert price(suggestion) == Decimal("4.00")
\ No newline at end of file
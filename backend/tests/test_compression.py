@@ -0,0 +1,84 @@
+"""
+Compression des réponses : choix du codage et ETag de chaque représentation.
+"""
+import pytest
+import pytest_asyncio
+
+from app.middleware import compression
+from app.middleware.compression import CompressionMiddleware
+
+
+@pytest_asyncio.fixture
+async def task_url(client, auth_headers):
+    # Description assez longue pour dépasser le seuil de compression JSON
+    response = await client.post(
+        "/api/tasks/", json={"title": "Compressée", "description": "x" * 4096}, headers=auth_headers
+    )
+    return f"/api/tasks/{response.json()['id']}"
+
+
+async def get(client, url, auth_headers, **headers):
+    return await client.get(url, headers={**auth_headers, **headers})
+
+
+@pytest.mark.asyncio
+async def test_compressed_body_has_its_own_strong_etag(client, auth_headers, task_url):
+    identity = await get(client, task_url, auth_headers, **{"Accept-Encoding": "identity"})
+    gzipped = await get(client, task_url, auth_headers, **{"Accept-Encoding": "gzip"})
+    
+    assert "content-encoding" not in identity.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == identity.headers["etag"][:-1] + '-gzip"'
+    assert "Accept-Encoding" in gzipped.headers["vary"]
+
+
+@pytest.mark.asyncio
+async def test_compressed_etag_revalidates(client, auth_headers, task_url):
+    etag = (await get(client, task_url, auth_headers, **{"Accept-Encoding": "gzip"})).headers["etag"]
+    
+    response = await get(client, task_url, auth_headers, **{"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_compressed_etag_satisfies_if_match(client, auth_headers, task_url):
+    etag = (await get(client, task_url, auth_headers, **{"Accept-Encoding": "gzip"})).headers["etag"]
+    
+    response = await client.put(task_url, json={"title": "Renommée"}, headers={**auth_headers, "If-Match": etag})
+    assert response.status_code == 200
+    stale = await client.put(task_url, json={"title": "Encore"}, headers={**auth_headers, "If-Match": etag})
+    assert stale.status_code == 412
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, br", "br"),
+    ("br;q=0.1, gzip;q=1", "gzip"),
+    ("br;q=0.8, gzip;q=0.8", "br"),
+    ("gzip;q=0.5, br;q=0.9", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("gzip; Q=0.2, *;q=0.5", "br"),
+    ("*;q=0, gzip;q=0.3", "gzip"),
+    ("gzip;q=0.5, identity", None),
+    ("br;q=0, gzip;q=0", None),
+    ("identity", None),
+    ("", None),
+])
+def test_encoding_follows_qvalues(monkeypatch, header, expected):
+    # La sélection seule est testée : le paquet brotli n'est pas nécessaire
+    monkeypatch.setattr(compression, "brotli", object())
+    middleware = CompressionMiddleware(app=None, content_types={})
+    scope = {"type": "http", "headers": [(b"accept-encoding", header.encode())]}
+    
+    assert middleware._select_encoding(scope) == expected
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("br, gzip;q=0.5", "gzip"),
+    ("br", None),
+])
+def test_gzip_only_without_brotli(monkeypatch, header, expected):
+    monkeypatch.setattr(compression, "brotli", None)
+    middleware = CompressionMiddleware(app=None, content_types={})
+    scope = {"type": "http", "headers": [(b"accept-encoding", header.encode())]}
+    
+    assert middleware._select_encoding(scope) == expected
\ No newline at end of file
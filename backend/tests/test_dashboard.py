@@ -0,0 +1,40 @@
+"""
+Écran d'accueil : le mois du budget est le mois UTC courant, comme les dates
+de transaction stockées et /api/budget/overview.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.models.budget import BudgetCategory, BudgetCategoryType, BudgetTransaction, TransactionType
+from app.routers import budget, dashboard
+
+# Fin de mois en UTC : déjà le mois suivant à l'heure de Paris
+NOW = datetime(2026, 1, 31, 23, 30)
+
+
+@pytest.fixture
+def spent(db, user, monkeypatch):
+    for module in (budget, dashboard):
+        monkeypatch.setattr(module, "utcnow", lambda: NOW)
+    category = BudgetCategory(
+        name="Courses", category_type=BudgetCategoryType.ALIMENTATION, user_id=user.id, monthly_budget=Decimal("300.00")
+    )
+    db.add(category)
+    db.flush()
+    db.add(BudgetTransaction(
+        title="Marché", amount=Decimal("42.50"), transaction_type=TransactionType.EXPENSE,
+        transaction_date=datetime(2026, 1, 31, 23, 0), user_id=user.id, category_id=category.id
+    ))
+    db.commit()
+    return Decimal("42.50")
+
+
+@pytest.mark.asyncio
+async def test_dashboard_budget_uses_the_utc_month(client, auth_headers, spent):
+    overview = (await client.get("/api/budget/overview", headers=auth_headers)).json()
+    home = (await client.get("/api/dashboard/", headers=auth_headers)).json()
+    
+    assert Decimal(str(overview["total_spent"])) == spent
+    assert home["budget"] == overview
\ No newline at end of file
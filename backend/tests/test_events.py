@@ -0,0 +1,103 @@
+"""
+Diffusion Redis des événements : le commit n'attend jamais Redis, les lots
+partent dans l'ordre et une file pleine perd des événements sans erreur.
+"""
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+import redis.asyncio as aioredis
+
+from app.config import settings
+from app.models.task import Task
+from app.services import events
+from app.services.events import CHANNEL_PREFIX, RedisBroker
+
+
+class StalledPubSub:
+    async def subscribe(self, *channels):
+        pass
+    
+    async def unsubscribe(self, *channels):
+        pass
+    
+    async def listen(self):
+        await asyncio.Event().wait()
+        yield
+    
+    async def aclose(self):
+        pass
+
+
+class StalledRedis:
+    """Client dont les publications restent bloquées jusqu'à `release`"""
+    
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.published = []
+    
+    def pubsub(self, **kwargs):
+        return StalledPubSub()
+    
+    async def publish(self, channel, data):
+        await self.release.wait()
+        self.published.append((channel, json.loads(data)))
+    
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    client = StalledRedis()
+    monkeypatch.setattr(aioredis.Redis, "from_url", staticmethod(lambda url, **kwargs: client))
+    return client
+
+
+@pytest_asyncio.fixture
+async def broker(redis_client, monkeypatch):
+    broker = RedisBroker("redis://stalled")
+    monkeypatch.setattr(events, "broker", broker)
+    await broker.start()
+    yield broker
+    await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_commit_does_not_wait_for_redis(session_factory, user, redis_client, broker):
+    with session_factory() as db:
+        first, second = Task(title="Première", user_id=user.id), Task(title="Seconde", user_id=user.id)
+        db.add(first)
+        db.commit()
+        db.add(second)
+        db.commit()
+        ids = [first.id, second.id]
+    await asyncio.sleep(0)
+    assert redis_client.published == []
+    
+    redis_client.release.set()
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert [(channel, [change["id"] for change in changes]) for channel, changes in redis_client.published] == [
+        (f"{CHANNEL_PREFIX}{user.id}", [task_id]) for task_id in ids
+    ]
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_events(redis_client, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "events_publish_queue", 3)
+    broker = RedisBroker("redis://stalled")
+    await broker.start()
+    try:
+        for user_id in range(10):
+            broker.publish(user_id, [{"entity": "tasks", "id": 1, "action": "updated"}])
+        await asyncio.sleep(0)
+        redis_client.release.set()
+        for _ in range(10):
+            await asyncio.sleep(0)
+    finally:
+        await broker.stop()
+    
+    assert "File de publication pleine" in caplog.text
+    assert [channel for channel, _ in redis_client.published] == [f"{CHANNEL_PREFIX}{user_id}" for user_id in range(3)]
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+Requêtes abusives sur les listes : plafonds de pagination, délai MySQL et
+annulation des requêtes abandonnées.
+"""
+import asyncio
+import os
+import time
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app import limits
+from app.config import settings
+from app.models.task import Task
+
+requires_mysql = pytest.mark.skipif(
+    not os.environ.get("TEST_DATABASE_URL", "").startswith("mysql"),
+    reason="KILL QUERY et SLEEP nécessitent MySQL (TEST_DATABASE_URL=mysql+pymysql://...)"
+)
+
+
+class ExecutionTimeExceeded(Exception):
+    """Erreur du pilote MySQL pour une requête interrompue par MAX_EXECUTION_TIME"""
+
+
+@pytest.fixture
+def tasks(db, user):
+    db.add_all(Task(title=f"Tâche {index}", user_id=user.id) for index in range(settings.max_page_size + 10))
+    db.commit()
+
+
+@pytest.mark.asyncio
+async def test_huge_limit_is_clamped(client, auth_headers, tasks):
+    response = await client.get("/api/tasks/", params={"limit": 10 ** 9}, headers=auth_headers)
+    
+    assert response.status_code == 200
+    assert len(response.json()) == settings.max_page_size
+    assert response.headers["X-Page-Limit"] == str(settings.max_page_size)
+
+
+@pytest.mark.asyncio
+async def test_default_page_size_is_announced(client, auth_headers, tasks):
+    response = await client.get("/api/tasks/", headers=auth_headers)
+    
+    assert len(response.json()) == settings.default_page_size
+    assert response.headers["X-Page-Limit"] == str(settings.default_page_size)
+
+
+@pytest.mark.asyncio
+async def test_skip_beyond_max_offset_is_rejected(client, auth_headers):
+    response = await client.get(
+        "/api/tasks/", params={"skip": settings.max_page_offset + 1}, headers=auth_headers
+    )
+    
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_ceiling_drops_when_pool_is_nearly_saturated(client, auth_headers, tasks, monkeypatch):
+    # Pool de 4 connexions dont 3 empruntées (75 %)
+    pressured = create_engine("sqlite://", poolclass=QueuePool, pool_size=4, max_overflow=0)
+    held = [pressured.connect() for _ in range(3)]
+    monkeypatch.setattr(limits, "engine", pressured)
+    try:
+        response = await client.get("/api/tasks/", params={"limit": 10 ** 9}, headers=auth_headers)
+    finally:
+        for connection in held:
+            connection.close()
+    
+    ceiling = max(settings.min_page_size, settings.max_page_size // 4)
+    assert response.headers["X-Page-Limit"] == str(ceiling)
+    assert len(response.json()) == ceiling
+
+
+@pytest.mark.asyncio
+async def test_query_timeout_maps_to_503(client, auth_headers, engine):
+    def interrupt(conn, cursor, statement, parameters, context, executemany):
+        if "FROM tasks" in statement:
+            raise OperationalError(statement, parameters, ExecutionTimeExceeded(
+                limits.MYSQL_EXECUTION_TIME_EXCEEDED,
+                "Query execution was interrupted, maximum statement execution time exceeded"
+            ))
+    
+    event.listen(engine, "before_cursor_execute", interrupt)
+    try:
+        response = await client.get("/api/tasks/", headers=auth_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", interrupt)
+    
+    assert response.status_code == 503
+
+
+def test_kill_query_does_not_borrow_from_the_pool():
+    control = limits._control_engine(make_url("mysql+pymysql://lifehub@localhost/lifehub"))
+    
+    assert isinstance(control.pool, NullPool)
+
+
+@requires_mysql
+@pytest.mark.asyncio
+async def test_disconnect_kills_the_running_query(app, engine, auth_headers, tasks):
+    sleep_seconds, disconnect_after = 10, 0.5
+    
+    def slow(conn, cursor, statement, parameters, context, executemany):
+        # Liste rendue artificiellement longue : SLEEP est interrompu par KILL QUERY
+        if "FROM tasks" in statement:
+            statement = f"SELECT SLEEP({sleep_seconds}), listed.* FROM ({statement}) AS listed"
+        return statement, parameters
+    
+    started = time.perf_counter()
+    statuses = []
+    
+    async def receive():
+        if time.perf_counter() - started < disconnect_after:
+            await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+    
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+    
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/api/tasks/", "raw_path": b"/api/tasks/", "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"test"), (b"authorization", auth_headers["Authorization"].encode())],
+        "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    event.listen(engine, "before_cursor_execute", slow, retval=True)
+    try:
+        await app(scope, receive, send)
+    finally:
+        event.remove(engine, "before_cursor_execute", slow)
+    
+    assert statuses == [499]
+    assert time.perf_counter() - started < sleep_seconds
+    assert engine.pool.checkedout() == 0
\ No newline at end of file
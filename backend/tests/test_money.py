@@ -0,0 +1,164 @@
+"""
+Montants en centimes : arrondi, aller-retour par la base et sommes exactes.
+
+Les cas aléatoires sont tirés avec une graine par cas : un échec se rejoue à
+l'identique avec son identifiant pytest.
+"""
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import BigInteger, Column, Integer, MetaData, Table, insert, literal, select, type_coerce
+
+from app.models.budget import BudgetCategory, BudgetCategoryType, BudgetTransaction, TransactionType
+from app.models.user import User
+from app.money import Money, money, to_decimal
+from app.services.budget_stats import budget_overview, month_bounds, monthly_spending
+
+SEEDS = range(20)
+
+amounts_metadata = MetaData()
+amounts = Table(
+    "test_money_amounts", amounts_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("amount", Money()),
+)
+
+
+@pytest.fixture
+def amounts_table(engine):
+    amounts_metadata.create_all(engine)
+    yield amounts
+    amounts_metadata.drop_all(engine)
+
+
+def cents(value: Decimal) -> int:
+    return int(value.scaleb(2))
+
+
+# === ARRONDI ===
+
+@pytest.mark.parametrize("value, expected", [
+    (Decimal("0.005"), Decimal("0.01")),
+    (Decimal("0.004"), Decimal("0.00")),
+    (Decimal("-0.005"), Decimal("-0.01")),
+    (Decimal("2.675"), Decimal("2.68")),
+    (1.005, Decimal("1.01")),
+    (0.1 + 0.2, Decimal("0.30")),
+    (19.99, Decimal("19.99")),
+    (10, Decimal("10.00")),
+    ("3.14159", Decimal("3.14")),
+    (None, None),
+])
+def test_to_decimal_rounds_half_up_to_the_cent(value, expected):
+    assert to_decimal(value) == expected
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_to_decimal_matches_integer_rounding(seed):
+    rng = random.Random(seed)
+    for _ in range(500):
+        whole = rng.randint(0, 10 ** 11)
+        thousandth = rng.randint(0, 9)
+        sign = rng.choice((1, -1))
+        value = sign * (Decimal(whole).scaleb(-2) + Decimal(thousandth).scaleb(-3))
+        expected = sign * (whole + (1 if thousandth >= 5 else 0))
+        assert cents(to_decimal(value)) == expected
+        assert to_decimal(value).as_tuple().exponent == -2
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_money_expression_is_read_as_rounded_amount(db, seed):
+    rng = random.Random(seed)
+    for _ in range(20):
+        price, quantity = rng.randint(0, 10 ** 8), rng.randint(1, 1000)
+        result = db.execute(select(money(literal(price, BigInteger) * quantity))).scalar()
+        assert result == Decimal(price * quantity).scaleb(-2)
+        assert result.as_tuple().exponent == -2
+
+
+# === ALLER-RETOUR ===
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_money_column_round_trip(db, amounts_table, seed):
+    rng = random.Random(seed)
+    values = [None, 0, Decimal("-0.01"), 0.1 + 0.2, Decimal("99999999999.99")]
+    values += [Decimal(rng.randint(-10 ** 12, 10 ** 12)).scaleb(-rng.randint(0, 4)) for _ in range(100)]
+    values += [round(rng.uniform(0, 10 ** 6), 2) for _ in range(100)]
+    db.execute(insert(amounts_table), [{"id": index, "amount": value} for index, value in enumerate(values, 1)])
+    
+    rows = db.execute(select(
+        amounts_table.c.id, amounts_table.c.amount, type_coerce(amounts_table.c.amount, BigInteger)
+    ).order_by(amounts_table.c.id)).all()
+    for (_, amount, stored), value in zip(rows, values):
+        expected = to_decimal(value)
+        assert amount == expected
+        assert stored == (None if expected is None else cents(expected))
+
+
+# === SOMMES ===
+
+def seed_month(db, rng: random.Random, year: int, month: int):
+    """Transactions aléatoires autour du mois ; retourne les centimes attendus par catégorie"""
+    user = User(email=f"money{rng.random()}@lifehub.local", username=f"money{rng.random()}", hashed_password="x")
+    db.add(user)
+    db.flush()
+    categories = [
+        BudgetCategory(
+            name=category.value, category_type=category, user_id=user.id,
+            monthly_budget=Decimal(rng.randint(0, 10 ** 8)).scaleb(-2), is_active=rng.random() < 0.8
+        )
+        for category in rng.sample(list(BudgetCategoryType), 4)
+    ]
+    db.add_all(categories)
+    db.flush()
+    
+    start, end = month_bounds(year, month)
+    dates = [start, end - timedelta(seconds=1), start - timedelta(seconds=1), end, start + timedelta(days=10)]
+    expected = {}
+    rows = []
+    for _ in range(rng.randint(0, 300)):
+        amount_cents = rng.randint(1, rng.choice((100, 10 ** 4, 10 ** 9)))
+        category = rng.choice(categories + [None])
+        transaction_type = rng.choice((TransactionType.EXPENSE, TransactionType.EXPENSE, TransactionType.INCOME))
+        transaction_date = rng.choice(dates)
+        rows.append({
+            "title": "Achat", "amount": Decimal(amount_cents).scaleb(-2), "transaction_type": transaction_type,
+            "transaction_date": transaction_date, "user_id": user.id,
+            "category_id": category.id if category else None,
+        })
+        if category and transaction_type == TransactionType.EXPENSE and start <= transaction_date < end:
+            expected[category.id] = expected.get(category.id, 0) + amount_cents
+    if rows:
+        db.execute(insert(BudgetTransaction), rows)
+    db.commit()
+    return user.id, categories, expected
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_monthly_spending_equals_sum_of_cents(db, seed):
+    rng = random.Random(seed)
+    year, month = rng.choice([(2026, 1), (2026, 10), (2026, 12)])
+    user_id, _, expected = seed_month(db, rng, year, month)
+    
+    spending = monthly_spending(db, user_id, year, month)
+    assert {category_id: cents(spent) for category_id, spent in spending.items()} == expected
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_budget_overview_totals_equal_sum_of_cents(db, seed):
+    rng = random.Random(seed)
+    year, month = rng.choice([(2026, 1), (2026, 10), (2026, 12)])
+    user_id, categories, expected = seed_month(db, rng, year, month)
+    active = [category for category in categories if category.is_active]
+    
+    overview = budget_overview(db, user_id, year, month)
+    spent = sum(expected.get(category.id, 0) for category in active)
+    budget = sum(cents(category.monthly_budget) for category in active)
+    assert cents(overview.total_spent) == spent
+    assert cents(overview.total_budget) == budget
+    assert cents(overview.remaining_budget) == budget - spent
+    assert {category.id: cents(category.spent_this_month) for category in overview.categories} == {
+        category.id: expected.get(category.id, 0) for category in active
+    }
\ No newline at end of file
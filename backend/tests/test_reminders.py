@@ -0,0 +1,91 @@
+"""
+Dispatcher des rappels : seules les tâches encore dues au moment de l'envoi sont
+rappelées, et une ligne écartée n'annule pas le reste du lot.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.reminder import ReminderStatus, TaskReminder
+from app.models.task import Task, TaskStatus
+from app.services.reminders import ReminderDispatcher, StubNotifier
+
+NOW = datetime(2026, 10, 20, 12, 0, 0)
+
+
+class FailingNotifier(StubNotifier):
+    def send(self, user_id, reminders):
+        raise ConnectionError("notificateur indisponible")
+
+
+@pytest.fixture
+def dispatcher(session_factory):
+    return ReminderDispatcher(session_factory, notifier=StubNotifier(), shard_index=0, shard_count=1)
+
+
+@pytest.fixture
+def due_tasks(db, user):
+    """Tâches dont le rappel (15 min avant l'échéance) est dû à NOW"""
+    tasks = [
+        Task(title=f"Tâche {index}", user_id=user.id, due_date=NOW + timedelta(minutes=10))
+        for index in range(5)
+    ]
+    db.add_all(tasks)
+    db.commit()
+    return tasks
+
+
+def queued(dispatcher):
+    assert dispatcher.refill(NOW) > 0
+    return dispatcher._pop_due(NOW)
+
+
+def test_only_tasks_still_due_are_sent(db, dispatcher, due_tasks):
+    batch = queued(dispatcher)
+    deleted, completed, rescheduled, cancelled, kept = due_tasks
+    db.delete(deleted)
+    completed.completed = True
+    rescheduled.due_date = NOW + timedelta(days=1)
+    cancelled.status = TaskStatus.CANCELLED
+    db.commit()
+    
+    assert dispatcher.deliver(batch, NOW) == 1
+    assert dispatcher.notifier.delivered == {(kept.id, kept.due_date)}
+    assert db.query(TaskReminder.task_id).all() == [(kept.id,)]
+
+
+def test_reminder_is_sent_once(dispatcher, due_tasks):
+    batch = queued(dispatcher)
+    
+    assert dispatcher.deliver(batch, NOW) == len(due_tasks)
+    assert dispatcher.deliver(batch, NOW) == 0
+    assert dispatcher.notifier.reminders == len(due_tasks)
+
+
+def test_failed_reminder_is_retried_while_task_is_due(db, session_factory, due_tasks):
+    first = ReminderDispatcher(session_factory, notifier=FailingNotifier(), shard_index=0, shard_count=1)
+    batch = queued(first)
+    assert first.deliver(batch, NOW) == 0
+    completed = due_tasks[0]
+    completed.completed = True
+    db.commit()
+    
+    retry = ReminderDispatcher(session_factory, notifier=StubNotifier(), shard_index=0, shard_count=1)
+    assert retry.deliver(batch, NOW + timedelta(seconds=1)) == len(due_tasks) - 1
+    assert (completed.id, completed.due_date) not in retry.notifier.delivered
+    statuses = dict(db.query(TaskReminder.task_id, TaskReminder.status).all())
+    assert statuses.pop(completed.id) == ReminderStatus.FAILED
+    assert set(statuses.values()) == {ReminderStatus.SENT}
+
+
+def test_recent_claim_of_another_dispatcher_is_skipped(session_factory, due_tasks):
+    # Réservation en cours ailleurs : le lot n'est pas envoyé une seconde fois
+    other = ReminderDispatcher(session_factory, notifier=StubNotifier(), shard_index=0, shard_count=1)
+    batch = queued(other)
+    with session_factory() as session:
+        other._claim(session, batch[:2], NOW)
+    
+    dispatcher = ReminderDispatcher(session_factory, notifier=StubNotifier(), shard_index=0, shard_count=1)
+    assert dispatcher.deliver(batch, NOW) == len(due_tasks) - 2
+    stale = NOW + dispatcher.claim_timeout
+    assert dispatcher.deliver(batch[:2], stale) == 2
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Synchronisation : instantané complet paginé par curseur, puis reprise
+différentielle depuis le watermark de la première page.
+"""
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.models.budget import BudgetCategory, BudgetCategoryType
+from app.models.shopping import ShoppingItem
+from app.models.task import Task
+
+SECTIONS = ("tasks", "shopping_items", "budget_categories", "budget_transactions")
+
+
+@pytest.fixture
+def rows(db, user):
+    tasks = [Task(title=f"Tâche {index}", user_id=user.id) for index in range(5)]
+    items = [ShoppingItem(name=f"Article {index}", user_id=user.id) for index in range(3)]
+    category = BudgetCategory(name="Courses", category_type=BudgetCategoryType.ALIMENTATION, user_id=user.id)
+    db.add_all([*tasks, *items, category])
+    db.commit()
+    return {"tasks": tasks, "shopping_items": items, "budget_categories": [category], "budget_transactions": []}
+
+
+async def sync(client, auth_headers, **params):
+    response = await client.get("/api/sync/", params=params, headers=auth_headers)
+    assert response.status_code == 200
+    return response
+
+
+async def snapshot(client, auth_headers, limit):
+    """Parcourir toutes les pages de l'instantané ; retourne les pages reçues"""
+    pages = [(await sync(client, auth_headers, limit=limit)).json()]
+    while pages[-1]["cursor"] is not None:
+        pages.append((await sync(client, auth_headers, limit=limit, cursor=pages[-1]["cursor"])).json())
+    return pages
+
+
+@pytest.mark.asyncio
+async def test_full_snapshot_is_paged_with_a_cursor(client, auth_headers, rows):
+    pages = await snapshot(client, auth_headers, limit=3)
+    
+    assert len(pages) == 3
+    assert {page["watermark"] for page in pages} == {pages[0]["watermark"]}
+    assert all(page["full"] for page in pages)
+    assert all(sum(len(page[section]["created"]) for section in SECTIONS) <= 3 for page in pages)
+    for section in SECTIONS:
+        received = [row["id"] for page in pages for row in page[section]["created"]]
+        assert received == [row.id for row in rows[section]]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_page_size_is_capped(client, auth_headers, rows):
+    response = await sync(client, auth_headers, limit=10 ** 9)
+    
+    assert response.headers["X-Page-Limit"] == str(settings.max_page_size)
+    assert response.json()["cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_changes_during_the_snapshot_come_with_the_next_sync(client, auth_headers, db, rows):
+    first = (await sync(client, auth_headers, limit=2)).json()
+    # Watermark et deleted_at sont à la seconde, et SQLite les compare comme des chaînes
+    await asyncio.sleep(1)
+    deleted, renamed = rows["tasks"][0], rows["tasks"][4]
+    db.delete(deleted)
+    renamed.title = "Renommée"
+    db.commit()
+    while first["cursor"] is not None:
+        first = (await sync(client, auth_headers, limit=2, cursor=first["cursor"])).json()
+    
+    changes = (await sync(client, auth_headers, since=first["watermark"])).json()
+    assert not changes["full"]
+    assert changes["tasks"]["deleted"] == [deleted.id]
+    # Créées il y a moins de SYNC_CLOCK_SKEW_SECONDS : renvoyées comme créations
+    sent = changes["tasks"]["created"] + changes["tasks"]["updated"]
+    assert {task["id"]: task["title"] for task in sent}[renamed.id] == "Renommée"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cursor", ["pas-un-curseur", "WyIyMDI2LTAxLTAxIiwgInVzZXJzIiwgMF0="])
+async def test_invalid_cursor_is_rejected(client, auth_headers, cursor):
+    response = await client.get("/api/sync/", params={"cursor": cursor}, headers=auth_headers)
+    
+    assert response.status_code == 400
\ No newline at end of file